@@ -9,32 +9,60 @@ Created: 2025
 Version: 1.0
 """
 
+import contextvars
+import copy
 import logging
-import math
 import os
+import queue
 import sys
-from typing import Dict, Any
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    stream=sys.stdout,
-    force=True
-)
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Dict, Any, Iterator, List, Optional, Callable, Tuple
+
+# 공용 모듈 경로 (배포 시 함께 복사되며, 로컬 실행 시 ../shared 사용)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from structured_logging import configure_logging, log_payload, prompt_text  # noqa: E402
+
+# Configure logging (JSON 한 줄 로그, 리스너 스레드에서 stdout 출력)
+configure_logging(service='agentcore')
 logger = logging.getLogger(__name__)
 
 # Import dependencies
 try:
     import boto3
+    from botocore.config import Config
     from bedrock_agentcore import BedrockAgentCoreApp
     from strands import Agent, tool
     from strands.models import BedrockModel
-    from strands_tools import calculator
 except Exception as e:
-    logger.error(f"Failed to import dependencies: {e}")
+    logger.error("Failed to import dependencies: %s", e)
     raise
 
+try:
+    from strands.models.model import CacheConfig
+except ImportError:  # 이전 Strands 버전은 cache_tools 설정 사용
+    CacheConfig = None
+
+from answer_cache import AnswerCache, is_cacheable, prompt_hash
+from batch_eval import BatchItem, parse_items, resolve_grader, run_batch
+from calculator_engine import evaluate, format_result
+from conversation_store import ConversationStore
+from local_index import BedrockEmbedder, LocalIndex, read_manifest
+from model_router import FAST_TIER, ModelRouter, RouteDecision
+from prefetch import Prefetcher, PrefetchSlot
+from request_metrics import ModelTurnTimer, RequestMetrics, activate, count, timed
+from resilient_retrieval import (
+    RETRIEVAL_UNAVAILABLE_MESSAGE, CircuitBreaker, ResilientRetriever, RetrievalUnavailableError
+)
+from result_shaping import ShapingOptions, shape_results
+from retrieval_cache import RetrievalCache
+from run_budget import RunBudget
+from single_flight import SingleFlight
+from slack_delivery import SlackDeliveryError, StreamingReply, create_delivery_from_env, extract_agent_text
+
 # Initialize BedrockAgentCoreApp
 app = BedrockAgentCoreApp()
 
@@ -43,26 +71,283 @@ KNOWLEDGE_BASE_ID = os.environ.get('KNOWLEDGE_BASE_ID', 'LGZF8ULTDU')
 KB_REGION = os.environ.get('KB_REGION', 'us-east-1')  # Knowledge Base는 서울
 MODEL_ID = os.environ.get('MODEL_ID', 'openai.gpt-oss-120b-1:0')  # OpenAI GPT 모델
 MODEL_REGION = os.environ.get('MODEL_REGION', 'us-east-1')  # 모델 리전
+MODEL_TEMPERATURE = float(os.environ.get('MODEL_TEMPERATURE', '0.3'))  # 기본 모델 temperature
+FAST_MODEL_ID = os.environ.get('FAST_MODEL_ID', '')  # 간단한 질문용 빠른 모델 (비어 있으면 라우팅 비활성화)
+FAST_MODEL_REGION = os.environ.get('FAST_MODEL_REGION', MODEL_REGION)  # 빠른 모델 리전
+FAST_MODEL_TEMPERATURE = float(os.environ.get('FAST_MODEL_TEMPERATURE', '0.3'))  # 빠른 모델 temperature
+ROUTER_SIMPLE_MAX_CHARS = int(os.environ.get('ROUTER_SIMPLE_MAX_CHARS', '60'))  # 빠른 모델로 보낼 질문 최대 길이
+ROUTER_MIN_GROUNDING = float(os.environ.get('ROUTER_MIN_GROUNDING', '0.2'))  # 빠른 모델 답변의 검색 결과 최소 겹침 비율
+ENABLE_PROMPT_CACHE = os.environ.get('ENABLE_PROMPT_CACHE', 'true').lower() == 'true'  # 시스템 프롬프트/도구 프롬프트 캐시
 MAX_ITERATIONS = int(os.environ.get('MAX_ITERATIONS', '5'))  # 도구 사용 최대 횟수
+DEADLINE_MARGIN_SECONDS = float(os.environ.get('DEADLINE_MARGIN_SECONDS', '2'))  # 마감 시각 전에 남겨 둘 응답 반환 시간(초)
+FINAL_TURN_SECONDS = float(os.environ.get('FINAL_TURN_SECONDS', '8'))  # 도구 호출 후 마지막 모델 턴에 필요한 시간(초)
+REPLY_DEADLINE_SECONDS = float(os.environ.get('REPLY_DEADLINE_SECONDS', '120'))  # Slack 직접 전달 요청의 실행 마감 시간(초)
+STREAM_UPDATE_INTERVAL = float(os.environ.get('STREAM_UPDATE_INTERVAL', '1.0'))  # Slack 직접 전달 시 부분 응답 갱신 최소 간격(초)
+KB_NUMBER_OF_RESULTS = int(os.environ.get('KB_NUMBER_OF_RESULTS', '5'))  # Knowledge Base 검색 결과 개수
+KB_MAX_PARALLEL_QUERIES = int(os.environ.get('KB_MAX_PARALLEL_QUERIES', '4'))  # 다중 검색 동시 retrieve 수
+KB_MAX_QUERIES = 5  # 다중 검색 도구 1회 호출당 최대 질의 수
+RETRIEVAL_CACHE_SIZE = int(os.environ.get('RETRIEVAL_CACHE_SIZE', '256'))  # 검색 캐시 최대 항목 수 (0이면 비활성화)
+RETRIEVAL_CACHE_TTL = float(os.environ.get('RETRIEVAL_CACHE_TTL', '600'))  # 검색 캐시 유효 시간(초)
+RETRIEVAL_CACHE_STALE_TTL = float(os.environ.get('RETRIEVAL_CACHE_STALE_TTL', '3600'))  # 검색 장애 시 만료된 캐시를 대신 사용할 수 있는 시간(초)
+KB_CONNECT_TIMEOUT = float(os.environ.get('KB_CONNECT_TIMEOUT', '2'))  # Knowledge Base 연결 제한 시간(초)
+KB_READ_TIMEOUT = float(os.environ.get('KB_READ_TIMEOUT', '5'))  # Knowledge Base 응답 대기 제한 시간(초)
+KB_HEDGE_PERCENTILE = float(os.environ.get('KB_HEDGE_PERCENTILE', '95'))  # 헤지 요청 지연 시간으로 사용할 retrieve 지연 백분위수 (0이면 비활성화)
+KB_HEDGE_DELAY_MS = float(os.environ.get('KB_HEDGE_DELAY_MS', '800'))  # 지연 시간 표본이 부족할 때의 헤지 지연 시간(ms)
+KB_HEDGE_MIN_SAMPLES = int(os.environ.get('KB_HEDGE_MIN_SAMPLES', '20'))  # 백분위수를 사용하기 위한 최소 표본 수
+KB_BREAKER_FAILURES = int(os.environ.get('KB_BREAKER_FAILURES', '5'))  # 검색 차단을 시작할 연속 실패 횟수 (0이면 비활성화)
+KB_BREAKER_RESET_SECONDS = float(os.environ.get('KB_BREAKER_RESET_SECONDS', '30'))  # 검색 차단 후 복구 확인까지의 시간(초)
+ANSWER_CACHE_SIZE = int(os.environ.get('ANSWER_CACHE_SIZE', '512'))  # 답변 캐시 최대 항목 수 (0이면 비활성화)
+ANSWER_CACHE_TTL = float(os.environ.get('ANSWER_CACHE_TTL', '3600'))  # 답변 캐시 유효 시간(초)
+SINGLE_FLIGHT_MAX_WAITERS = int(os.environ.get('SINGLE_FLIGHT_MAX_WAITERS', '100'))  # 같은 질문 실행을 기다릴 최대 요청 수 (0이면 비활성화)
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', '90'))  # 같은 질문 실행 결과 최대 대기 시간(초)
+BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', '8'))  # 일괄 평가 최대 동시 실행 수
+BATCH_MAX_PROMPTS = int(os.environ.get('BATCH_MAX_PROMPTS', '500'))  # 일괄 평가 1회 최대 질문 수
+KB_VERSION = os.environ.get('KB_VERSION', '')  # KB 버전 태그 (재동기화 시 변경하면 답변 캐시 키가 바뀜)
+CONVERSATION_MAX_SESSIONS = int(os.environ.get('CONVERSATION_MAX_SESSIONS', '500'))  # 대화 보관 최대 세션 수 (0이면 비활성화)
+CONVERSATION_TOKEN_BUDGET = int(os.environ.get('CONVERSATION_TOKEN_BUDGET', '4000'))  # 세션당 히스토리 토큰 예산
+CONVERSATION_MEMORY_TOKENS = int(os.environ.get('CONVERSATION_MEMORY_TOKENS', '1000000'))  # 전체 히스토리 토큰 상한
+CONVERSATION_TTL = float(os.environ.get('CONVERSATION_TTL', '3600'))  # 세션 유지 시간(초)
+PREFETCH_MAX_WORKERS = int(os.environ.get('PREFETCH_MAX_WORKERS', '4'))  # 원문 질문 선행 검색 동시 실행 수 (0이면 비활성화)
+PREFETCH_MIN_OVERLAP = float(os.environ.get('PREFETCH_MIN_OVERLAP', '0.6'))  # 선행 검색 결과를 사용할 최소 검색어 겹침 비율
+LOCAL_INDEX_PATH = os.environ.get('LOCAL_INDEX_PATH', '')  # 로컬 하이브리드 인덱스 디렉터리 (비어 있으면 비활성화)
+LOCAL_INDEX_MIN_COVERAGE = float(os.environ.get('LOCAL_INDEX_MIN_COVERAGE', '0.6'))  # 로컬 결과를 사용할 최소 질의 커버리지
+LOCAL_INDEX_MIN_SIMILARITY = float(os.environ.get('LOCAL_INDEX_MIN_SIMILARITY', '0.55'))  # 로컬 결과를 사용할 최소 코사인 유사도
+LOCAL_INDEX_VECTOR_WEIGHT = float(os.environ.get('LOCAL_INDEX_VECTOR_WEIGHT', '0.5'))  # 하이브리드 점수의 벡터 비중
+LOCAL_INDEX_EMBEDDING_REGION = os.environ.get('LOCAL_INDEX_EMBEDDING_REGION', 'ap-northeast-2')  # 질의 임베딩 리전 (서울)
+
+# 검색 결과 후처리 설정
+SHAPING_OPTIONS = ShapingOptions(
+    min_score=float(os.environ.get('KB_MIN_SCORE', '0.0')),  # 최소 관련도 점수
+    dedup_method=os.environ.get('KB_DEDUP_METHOD', 'jaccard').lower(),  # jaccard | mmr | none
+    dedup_threshold=float(os.environ.get('KB_DEDUP_THRESHOLD', '0.8')),  # 중복 판단 유사도
+    mmr_lambda=float(os.environ.get('KB_MMR_LAMBDA', '0.7')),  # MMR 관련도 가중치
+    max_results=int(os.environ.get('KB_MAX_RESULTS', '5')),  # 도구 결과 최대 문서 수
+    merge_by_source=os.environ.get('KB_MERGE_BY_SOURCE', 'true').lower() == 'true',  # 같은 출처 병합
+    token_budget=int(os.environ.get('KB_RESULT_TOKEN_BUDGET', '1500'))  # 도구 결과 토큰 예산
+)
 
 # 스트리밍 미지원 모델 감지 (Llama 등)
 STREAMING_UNSUPPORTED_MODELS = ['llama']
-IS_LLAMA_MODEL = any(model_type in MODEL_ID.lower() for model_type in STREAMING_UNSUPPORTED_MODELS)
+
+
+def supports_streaming(model_id: str) -> bool:
+    """모델이 스트리밍 응답을 지원하는지 확인합니다."""
+    return not any(model_type in model_id.lower() for model_type in STREAMING_UNSUPPORTED_MODELS)
+
+
+# 프롬프트 캐시(cachePoint) 지원 모델: 모델 ID 키워드 → 캐시 지점을 둘 수 있는 구간
+PROMPT_CACHE_MODELS = {
+    'claude': ('system', 'tools'),
+    'nova': ('system',),
+}
+
+
+def prompt_cache_targets(model_id: str) -> Tuple[str, ...]:
+    """모델이 지원하는 프롬프트 캐시 구간을 반환합니다 (비활성화되었거나 미지원 모델이면 빈 튜플)."""
+    if not ENABLE_PROMPT_CACHE:
+        return ()
+    lowered = model_id.lower()
+    for model_type, targets in PROMPT_CACHE_MODELS.items():
+        if model_type in lowered:
+            return targets
+    return ()
+
+
+IS_LLAMA_MODEL = not supports_streaming(MODEL_ID)
 ENABLE_STREAMING = not IS_LLAMA_MODEL
 
-logger.info(f"KB Fintech HR Assistant initialized - KB: {KNOWLEDGE_BASE_ID[:20] if KNOWLEDGE_BASE_ID else 'Not set'}..., Model: {MODEL_ID.split('/')[-1] if '/' in MODEL_ID else MODEL_ID}, Region: {MODEL_REGION}, Streaming: {ENABLE_STREAMING}")
+logger.info(
+    "KB Fintech HR Assistant initialized - KB: %s, Model: %s, Fast model: %s, Region: %s, Streaming: %s",
+    KNOWLEDGE_BASE_ID or 'Not set', MODEL_ID, FAST_MODEL_ID or 'Not set', MODEL_REGION, ENABLE_STREAMING
+)
 
 # AWS client will be initialized lazily when needed
 _bedrock_agent_runtime = None
 
+# 로컬 하이브리드 인덱스 (첫 검색 시 로드, 로드 실패 시 Knowledge Base만 사용)
+_local_index: Optional[LocalIndex] = None
+_local_index_failed = False
+_local_index_lock = threading.Lock()
+
+# 다중 검색용 retrieve 스레드 풀 (프로세스 단위로 공유)
+_retrieve_executor = ThreadPoolExecutor(max_workers=KB_MAX_PARALLEL_QUERIES, thread_name_prefix="kb-retrieve")
+
+# 프로세스 단위 Knowledge Base 검색 결과 캐시
+retrieval_cache = RetrievalCache(
+    max_size=RETRIEVAL_CACHE_SIZE, ttl_seconds=RETRIEVAL_CACHE_TTL, stale_seconds=RETRIEVAL_CACHE_STALE_TTL
+)
+
+# 최종 답변 캐시 (동일한 일반 질문은 Agent 실행 없이 응답)
+answer_cache = AnswerCache(max_size=ANSWER_CACHE_SIZE, ttl_seconds=ANSWER_CACHE_TTL)
+
+# 동시에 들어온 같은 질문은 한 번만 실행 (답변 캐시가 채워지기 전의 몰림 대응)
+single_flight = SingleFlight(max_waiters=SINGLE_FLIGHT_MAX_WAITERS, wait_timeout=SINGLE_FLIGHT_TIMEOUT)
+
+# Slack 직접 전달 (SLACK_BOT_TOKEN이 없으면 None이며, reply_to 요청도 평소처럼 답변을 반환)
+reply_delivery = create_delivery_from_env()
+
+# Slack 스레드 단위 세션 대화 저장소
+conversation_store = ConversationStore(
+    max_sessions=CONVERSATION_MAX_SESSIONS,
+    session_token_budget=CONVERSATION_TOKEN_BUDGET,
+    max_total_tokens=CONVERSATION_MEMORY_TOKENS,
+    ttl_seconds=CONVERSATION_TTL
+)
+
 
 def get_bedrock_client():
     """Lazy initialization of Bedrock Agent Runtime client"""
     global _bedrock_agent_runtime
     if _bedrock_agent_runtime is None:
-        _bedrock_agent_runtime = boto3.client('bedrock-agent-runtime', region_name=KB_REGION)
+        # 느린 응답은 SDK 재시도 대신 헤지 요청으로 대응
+        _bedrock_agent_runtime = boto3.client(
+            'bedrock-agent-runtime',
+            region_name=KB_REGION,
+            config=Config(
+                connect_timeout=KB_CONNECT_TIMEOUT,
+                read_timeout=KB_READ_TIMEOUT,
+                retries={'total_max_attempts': 1}
+            )
+        )
     return _bedrock_agent_runtime
 
+
+# Knowledge Base retrieve 헤지 요청 및 서킷 브레이커
+kb_retriever = ResilientRetriever(
+    get_bedrock_client,
+    hedge_percentile=KB_HEDGE_PERCENTILE,
+    hedge_delay_ms=KB_HEDGE_DELAY_MS,
+    min_samples=KB_HEDGE_MIN_SAMPLES,
+    breaker=CircuitBreaker(failure_threshold=KB_BREAKER_FAILURES, reset_seconds=KB_BREAKER_RESET_SECONDS)
+)
+
+
+def get_local_index() -> Optional[LocalIndex]:
+    """Lazy loading of the local hybrid index (LOCAL_INDEX_PATH가 없거나 로드에 실패하면 None)"""
+    global _local_index, _local_index_failed
+    if _local_index is not None or _local_index_failed or not LOCAL_INDEX_PATH:
+        return _local_index
+    
+    with _local_index_lock:
+        if _local_index is None and not _local_index_failed:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), LOCAL_INDEX_PATH)
+            try:
+                manifest = read_manifest(path)
+                embedder = None
+                if manifest.get('embedding_model'):
+                    embedder = BedrockEmbedder(
+                        manifest['embedding_model'], LOCAL_INDEX_EMBEDDING_REGION, manifest['dimensions']
+                    )
+                _local_index = LocalIndex.load(
+                    path,
+                    embedder=embedder,
+                    min_coverage=LOCAL_INDEX_MIN_COVERAGE,
+                    min_similarity=LOCAL_INDEX_MIN_SIMILARITY,
+                    vector_weight=LOCAL_INDEX_VECTOR_WEIGHT
+                )
+                logger.info(
+                    "[Local Index] Loaded %s chunks from %s (vector search: %s)",
+                    manifest['document_count'], path, _local_index.uses_vectors
+                )
+            except Exception as e:
+                logger.error("[Local Index] Failed to load %s, using Knowledge Base only: %s", path, e)
+                _local_index_failed = True
+    return _local_index
+
+
+def retrieve_documents(query: str, number_of_results: int = KB_NUMBER_OF_RESULTS) -> List[Dict[str, Any]]:
+    """
+    HR 문서를 검색합니다. 로컬 인덱스 결과의 확신도가 충분하면 그대로 사용하고,
+    아니면 Knowledge Base에서 검색합니다. 캐시에 있으면 retrieve 호출을 생략합니다.
+    Knowledge Base 검색이 실패하면 만료된 캐시나 로컬 인덱스 결과로 대신합니다.
+    
+    Returns:
+        retrievalResults 항목 리스트 (content, score 등)
+    
+    Raises:
+        RetrievalUnavailableError: 검색에 실패했고 대신 사용할 결과도 없는 경우
+    """
+    local = None
+    local_index = get_local_index()
+    if local_index is not None:
+        with timed('local_retrieve'):
+            local = local_index.search(query, number_of_results)
+        if local.confident or not KNOWLEDGE_BASE_ID:
+            logger.info(
+                "[KB Search] Local index hit (%s documents, coverage=%s, similarity=%s, %.1fms)",
+                len(local.results), local.coverage, local.similarity, local.elapsed_ms
+            )
+            return local.results
+        logger.info(
+            "[KB Search] Local index low confidence (coverage=%s, similarity=%s)", local.coverage, local.similarity
+        )
+    
+    cache_key = RetrievalCache.make_key(query, KNOWLEDGE_BASE_ID, number_of_results)
+    cached = retrieval_cache.get(cache_key)
+    if cached is not None:
+        logger.info("[KB Search] Cache hit (%s documents)", len(cached))
+        return cached
+    
+    try:
+        with timed('retrieve'):
+            response = kb_retriever.retrieve(
+                knowledgeBaseId=KNOWLEDGE_BASE_ID,
+                retrievalQuery={'text': query},
+                retrievalConfiguration={
+                    'vectorSearchConfiguration': {
+                        'numberOfResults': number_of_results
+                    }
+                }
+            )
+    except Exception as e:
+        fallback = retrieval_cache.get_stale(cache_key) or (local.results if local is not None else None)
+        if fallback:
+            count('retrieve_degraded')
+            logger.warning("[KB Search] Retrieve failed, using degraded results (%s documents): %s", len(fallback), e)
+            return fallback
+        raise RetrievalUnavailableError(f"Knowledge Base retrieve failed: {str(e)}") from e
+    
+    results = response.get('retrievalResults', [])
+    retrieval_cache.put(cache_key, results)
+    return results
+
+
+# 요청 도착 시 원문 질문으로 검색을 미리 시작 (첫 모델 턴과 retrieve 지연을 겹침)
+prefetcher = Prefetcher(retrieve_documents, max_workers=PREFETCH_MAX_WORKERS, min_overlap=PREFETCH_MIN_OVERLAP)
+
+
+def start_prefetch(user_message: str) -> Optional[PrefetchSlot]:
+    """검색 대상(Knowledge Base 또는 로컬 인덱스)이 있으면 원문 질문으로 선행 검색을 시작합니다."""
+    if not KNOWLEDGE_BASE_ID and get_local_index() is None:
+        return None
+    return prefetcher.start(user_message)
+
+
+def retrieve_for_tool(query: str) -> List[Dict[str, Any]]:
+    """도구 검색어와 일치하는 선행 검색 결과가 있으면 사용하고, 없으면 검색합니다."""
+    prefetched = prefetcher.take(query)
+    if prefetched is not None:
+        return prefetched
+    return retrieve_documents(query)
+
+
+def invalidate_retrieval_cache() -> int:
+    """Knowledge Base 재동기화 후 검색 캐시를 비웁니다. 제거된 항목 수를 반환합니다."""
+    removed = retrieval_cache.invalidate()
+    logger.info("[KB Search] Retrieval cache invalidated (%s entries)", removed)
+    return removed
+
+
+def invalidate_answer_cache(kb_version: Optional[str] = None) -> int:
+    """답변 캐시를 비웁니다. kb_version이 주어지면 이후 캐시 키의 KB 버전 태그를 변경합니다."""
+    global KB_VERSION
+    if kb_version is not None:
+        KB_VERSION = kb_version
+    removed = answer_cache.invalidate()
+    logger.info("[Answer Cache] Invalidated (%s entries, kb_version=%s)", removed, KB_VERSION or '-')
+    return removed
+
+
 @tool
 def search_hr_documents(query: str) -> str:
     """
@@ -74,73 +359,123 @@ def search_hr_documents(query: str) -> str:
     Returns:
         검색 결과 텍스트
     """
-    logger.info(f"[KB Search] {query[:50]}...")
+    logger.info("[KB Search] %s", prompt_text(query))
     
-    if not KNOWLEDGE_BASE_ID:
+    if not KNOWLEDGE_BASE_ID and get_local_index() is None:
         return "Knowledge Base가 설정되지 않았습니다."
     
     try:
-        client = get_bedrock_client()
-        
-        response = client.retrieve(
-            knowledgeBaseId=KNOWLEDGE_BASE_ID,
-            retrievalQuery={'text': query},
-            retrievalConfiguration={
-                'vectorSearchConfiguration': {
-                    'numberOfResults': 5
-                }
-            }
-        )
-        
-        results = []
-        for item in response.get('retrievalResults', []):
-            content = item.get('content', {}).get('text', '')
-            score = item.get('score', 0)
-            results.append(f"[관련도: {score:.2f}]\n{content}")
+        shaped = shape_results(retrieve_for_tool(query), SHAPING_OPTIONS)
         
-        if results:
-            result_text = "\n\n---\n\n".join(results)
-            logger.info(f"[KB Search] Found {len(results)} documents")
-            return result_text
+        if shaped.text:
+            logger.info(
+                "[KB Search] Found %s documents, kept %s (%s tokens, saved %s)",
+                shaped.original_count, len(shaped.documents), shaped.shaped_tokens, shaped.saved_tokens
+            )
+            return shaped.text
         else:
             return "관련 문서를 찾을 수 없습니다."
             
+    except RetrievalUnavailableError as e:
+        logger.error("[KB Search Error] %s", e)
+        return RETRIEVAL_UNAVAILABLE_MESSAGE
     except Exception as e:
         error_msg = f"검색 오류: {str(e)}"
-        logger.error(f"[KB Search Error] {error_msg}")
+        logger.error("[KB Search Error] %s", error_msg)
         return error_msg
 
+@tool
+def search_hr_documents_multi(queries: List[str]) -> str:
+    """
+    여러 질의로 KB Fintech HR 문서를 동시에 검색합니다.
+    여러 주제(예: "연차 규정", "연차 수당", "통상임금")를 확인해야 할 때
+    search_hr_documents를 여러 번 호출하는 대신 한 번에 사용합니다.
+    
+    Args:
+        queries: 검색할 질문이나 키워드 목록 (최대 5개)
+        
+    Returns:
+        관련도 순으로 병합/중복 제거된 검색 결과 텍스트
+    """
+    queries = [query for query in dict.fromkeys(q.strip() for q in queries) if query][:KB_MAX_QUERIES]
+    logger.info("[KB Multi Search] %s queries: %s", len(queries), [prompt_text(query) for query in queries])
+    
+    if not KNOWLEDGE_BASE_ID and get_local_index() is None:
+        return "Knowledge Base가 설정되지 않았습니다."
+    if not queries:
+        return "검색할 질의가 없습니다."
+    
+    # 요청 메트릭이 풀 스레드에서도 기록되도록 현재 컨텍스트를 복사하여 실행
+    futures = [
+        _retrieve_executor.submit(contextvars.copy_context().run, retrieve_for_tool, query)
+        for query in queries
+    ]
+    
+    # 같은 청크가 여러 질의에서 나오면 가장 높은 점수만 유지
+    merged: Dict[str, Dict[str, Any]] = {}
+    errors = []
+    unavailable = 0
+    for query, future in zip(queries, futures):
+        try:
+            for item in future.result():
+                text = item.get('content', {}).get('text', '')
+                if text not in merged or item.get('score', 0) > merged[text].get('score', 0):
+                    merged[text] = item
+        except Exception as e:
+            logger.error("[KB Multi Search Error] %s: %s", prompt_text(query), e)
+            errors.append(query)
+            unavailable += isinstance(e, RetrievalUnavailableError)
+    
+    if unavailable and unavailable == len(queries):
+        return RETRIEVAL_UNAVAILABLE_MESSAGE
+    if errors and len(errors) == len(queries):
+        return f"검색 오류: 모든 질의 검색에 실패했습니다 ({', '.join(errors)})"
+    
+    options = replace(SHAPING_OPTIONS, max_results=SHAPING_OPTIONS.max_results * len(queries))
+    shaped = shape_results(list(merged.values()), options)
+    
+    if not shaped.text:
+        return "관련 문서를 찾을 수 없습니다."
+    
+    logger.info(
+        "[KB Multi Search] Found %s unique documents, kept %s (%s tokens, saved %s)",
+        shaped.original_count, len(shaped.documents), shaped.shaped_tokens, shaped.saved_tokens
+    )
+    if errors:
+        return f"{shaped.text}\n\n(일부 질의 검색 실패: {', '.join(errors)})"
+    return shaped.text
+
+
 @tool
 def calculator(expression: str) -> str:
     """
     수학 계산을 수행합니다. 급여, 연차, 수당 등을 계산할 때 사용합니다.
+    금액 계산은 소수점 오차 없이 처리되며, 다음 HR 함수를 바로 사용할 수 있습니다.
+    
+    - 통상임금(월급, 월소정근로시간=209): 시간급 통상임금
+    - 통상일급(월급, 월소정근로시간=209, 1일근로시간=8): 1일 통상임금
+    - 연차수당(월급, 일수=1, 월소정근로시간=209, 1일근로시간=8): 미사용 연차수당
+    - 연차일수(근속연수): 근로기준법 기준 연차 일수
+    - 연장근로수당(시급, 시간, 가산율=1.5): 연장/야간/휴일근로수당
+    - 일할계산(월급, 근무일수, 해당월일수): 일할 급여
     
     Args:
-        expression: 계산할 수식 (예: "10 * 5", "sqrt(16)", "2 + 3 * 4")
+        expression: 계산할 수식 (예: "10 * 5", "sqrt(16)", "연차수당(3000000, 3)")
         
     Returns:
         계산 결과
     """
-    logger.info(f"[Calculator] {expression}")
+    logger.info("[Calculator] %s", expression)
     
     try:
-        # 안전한 수학 함수만 허용
-        safe_dict = {
-            'abs': abs, 'round': round, 'min': min, 'max': max,
-            'sum': sum, 'pow': pow,
-            'sqrt': math.sqrt, 'sin': math.sin, 'cos': math.cos,
-            'tan': math.tan, 'log': math.log, 'exp': math.exp,
-            'log10': math.log10, 'ceil': math.ceil, 'floor': math.floor,
-            'pi': math.pi, 'e': math.e
-        }
-        
-        result = eval(expression, {"__builtins__": {}}, safe_dict)
-        logger.info(f"[Calculator] Result: {result}")
+        with timed('calculator'):
+            result = format_result(evaluate(expression))
+        logger.info("[Calculator] Result: %s", result)
         return f"계산 결과: {result}"
         
     except Exception as e:
         error_msg = f"계산 오류: {str(e)}"
-        logger.error(f"[Calculator Error] {error_msg}")
+        logger.error("[Calculator Error] %s", error_msg)
         return error_msg
 
 # KB Fintech HR Assistant 페르소나
@@ -148,13 +483,13 @@ HR_SYSTEM_PROMPT = """당신은 KB Fintech 직원들을 위한 전문 'AI HR 어
 당신의 목표는 직원들의 HR 관련 문의(규정, 복리후생, 휴가, 급여 등)에 대해 회사 내부 문서를 근거로 정확하고 친절하게 답변하는 것입니다.
 
 ## 업무 절차 (필수 준수)
-1. **질문 분석 및 검색**: 사용자의 질문을 받으면 답변을 생성하기 전에 **반드시** `search_hr_documents` 도구를 사용하여 관련 문서를 검색하십시오. (사전 지식 사용 금지)
+1. **질문 분석 및 검색**: 사용자의 질문을 받으면 답변을 생성하기 전에 **반드시** `search_hr_documents` 도구를 사용하여 관련 문서를 검색하십시오. (사전 지식 사용 금지) 여러 주제를 확인해야 하면 `search_hr_documents_multi` 도구로 질의 목록을 한 번에 검색하십시오.
 2. **정보 확인**: 검색된 문서 결과 내에서 사용자의 질문에 대한 정확한 답이 있는지 확인하십시오. 문서 기반으로 추론하여 답할 수 있습니다. 
 3. **계산 수행 (필요 시)**: 급여, 휴가 일수, 수당 등의 계산이 필요한 경우, 문서에서 확인된 '공식'과 '기준'을 바탕으로 `calculator` 도구를 사용하여 정확한 값을 산출하십시오.
 4. **답변 작성**: 확인된 정보와 계산 결과를 바탕으로 사용자에게 답변을 제공하십시오.
 
 ## 답변 원칙
-- **증거 기반 (Evidence-Based)**: 오직 `search_hr_documents`를 통해 검색된 정보만을 사실로 간주하여 답변합니다. 문서에 없는 내용은 절대 추측하거나 지어내지 말고, "관련 문서를 찾을 수 없어 정확한 답변이 어렵습니다. 인사팀에 직접 문의 부탁드립니다."라고 정중히 안내하십시오.
+- **증거 기반 (Evidence-Based)**: 오직 `search_hr_documents` 또는 `search_hr_documents_multi`를 통해 검색된 정보만을 사실로 간주하여 답변합니다. 문서에 없는 내용은 절대 추측하거나 지어내지 말고, "관련 문서를 찾을 수 없어 정확한 답변이 어렵습니다. 인사팀에 직접 문의 부탁드립니다."라고 정중히 안내하십시오.
 - **친절한 어조**: 동료에게 말하듯 공손하고 친절한 경어체(한국어)를 사용하십시오.
 - **명확성**: 법률적 용어나 복잡한 규정은 이해하기 쉬운 풀어서 설명하십시오.
 
@@ -171,7 +506,7 @@ Slack 가독성을 위해 아래 형식을 반드시 따르십시오:
 [내부 처리]
 1. `search_hr_documents` 호출 -> "연차 수당 규정" 검색
 2. 문서 확인: "통상임금의 100% 지급, 통상임금 = 기본급 / 209시간" 확인
-3. `calculator` 호출 -> 3000000 / 209 계산
+3. `calculator` 호출 -> 연차수당(3000000, 1) 계산
 
 [최종 답변]
 연차 수당에 대해 안내해 드립니다.
@@ -185,63 +520,623 @@ KB Fintech 규정에 따르면 연차 수당은 *통상임금의 100%*를 기준
 정확한 금액은 개인의 근태 상황에 따라 달라질 수 있으므로, 상세 내역은 급여 명세서를 참고 부탁드립니다.
 """
 
-def get_agent() -> Agent:
+class AgentFactory:
     """
-    매 요청마다 새로운 Agent 인스턴스를 생성합니다.
-    대화 히스토리 충돌을 방지하기 위해 캐싱하지 않습니다.
+    프로세스 단위로 BedrockModel(boto3 런타임 클라이언트 포함)과 도구 목록을 한 번만 구성하고,
+    요청마다 대화 상태가 분리된 가벼운 Agent 인스턴스를 생성합니다.
+    
+    Agent 자체는 캐싱하지 않으므로 요청 간 대화 히스토리가 공유되지 않습니다.
+    
+    prompt_cache에 'tools'가 있으면 도구 정의 뒤에, 'system'이 있으면 시스템 프롬프트 뒤에
+    Bedrock cachePoint를 두어 모델 턴마다 같은 접두부를 다시 처리하지 않도록 합니다.
     """
-    try:
-        bedrock_model = BedrockModel(
-            model_id=MODEL_ID,
-            region_name=MODEL_REGION,
-            temperature=0.3,
-            streaming=ENABLE_STREAMING
-        )
-        
-        agent = Agent(
-            model=bedrock_model,
-            tools=[search_hr_documents, calculator],
-            system_prompt=HR_SYSTEM_PROMPT,
+    
+    def __init__(
+        self,
+        model_id: str,
+        region_name: str,
+        streaming: bool,
+        tools: List[Any],
+        system_prompt: str,
+        temperature: float = 0.3,
+        prompt_cache: Tuple[str, ...] = ()
+    ):
+        self.model_id = model_id
+        self.region_name = region_name
+        self.streaming = streaming
+        self.temperature = temperature
+        self.tools = tuple(tools)
+        self.prompt_cache = prompt_cache
+        self.system_prompt: Any = system_prompt
+        if 'system' in prompt_cache:
+            self.system_prompt = [{'text': system_prompt}, {'cachePoint': {'type': 'default'}}]
+        self._model: Optional[BedrockModel] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def model(self) -> BedrockModel:
+        """공유 BedrockModel (최초 접근 시 생성)"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    cache_options: Dict[str, Any] = {}
+                    if 'tools' in self.prompt_cache:
+                        if CacheConfig is not None:
+                            # 시스템 프롬프트 cachePoint는 직접 두므로 자동 삽입은 끔
+                            cache_options['cache_config'] = CacheConfig(
+                                strategy='anthropic', system_prompt_ttl=False, tools_ttl=True
+                            )
+                        else:
+                            cache_options['cache_tools'] = 'default'
+                    self._model = BedrockModel(
+                        model_id=self.model_id,
+                        region_name=self.region_name,
+                        temperature=self.temperature,
+                        streaming=self.streaming,
+                        **cache_options
+                    )
+                    logger.info(
+                        "BedrockModel initialized (%s, streaming=%s, prompt cache: %s)",
+                        self.model_id, self.streaming, ', '.join(self.prompt_cache) or 'off'
+                    )
+        return self._model
+    
+    def create(
+        self,
+        callback_handler: Optional[Callable[..., Any]] = None,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        hooks: Optional[List[Any]] = None
+    ) -> Agent:
+        """공유 모델을 사용하는 새 Agent를 생성합니다 (messages가 없으면 빈 대화 히스토리)."""
+        return Agent(
+            model=self.model,
+            messages=messages,
+            tools=list(self.tools),
+            hooks=hooks,
+            system_prompt=self.system_prompt,
             name="KB Fintech HR Assistant",
             description="KB Fintech 직원들의 HR 관련 질문에 답변하는 AI 어시스턴트",
-            agent_id="kb-fintech-hr-assistant"
+            agent_id="kb-fintech-hr-assistant",
+            **({"callback_handler": callback_handler} if callback_handler else {})
         )
-        logger.info(f"KB Fintech HR Assistant Agent created (streaming={ENABLE_STREAMING})")
+    
+    def reset(self) -> None:
+        """공유 모델을 폐기합니다. 다음 요청 시 다시 생성됩니다."""
+        with self._lock:
+            self._model = None
+
+
+agent_factory = AgentFactory(
+    model_id=MODEL_ID,
+    region_name=MODEL_REGION,
+    streaming=ENABLE_STREAMING,
+    tools=[search_hr_documents, search_hr_documents_multi, calculator],
+    system_prompt=HR_SYSTEM_PROMPT,
+    temperature=MODEL_TEMPERATURE,
+    prompt_cache=prompt_cache_targets(MODEL_ID)
+)
+
+# 간단한 질문용 빠른 모델 (FAST_MODEL_ID 설정 시)
+fast_agent_factory = AgentFactory(
+    model_id=FAST_MODEL_ID,
+    region_name=FAST_MODEL_REGION,
+    streaming=supports_streaming(FAST_MODEL_ID),
+    tools=[search_hr_documents, search_hr_documents_multi, calculator],
+    system_prompt=HR_SYSTEM_PROMPT,
+    temperature=FAST_MODEL_TEMPERATURE,
+    prompt_cache=prompt_cache_targets(FAST_MODEL_ID)
+) if FAST_MODEL_ID else None
+
+model_router = ModelRouter(
+    enabled=fast_agent_factory is not None,
+    simple_max_chars=ROUTER_SIMPLE_MAX_CHARS,
+    min_grounding=ROUTER_MIN_GROUNDING
+)
+
+
+SYSTEM_PROMPT_HASH = prompt_hash(HR_SYSTEM_PROMPT)
+
+
+def get_agent(
+    callback_handler: Optional[Callable[..., Any]] = None,
+    messages: Optional[List[Dict[str, Any]]] = None,
+    hooks: Optional[List[Any]] = None,
+    factory: Optional[AgentFactory] = None
+) -> Agent:
+    """
+    매 요청마다 새로운 Agent 인스턴스를 생성합니다.
+    대화 히스토리 충돌을 방지하기 위해 Agent는 캐싱하지 않고,
+    모델과 도구 목록만 AgentFactory를 통해 프로세스 단위로 재사용합니다.
+    
+    Args:
+        callback_handler: 스트리밍 이벤트를 받을 콜백 (None이면 Strands 기본 핸들러 사용)
+        messages: 세션에서 불러온 이전 대화 히스토리
+        hooks: Agent에 등록할 훅 프로바이더 목록
+        factory: 사용할 모델 tier의 AgentFactory (None이면 기본 모델)
+    """
+    try:
+        agent = (factory or agent_factory).create(callback_handler=callback_handler, messages=messages, hooks=hooks)
+        logger.debug("KB Fintech HR Assistant Agent created")
         return agent
     except Exception as e:
-        logger.error(f"Failed to initialize agent: {e}", exc_info=True)
+        logger.error("Failed to initialize agent: %s", e, exc_info=True)
         raise
 
 
+def extract_response(result: Any) -> Any:
+    """Agent 실행 결과에서 응답 메시지를 추출합니다."""
+    if hasattr(result, 'message'):
+        return result.message
+    return str(result)
+
+
+def answer_cache_key(user_message: str) -> Any:
+    """답변 캐시 키를 생성합니다 (질문, 모델, 시스템 프롬프트, KB 버전 기준)."""
+    model_key = f"{MODEL_ID}|{FAST_MODEL_ID}" if FAST_MODEL_ID else MODEL_ID
+    return AnswerCache.make_key(user_message, model_key, SYSTEM_PROMPT_HASH, KB_VERSION)
+
+
+def save_cached_exchange(session_id: Optional[str], user_message: str, cached: Any) -> None:
+    """답변 캐시로 응답한 질문/답변을 세션에 저장합니다 (후속 질문이 이전 대화를 이어받고 캐시를 건너뛰도록)."""
+    if isinstance(cached, dict) and cached.get("role") == "assistant":
+        answer = copy.deepcopy(cached)
+    else:
+        answer = {"role": "assistant", "content": [{"text": str(cached)}]}
+    conversation_store.save(session_id, [{"role": "user", "content": [{"text": user_message}]}, answer])
+
+
+def run_fast_path(
+    user_message: str,
+    history: List[Dict[str, Any]],
+    decision: RouteDecision,
+    metrics: RequestMetrics,
+    budget: RunBudget
+) -> Optional[Any]:
+    """
+    빠른 모델로 Agent를 실행합니다. 답변이 확신도/근거 검사를 통과하지 못하면
+    decision을 승격 처리하고 None을 반환합니다 (history는 변경하지 않음).
+    마감 시각이나 도구 사용 횟수 예산을 다 쓴 경우에는 승격하지 않고 그대로 사용합니다.
+    
+    Returns:
+        검사를 통과한 경우 (agent, result), 아니면 None
+    """
+    messages = copy.deepcopy(history)
+    try:
+        # 승격될 수 있으므로 텍스트 델타는 흘려보내지 않음
+        with metrics.timer('agent_init'):
+            agent = get_agent(
+                callback_handler=lambda **kwargs: None, messages=messages,
+                hooks=[ModelTurnTimer(metrics), budget], factory=fast_agent_factory
+            )
+        with activate(metrics):
+            result = budget.settle(agent, agent(user_message, cancel_signal=budget.cancel_signal))
+        metrics.record_agent_result(result)
+    except Exception as e:
+        logger.error("[Router] Fast model failed, escalating: %s", e)
+        decision.escalate('fast_model_error')
+        return None
+    
+    if budget.stopped_by:
+        return agent, result
+    
+    reason = model_router.check_answer(user_message, str(result), agent.messages[len(history):], decision)
+    if reason:
+        logger.info("[Router] Escalating to %s (%s)", MODEL_ID, reason)
+        decision.escalate(reason)
+        return None
+    return agent, result
+
+
+def run_agent(
+    user_message: str,
+    session_id: Optional[str] = None,
+    callback_handler: Optional[Callable[..., Any]] = None,
+    cache_key: Optional[Any] = None,
+    metrics: Optional[RequestMetrics] = None,
+    transcript: Optional[List[Dict[str, Any]]] = None,
+    deadline: Optional[float] = None
+) -> Any:
+    """
+    세션 히스토리를 불러와 Agent를 실행하고, 실행 후 히스토리를 저장합니다.
+    
+    Args:
+        user_message: 사용자 질문
+        session_id: Slack 스레드 단위 세션 ID (없으면 상태 없이 실행)
+        callback_handler: 스트리밍 이벤트를 받을 콜백
+        cache_key: 답변 캐시 키 (None이면 답변을 캐싱하지 않음)
+        metrics: 단계별 소요 시간과 토큰 사용량을 기록할 요청 메트릭
+        transcript: 실행 후 대화 메시지를 담을 리스트 (결과를 공유한 요청의 세션 저장용)
+        deadline: 응답을 반환해야 하는 절대 마감 시각 (epoch 초, 지나면 부분 답변 반환)
+    """
+    metrics = metrics or RequestMetrics()
+    budget = RunBudget(
+        MAX_ITERATIONS, deadline=deadline,
+        margin_seconds=DEADLINE_MARGIN_SECONDS, final_turn_seconds=FINAL_TURN_SECONDS
+    )
+    # 모델이 검색 도구를 호출하기 전에 원문 질문으로 검색을 시작
+    with activate(metrics):
+        slot = start_prefetch(user_message)
+    
+    history = conversation_store.load(session_id)
+    has_history = bool(history)
+    if has_history:
+        logger.info("[Session] Loaded %s messages for %s", len(history), session_id)
+    
+    decision = model_router.route(user_message)
+    metrics.route = decision
+    logger.info("[Router] %s (%s)", decision.tier, decision.reason)
+    
+    budget.start()
+    try:
+        with prefetcher.scope(slot):
+            fast_outcome = (
+                run_fast_path(user_message, history, decision, metrics, budget) if decision.tier == FAST_TIER else None
+            )
+            if fast_outcome is not None:
+                agent, result = fast_outcome
+                # 검사를 통과한 답변은 한 번에 전달
+                if callback_handler:
+                    callback_handler(data=str(result))
+            else:
+                # Agent는 전달받은 리스트에 대화를 이어서 추가함
+                with metrics.timer('agent_init'):
+                    agent = get_agent(
+                        callback_handler=callback_handler, messages=history, hooks=[ModelTurnTimer(metrics), budget]
+                    )
+                with activate(metrics):
+                    result = budget.settle(agent, agent(user_message, cancel_signal=budget.cancel_signal))
+                metrics.record_agent_result(result)
+    finally:
+        budget.stop()
+        metrics.prefetch = prefetcher.finish(slot)
+        metrics.stopped_by = budget.stopped_by
+    
+    conversation_store.save(session_id, agent.messages)
+    if transcript is not None:
+        transcript.extend(copy.deepcopy(agent.messages))
+    
+    # 이전 대화에 의존하지 않고, 사용자 고유 숫자로 계산하지 않았으며, 예산 초과로 중단되지 않은 답변만 캐싱
+    if (cache_key is not None and not has_history and not budget.stopped_by
+            and is_cacheable(user_message, agent.messages)):
+        answer_cache.put(cache_key, extract_response(result))
+    return result
+
+
+def run_agent_coalesced(
+    user_message: str,
+    session_id: Optional[str] = None,
+    callback_handler: Optional[Callable[..., Any]] = None,
+    cache_key: Optional[Any] = None,
+    metrics: Optional[RequestMetrics] = None,
+    deadline: Optional[float] = None
+) -> Any:
+    """
+    답변 캐시 키가 같은 요청이 이미 실행 중이면 그 결과를 기다려 함께 사용합니다.
+    
+    세션의 첫 질문(cache_key가 있는 요청)만 합치며, 결과를 공유한 요청도
+    같은 대화 메시지를 자신의 세션에 저장하므로 후속 질문은 평소처럼 이어집니다.
+    실행 중 오류는 기다리던 모든 요청에 그대로 전달됩니다.
+    기다리는 요청은 자신의 마감 시각까지만 기다리고, 이후에는 직접 실행합니다.
+    """
+    if cache_key is None:
+        return run_agent(
+            user_message, session_id=session_id, callback_handler=callback_handler,
+            cache_key=cache_key, metrics=metrics, deadline=deadline
+        )
+    
+    transcript: List[Dict[str, Any]] = []
+    
+    def execute() -> Any:
+        result = run_agent(
+            user_message, session_id=session_id, callback_handler=callback_handler,
+            cache_key=cache_key, metrics=metrics, transcript=transcript, deadline=deadline
+        )
+        return result, transcript
+    
+    wait_timeout = deadline - DEADLINE_MARGIN_SECONDS - time.time() if deadline is not None else None
+    (result, messages), shared = single_flight.do(cache_key, execute, timeout=wait_timeout)
+    if shared:
+        logger.info("[Response] Shared result of an identical in-flight request")
+        if metrics is not None:
+            metrics.coalesced = True
+        conversation_store.save(session_id, copy.deepcopy(messages))
+        if callback_handler:
+            callback_handler(data=str(result))
+    return result
+
+
+def stream_agent_response(
+    user_message: str,
+    session_id: Optional[str] = None,
+    cache_key: Optional[Any] = None,
+    metrics: Optional[RequestMetrics] = None,
+    deadline: Optional[float] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Agent 실행 중 생성되는 텍스트 델타를 순차적으로 반환하는 제너레이터입니다.
+    
+    Agent는 별도 스레드에서 실행되고, 콜백 핸들러가 받은 텍스트 조각을 큐로 전달합니다.
+    BedrockAgentCoreApp은 제너레이터 반환 시 SSE(text/event-stream)로 응답합니다.
+    
+    Yields:
+        {"delta": "..."} 텍스트 조각, 마지막으로 {"result": ..., "metrics": ..., "done": True}
+    """
+    metrics = metrics or RequestMetrics()
+    events: "queue.Queue[tuple]" = queue.Queue()
+    outcome: Dict[str, Any] = {}
+    
+    def callback_handler(**kwargs: Any) -> None:
+        data = kwargs.get("data")
+        if data:
+            events.put(("delta", data))
+    
+    def worker() -> None:
+        try:
+            outcome["result"] = run_agent_coalesced(
+                user_message, session_id=session_id, callback_handler=callback_handler,
+                cache_key=cache_key, metrics=metrics, deadline=deadline
+            )
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            events.put(("done", None))
+    
+    threading.Thread(target=worker, name="agent-stream", daemon=True).start()
+    
+    while True:
+        kind, data = events.get()
+        if kind == "done":
+            break
+        yield {"delta": data}
+    
+    if "error" in outcome:
+        error_msg = f"Error: {str(outcome['error'])}"
+        logger.error("[Stream Error] %s", error_msg, exc_info=outcome["error"])
+        yield {"result": error_msg, "metrics": metrics.to_dict(), "done": True}
+        return
+    
+    full_response = extract_response(outcome["result"])
+    logger.info("[Response] Stream completed")
+    yield {"result": full_response, "metrics": metrics.to_dict(), "done": True}
+
+
+def deliver_reply_async(
+    user_message: str,
+    reply_to: Dict[str, Any],
+    session_id: Optional[str] = None,
+    cache_key: Optional[Any] = None,
+    cached: Optional[Any] = None,
+    metrics: Optional[RequestMetrics] = None
+) -> Dict[str, Any]:
+    """
+    Agent를 백그라운드에서 실행하고 답변을 Slack에 직접 전달합니다. 호출은 바로 반환됩니다.
+    
+    실행 중에는 텍스트 델타로 상태 메시지(reply_to.status_ts)를 갱신하고, 끝나면 최종 답변으로 바꿉니다.
+    백그라운드 작업으로 등록하여 실행 중에는 세션 ping이 HealthyBusy로 응답하므로 런타임이 종료되지 않습니다.
+    
+    Args:
+        reply_to: {"channel", "status_ts", "thread_ts"} 답변을 전달할 위치
+        cached: 답변 캐시에서 찾은 답변 (있으면 Agent를 실행하지 않음)
+    """
+    metrics = metrics or RequestMetrics()
+    channel = reply_to.get("channel")
+    reply = StreamingReply(
+        reply_delivery, channel, reply_to.get("status_ts"), reply_to.get("thread_ts"),
+        update_interval=STREAM_UPDATE_INTERVAL
+    )
+    deadline = time.time() + REPLY_DEADLINE_SECONDS
+    task_id = app.add_async_task("slack_reply", {"channel": channel, "status_ts": reply_to.get("status_ts")})
+    
+    def callback_handler(**kwargs: Any) -> None:
+        data = kwargs.get("data")
+        if data:
+            reply.append(data)
+    
+    def worker() -> None:
+        try:
+            if cached is None:
+                result = run_agent_coalesced(
+                    user_message, session_id=session_id, callback_handler=callback_handler,
+                    cache_key=cache_key, metrics=metrics, deadline=deadline
+                )
+                text = extract_agent_text({"result": extract_response(result)})
+            else:
+                text = extract_agent_text({"result": cached})
+        except Exception as e:
+            logger.error("[Reply Error] %s", e, exc_info=True)
+            text = f"❌ 오류가 발생했습니다: {str(e)}"
+        try:
+            reply.finish(text)
+            log_payload(
+                logger, logging.INFO, "[Reply] Delivered to channel %s (%s chars)", channel, len(text),
+                payload=metrics.to_dict(), sample=False
+            )
+        except SlackDeliveryError as e:
+            logger.error("[Reply Error] %s", e)
+        finally:
+            app.complete_async_task(task_id)
+    
+    threading.Thread(target=worker, name="slack-reply", daemon=True).start()
+    return {"accepted": True, "cached": cached is not None}
+
+
+def evaluate_prompt(item: BatchItem, use_cache: bool = False) -> Dict[str, Any]:
+    """
+    일괄 평가 항목 하나를 세션 없이 실행하고 답변, 지연 시간, 토큰 사용량을 반환합니다.
+    
+    use_cache가 False이면 답변 캐시를 조회/저장하지 않아 현재 KB와 모델의 답변을 그대로 평가합니다.
+    """
+    metrics = RequestMetrics()
+    started_at = time.perf_counter()
+    answer, error = None, None
+    try:
+        cache_key = answer_cache_key(item.prompt) if use_cache else None
+        cached = answer_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            metrics.cached = True
+        else:
+            cached = extract_response(run_agent(item.prompt, cache_key=cache_key, metrics=metrics))
+        answer = extract_agent_text({"result": cached})
+    except Exception as e:
+        logger.error("[Batch] Prompt %s failed: %s", item.id, e, exc_info=True)
+        error = str(e)
+    return {
+        "id": item.id,
+        "prompt": item.prompt,
+        "answer": answer,
+        "error": error,
+        "latency_ms": round((time.perf_counter() - started_at) * 1000, 2),
+        "tokens": dict(metrics.tokens),
+        "tool_calls": metrics.tool_calls,
+        "cached": metrics.cached,
+        "stopped_by": metrics.stopped_by,
+    }
+
+
+def run_batch_evaluation(payload: Dict[str, Any]) -> Any:
+    """
+    payload의 prompts를 제한된 동시성으로 실행합니다.
+    
+    stream이 False가 아니면 완료된 항목부터 SSE로 전송하는 제너레이터를 반환하고,
+    False이면 모든 항목이 끝난 뒤 {"results": [...], "summary": {...}}를 반환합니다.
+    
+    Raises:
+        ValueError: prompts 또는 grader가 올바르지 않은 경우
+    """
+    items = parse_items(payload.get("prompts"), BATCH_MAX_PROMPTS)
+    grader = resolve_grader(payload.get("grader"))
+    concurrency = min(BATCH_MAX_CONCURRENCY, int(payload.get("concurrency") or BATCH_MAX_CONCURRENCY))
+    use_cache = bool(payload.get("use_cache", False))
+    events = run_batch(items, lambda item: evaluate_prompt(item, use_cache), concurrency, grader=grader)
+    
+    if payload.get("stream", True):
+        return events
+    results: List[Dict[str, Any]] = []
+    summary: Dict[str, Any] = {}
+    for event in events:
+        if "item" in event:
+            results.append(event["item"])
+        else:
+            summary = event["summary"]
+    order = {item.id: index for index, item in enumerate(items)}
+    results.sort(key=lambda result: order[result["id"]])
+    return {"results": results, "summary": summary}
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    첫 요청 전에 지연 초기화되는 구성 요소를 미리 준비합니다 (모델 호출이나 검색은 하지 않음).
+    
+    - Knowledge Base 클라이언트
+    - 공유 BedrockModel 및 Agent 도구 등록 (빠른 모델 포함)
+    - 로컬 하이브리드 인덱스 (LOCAL_INDEX_PATH 설정 시)
+    
+    Returns:
+        구성 요소별 준비 시간(ms)
+    """
+    steps: List[Tuple[str, Callable[[], Any]]] = [
+        ("kb_client", get_bedrock_client),
+        ("model", lambda: agent_factory.create()),
+    ]
+    if fast_agent_factory is not None:
+        steps.append(("fast_model", lambda: fast_agent_factory.create()))
+    if LOCAL_INDEX_PATH:
+        steps.append(("local_index", get_local_index))
+    
+    timings: Dict[str, float] = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+    log_payload(logger, logging.INFO, "[Warm-up] Completed", payload=timings, sample=False)
+    return timings
+
+
 @app.entrypoint
-def invoke(payload):
-    """AgentCore Runtime 진입점 - 사용자 요청을 처리합니다."""
+def invoke(payload, context=None):
+    """AgentCore Runtime 진입점 - 사용자 요청을 처리합니다.
+    
+    session_id(payload 또는 런타임 세션)가 있으면 해당 세션의 대화 히스토리를 이어서 사용합니다.
+    deadline(epoch ms)이 있으면 마감 전에 실행을 끝내고, 필요하면 부분 답변을 반환합니다.
+    reply_to(channel, status_ts, thread_ts)가 있고 Slack 전송이 설정되어 있으면 답변을 Slack에 직접 전달하고,
+    실행 완료를 기다리지 않고 {"accepted": True}를 반환합니다.
+    """
     try:
+        # 관리 작업: KB 재동기화 후 캐시 무효화 (scope: all | retrieval | answers)
+        if payload.get("action") == "invalidate_cache":
+            scope = payload.get("scope", "all")
+            removed = 0
+            if scope in ("all", "retrieval"):
+                removed += invalidate_retrieval_cache()
+            if scope in ("all", "answers"):
+                removed += invalidate_answer_cache(payload.get("kb_version"))
+            return {
+                "result": f"Cache invalidated ({removed} entries)",
+                "cache": {"retrieval": retrieval_cache.stats(), "answers": answer_cache.stats()},
+                "single_flight": single_flight.stats(),
+                "kb_retrieval": kb_retriever.stats(),
+                "prefetch": prefetcher.stats()
+            }
+        
+        # 예약 warm-up: 클라이언트/모델/로컬 인덱스를 미리 준비
+        if payload.get("action") == "warmup":
+            return {"result": "Warm-up completed", "warmup_ms": warm_up()}
+        
+        # 일괄 평가: prompts 목록을 동시에 실행하고 완료 순서대로 결과 반환
+        if payload.get("action") == "batch":
+            return run_batch_evaluation(payload)
+        
+        metrics = RequestMetrics()
         user_message = payload.get("prompt", "Hello")
         verbose = payload.get("verbose", False)
-        logger.info(f"[Request] {user_message[:100]}... (verbose={verbose})")
+        session_id = payload.get("session_id") or getattr(context, "session_id", None)
+        deadline = payload["deadline"] / 1000 if payload.get("deadline") else None
+        reply_to = payload.get("reply_to") if reply_delivery is not None else None
+        logger.info("[Request] %s (verbose=%s, session=%s)", prompt_text(user_message), verbose, session_id)
+        
+        # 답변 캐시: 세션의 첫 질문만 조회 (후속 질문은 이전 대화에 따라 답변이 달라짐)
+        cache_key = None
+        if not payload.get("bypass_cache") and not conversation_store.has_history(session_id):
+            cache_key = answer_cache_key(user_message)
+            cached = answer_cache.get(cache_key)
+            if cached is not None:
+                logger.info("[Response] Answer cache hit")
+                metrics.cached = True
+                save_cached_exchange(session_id, user_message, cached)
+                if reply_to:
+                    return deliver_reply_async(user_message, reply_to, cached=cached, metrics=metrics)
+                return {"result": cached, "cached": True, "metrics": metrics.to_dict()}
         
-        agent = get_agent()
+        # Slack 직접 전달 요청: 백그라운드에서 실행하고 바로 반환
+        if reply_to:
+            return deliver_reply_async(
+                user_message, reply_to, session_id=session_id, cache_key=cache_key, metrics=metrics
+            )
+        
+        # 스트리밍 요청: SSE로 텍스트 델타를 순차 전송
+        if payload.get("stream") and ENABLE_STREAMING:
+            return stream_agent_response(
+                user_message, session_id=session_id, cache_key=cache_key, metrics=metrics, deadline=deadline
+            )
         
         # Agent 호출 (streaming은 BedrockModel에서 내부적으로 처리됨)
-        result = agent(user_message)
+        result = run_agent_coalesced(
+            user_message, session_id=session_id, cache_key=cache_key, metrics=metrics, deadline=deadline
+        )
         
         # 응답 추출
-        if hasattr(result, 'message'):
-            full_response = result.message
-        else:
-            full_response = str(result)
+        full_response = extract_response(result)
         
-        logger.info(f"[Response] Completed ({len(full_response)} chars)")
+        logger.info("[Response] Completed (%s chars)", len(full_response))
         
-        # 응답 구성
-        response = {"result": full_response}
+        # 응답 구성 (단계별 소요 시간/토큰 사용량 포함)
+        response = {"result": full_response, "metrics": metrics.to_dict()}
         
         return response
         
     except Exception as e:
         error_msg = f"Error: {str(e)}"
-        logger.error(f"[Error] {error_msg}", exc_info=True)
+        logger.error("[Error] %s", error_msg, exc_info=True)
         return {"result": error_msg}
 
 
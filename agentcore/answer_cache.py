@@ -0,0 +1,58 @@
+"""
+Answer Cache - 최종 답변 캐시
+
+휴일 일정, 복리후생 목록처럼 누구에게나 같은 답변이 나오는 질문은
+Agent 실행(모델 호출 + 검색) 없이 캐시된 답변을 바로 반환합니다.
+
+- 정규화된 질문 + MODEL_ID + 시스템 프롬프트 해시 + KB 버전 태그 기준 캐시 키
+- TTL/LRU 제한 (TTLCache)
+- 숫자가 포함된 질문에 calculator를 호출한 답변은 캐싱하지 않음 (사용자별 금액/기간으로 계산한 답변)
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Tuple
+
+from retrieval_cache import TTLCache, normalize_query
+
+_NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)*')
+
+
+def prompt_hash(system_prompt: str) -> str:
+    """시스템 프롬프트의 짧은 해시를 반환합니다 (프롬프트 변경 시 캐시 키가 바뀜)."""
+    return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:16]
+
+
+def calculator_expressions(messages: List[Dict[str, Any]]) -> List[str]:
+    """대화 메시지에서 calculator 도구 호출 수식을 추출합니다."""
+    expressions = []
+    for message in messages:
+        for block in message.get('content', []):
+            tool_use = block.get('toolUse') if isinstance(block, dict) else None
+            if tool_use and tool_use.get('name') == 'calculator':
+                expressions.append(str((tool_use.get('input') or {}).get('expression', '')))
+    return expressions
+
+
+def is_cacheable(user_message: str, messages: List[Dict[str, Any]]) -> bool:
+    """사용자가 제시한 숫자로 계산했을 수 있는 답변(개인별 답변)이 아니면 캐싱 가능합니다.
+
+    질문에 숫자가 있고 calculator를 호출했으면 캐싱하지 않습니다. 수식의 숫자와 비교하지 않는 이유는
+    "300만원"처럼 단위(만/천/억)로 쓴 금액이 수식에서는 3000000으로 바뀌어 일치하지 않기 때문입니다.
+    """
+    if not _NUMBER_PATTERN.search(user_message or ''):
+        return True
+    return not calculator_expressions(messages)
+
+
+class AnswerCache(TTLCache):
+    """최종 답변 캐시입니다."""
+
+    @staticmethod
+    def make_key(prompt: str, model_id: str, system_prompt_hash: str, kb_version: str) -> Tuple[str, str, str, str]:
+        """모델 ID, 시스템 프롬프트 해시, KB 버전, 정규화된 질문으로 캐시 키를 생성합니다."""
+        return (model_id, system_prompt_hash, kb_version, normalize_query(prompt))
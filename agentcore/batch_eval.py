@@ -0,0 +1,185 @@
+"""
+Batch Evaluation - 여러 질문을 한 번의 호출로 동시 실행하는 회귀 평가 모드
+
+KB 재동기화나 모델 변경 후 수백 개의 HR 질문 회귀 세트를 실행할 때,
+질문마다 런타임 세션을 따로 만들어 순차 호출하는 대신 invoke 한 번으로 실행합니다.
+
+- 제한된 동시성의 스레드 풀에서 실행 (모델 클라이언트, 검색 캐시/헤지 계층은 프로세스 단위로 공유)
+- 완료된 순서대로 항목별 답변, 지연 시간, 토큰 사용량을 반환 (가장 느린 질문을 기다리지 않음)
+- 기대 답변(expected)이 있으면 채점: 문자열 포함(contains) 또는 키워드 포함 비율(keywords)
+- 마지막에 통과율, 지연 시간 백분위수, 토큰 합계 요약
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from retrieval_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# 채점 함수: (답변, 기대 답변) → {"score": 0.0 ~ 1.0, "passed": bool}
+Grader = Callable[[str, Any], Dict[str, Any]]
+
+
+@dataclass
+class BatchItem:
+    """평가할 질문 하나입니다."""
+
+    id: str
+    prompt: str
+    expected: Any = None
+
+
+def parse_items(prompts: List[Any], max_items: int) -> List[BatchItem]:
+    """payload의 prompts(문자열 또는 {"id", "prompt", "expected"})를 평가 항목으로 변환합니다.
+
+    Raises:
+        ValueError: 항목이 없거나 max_items를 넘는 경우, 질문이 비어 있는 경우
+    """
+    if not isinstance(prompts, list) or not prompts:
+        raise ValueError("prompts must be a non-empty list")
+    if len(prompts) > max_items:
+        raise ValueError(f"Too many prompts ({len(prompts)} > {max_items})")
+
+    items = []
+    for index, entry in enumerate(prompts):
+        if isinstance(entry, str):
+            entry = {'prompt': entry}
+        prompt = str(entry.get('prompt') or '').strip()
+        if not prompt:
+            raise ValueError(f"Prompt {index} is empty")
+        items.append(BatchItem(id=str(entry.get('id', index)), prompt=prompt, expected=entry.get('expected')))
+    return items
+
+
+def grade_contains(answer: str, expected: Any) -> Dict[str, Any]:
+    """정규화한 기대 답변이 답변에 포함되어 있으면 통과입니다."""
+    passed = normalize_query(str(expected)) in normalize_query(answer)
+    return {'score': 1.0 if passed else 0.0, 'passed': passed}
+
+
+def grade_keywords(answer: str, expected: Any) -> Dict[str, Any]:
+    """기대 키워드 중 답변에 포함된 비율을 점수로 하며, 모두 포함되면 통과입니다.
+
+    expected는 키워드 리스트이거나 쉼표로 구분한 문자열입니다.
+    """
+    keywords = expected if isinstance(expected, list) else str(expected).split(',')
+    keywords = [normalize_query(str(keyword)) for keyword in keywords]
+    keywords = [keyword for keyword in keywords if keyword]
+    if not keywords:
+        return {'score': 1.0, 'passed': True}
+    normalized = normalize_query(answer)
+    matched = [keyword for keyword in keywords if keyword in normalized]
+    return {
+        'score': round(len(matched) / len(keywords), 4),
+        'passed': len(matched) == len(keywords),
+        'missing': [keyword for keyword in keywords if keyword not in matched],
+    }
+
+
+GRADERS: Dict[str, Grader] = {
+    'contains': grade_contains,
+    'keywords': grade_keywords,
+}
+
+
+def resolve_grader(grader: Any) -> Optional[Grader]:
+    """채점 함수 이름 또는 함수를 채점 함수로 변환합니다 (None이면 기대 답변 형식에 따라 자동 선택).
+
+    Raises:
+        ValueError: 알 수 없는 채점 함수 이름인 경우
+    """
+    if grader is None or callable(grader):
+        return grader
+    if grader not in GRADERS:
+        raise ValueError(f"Unknown grader: {grader} (available: {', '.join(GRADERS)})")
+    return GRADERS[grader]
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(results: List[Dict[str, Any]], elapsed_ms: float) -> Dict[str, Any]:
+    """항목별 결과로 통과율, 지연 시간 백분위수, 토큰 합계를 계산합니다."""
+    latencies = sorted(result['latency_ms'] for result in results)
+    graded = [result['grade'] for result in results if result.get('grade')]
+    tokens: Dict[str, int] = {}
+    for result in results:
+        for kind, value in (result.get('tokens') or {}).items():
+            tokens[kind] = tokens.get(kind, 0) + value
+    passed = sum(1 for grade in graded if grade['passed'])
+    return {
+        'count': len(results),
+        'errors': sum(1 for result in results if result.get('error')),
+        'graded': len(graded),
+        'passed': passed,
+        'pass_rate': round(passed / len(graded), 4) if graded else None,
+        'mean_score': round(sum(grade['score'] for grade in graded) / len(graded), 4) if graded else None,
+        'latency_ms': {
+            'p50': round(_percentile(latencies, 50), 2),
+            'p95': round(_percentile(latencies, 95), 2),
+            'max': round(latencies[-1], 2) if latencies else 0.0,
+        },
+        'tokens': tokens,
+        'elapsed_ms': round(elapsed_ms, 2),
+    }
+
+
+def run_batch(
+    items: List[BatchItem],
+    run_one: Callable[[BatchItem], Dict[str, Any]],
+    concurrency: int,
+    grader: Optional[Grader] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    항목을 최대 concurrency개씩 동시에 실행하고 완료되는 순서대로 결과를 반환하는 제너레이터입니다.
+
+    Args:
+        items: 평가 항목
+        run_one: 항목 하나를 실행하여 {"answer", "latency_ms", "tokens", "error"...}를 반환하는 함수
+        concurrency: 최대 동시 실행 수
+        grader: 채점 함수 (None이면 expected가 리스트일 때 keywords, 문자열일 때 contains)
+
+    Yields:
+        {"item": {...}} 항목별 결과, 마지막으로 {"summary": {...}, "done": True}
+    """
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    workers = max(1, min(concurrency, len(items)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-eval")
+    logger.info("[Batch] Running %s prompts (concurrency=%s)", len(items), workers)
+    try:
+        futures = {executor.submit(run_one, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            result = future.result()
+            if item.expected is not None and result.get('answer') is not None:
+                grade = grader or (grade_keywords if isinstance(item.expected, list) else grade_contains)
+                try:
+                    result['grade'] = grade(result['answer'], item.expected)
+                except Exception as e:
+                    logger.error("[Batch] Grader failed for %s: %s", item.id, e)
+                    result['grade'] = {'score': 0.0, 'passed': False, 'error': str(e)}
+            results.append(result)
+            yield {'item': result}
+    finally:
+        # 호출자가 중간에 중단하면 시작하지 않은 항목은 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    summary = summarize(results, (time.perf_counter() - started) * 1000)
+    logger.info(
+        "[Batch] Completed %s prompts (pass_rate=%s, errors=%s)",
+        summary['count'], summary['pass_rate'], summary['errors']
+    )
+    yield {'summary': summary, 'done': True}
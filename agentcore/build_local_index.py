@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build Local Index - Knowledge Base 원본 문서로 로컬 하이브리드 인덱스 생성
+
+Knowledge Base의 S3 데이터 소스(또는 로컬 디렉터리)에서 원본 문서를 내려받아 청크로 나누고,
+BM25 역색인(index.json)과 임베딩 행렬(embeddings.npy)을 만듭니다.
+생성한 디렉터리를 LOCAL_INDEX_PATH로 지정하면 search_hr_documents가 먼저 로컬 인덱스를 검색합니다.
+
+텍스트 형식 문서(.txt, .md, .html, .csv, .json)만 지원하며, PDF 등 다른 형식은 건너뜁니다.
+
+사용 예:
+    # Knowledge Base 데이터 소스(S3)에서 내려받아 임베딩까지 생성
+    python build_local_index.py --kb-id KB12345678 --kb-region us-east-1 --output hr_index
+
+    # 로컬 디렉터리, BM25만 사용
+    python build_local_index.py --source-dir ./hr_docs --output hr_index --no-embeddings
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import argparse
+import html
+import logging
+import os
+import re
+import sys
+from typing import Any, Dict, Iterator, List, Tuple
+
+from local_index import BedrockEmbedder, build_index, chunk_text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = ('.txt', '.md', '.markdown', '.html', '.htm', '.csv', '.json')
+_TAG_PATTERN = re.compile(r'<(script|style)[^>]*>.*?</\1>|<[^>]+>', re.DOTALL | re.IGNORECASE)
+
+
+def to_text(name: str, raw: bytes) -> str:
+    """문서 내용을 텍스트로 변환합니다. HTML은 태그를 제거합니다."""
+    text = raw.decode('utf-8', errors='replace')
+    if name.lower().endswith(('.html', '.htm')):
+        text = html.unescape(_TAG_PATTERN.sub('\n', text))
+    return text
+
+
+def is_supported(name: str) -> bool:
+    # Knowledge Base 메타데이터 사이드카 파일은 제외
+    return name.lower().endswith(TEXT_EXTENSIONS) and not name.endswith('.metadata.json')
+
+
+def iter_local(source_dir: str) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """로컬 디렉터리의 문서를 (location, 텍스트)로 반환합니다."""
+    for root, _, files in os.walk(source_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if not is_supported(name):
+                logger.warning("Skipping unsupported document: %s", path)
+                continue
+            with open(path, 'rb') as source_file:
+                text = to_text(name, source_file.read())
+            uri = os.path.relpath(path, source_dir).replace(os.sep, '/')
+            yield {'type': 'CUSTOM', 'customDocumentLocation': {'uri': uri}}, text
+
+
+def iter_s3(s3_client: Any, bucket: str, prefixes: List[str]) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """S3 버킷의 문서를 (location, 텍스트)로 반환합니다. retrieve 응답과 같은 s3Location 형식을 사용합니다."""
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for prefix in prefixes or ['']:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                key = obj['Key']
+                if key.endswith('/'):
+                    continue
+                if not is_supported(key):
+                    logger.warning("Skipping unsupported document: s3://%s/%s", bucket, key)
+                    continue
+                body = s3_client.get_object(Bucket=bucket, Key=key)['Body'].read()
+                yield {'type': 'S3', 's3Location': {'uri': f"s3://{bucket}/{key}"}}, to_text(key, body)
+
+
+def kb_s3_sources(knowledge_base_id: str, region: str) -> List[Tuple[str, List[str]]]:
+    """Knowledge Base의 S3 데이터 소스 (버킷, 포함 prefix 목록)을 조회합니다."""
+    import boto3
+
+    client = boto3.client('bedrock-agent', region_name=region)
+    sources = []
+    paginator = client.get_paginator('list_data_sources')
+    for page in paginator.paginate(knowledgeBaseId=knowledge_base_id):
+        for summary in page.get('dataSourceSummaries', []):
+            data_source = client.get_data_source(
+                knowledgeBaseId=knowledge_base_id, dataSourceId=summary['dataSourceId']
+            )['dataSource']
+            s3_config = data_source.get('dataSourceConfiguration', {}).get('s3Configuration')
+            if not s3_config:
+                logger.warning("Skipping non-S3 data source: %s", summary.get('name'))
+                continue
+            bucket = s3_config['bucketArn'].split(':::', 1)[-1]
+            sources.append((bucket, s3_config.get('inclusionPrefixes', [])))
+    return sources
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build a local hybrid (BM25 + vector) HR document index")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--kb-id', help="export documents from the Knowledge Base S3 data sources")
+    source.add_argument('--s3-uri', help="export documents from s3://bucket/prefix")
+    source.add_argument('--source-dir', help="read documents from a local directory")
+    parser.add_argument('--kb-region', default=os.environ.get('KB_REGION', 'us-east-1'))
+    parser.add_argument('--s3-region', default=None, help="S3 region (default: --kb-region)")
+    parser.add_argument('--output', default='hr_index', help="index directory (default: hr_index)")
+    parser.add_argument('--chunk-chars', type=int, default=800)
+    parser.add_argument('--chunk-overlap', type=int, default=100)
+    parser.add_argument('--embedding-model', default='amazon.titan-embed-text-v2:0')
+    parser.add_argument('--embedding-region', default=os.environ.get('LOCAL_INDEX_EMBEDDING_REGION', 'ap-northeast-2'))
+    parser.add_argument('--embedding-dimensions', type=int, default=1024)
+    parser.add_argument('--no-embeddings', action='store_true', help="build the BM25 index only")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    if args.source_dir:
+        documents = iter_local(args.source_dir)
+    else:
+        import boto3
+        s3_client = boto3.client('s3', region_name=args.s3_region or args.kb_region)
+        if args.s3_uri:
+            bucket, _, prefix = args.s3_uri.replace('s3://', '', 1).partition('/')
+            sources = [(bucket, [prefix])]
+        else:
+            sources = kb_s3_sources(args.kb_id, args.kb_region)
+        documents = (document for bucket, prefixes in sources for document in iter_s3(s3_client, bucket, prefixes))
+
+    chunks: List[Dict[str, Any]] = []
+    for location, text in documents:
+        for chunk in chunk_text(text, args.chunk_chars, args.chunk_overlap):
+            chunks.append({'text': chunk, 'location': location, 'metadata': {}})
+    logger.info("Collected %s chunks", len(chunks))
+
+    embedder = None
+    if not args.no_embeddings:
+        embedder = BedrockEmbedder(args.embedding_model, args.embedding_region, args.embedding_dimensions)
+
+    manifest = build_index(
+        chunks, args.output, embedder=embedder, embedding_model=args.embedding_model if embedder else ''
+    )
+    logger.info(
+        "Local index written to %s: %s chunks, %s tokens, embeddings: %s",
+        args.output, manifest['document_count'], manifest['token_count'], manifest['dimensions'] or 'none'
+    )
+
+
+if __name__ == "__main__":
+    main()
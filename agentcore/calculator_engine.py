@@ -0,0 +1,341 @@
+"""
+Calculator Engine - 안전한 수식 계산 엔진
+
+calculator 도구에서 사용하는 화이트리스트 기반 AST 계산기입니다.
+eval을 사용하지 않으며, 모델이 생성한 수식(예: 9**9**9)이 CPU를 점유하지 않도록
+노드 수/지수 크기/정수 자릿수를 제한합니다.
+
+- 허용된 연산자, 함수, 상수만 평가
+- 컴파일된 수식 캐시 (동일 수식 재파싱 생략)
+- 숫자 리터럴은 Decimal로 처리하여 금액 계산 시 부동소수점 오차 방지
+- HR 계산 함수 (통상임금, 연차수당 등) 내장
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import ast
+import decimal
+import math
+import operator
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Union
+
+# 계산 제한
+MAX_EXPRESSION_LENGTH = 1000  # 수식 최대 길이(문자)
+MAX_NODES = 200  # AST 최대 노드 수
+MAX_EXPONENT = 1000  # 거듭제곱 지수 절댓값 상한
+MAX_DIGITS = 30  # 결과 정수부 최대 자릿수
+MAX_COLLECTION_SIZE = 100  # 리스트/튜플 최대 원소 수
+
+# 근로기준법 기준 기본값
+DEFAULT_MONTHLY_HOURS = Decimal(209)  # 월 소정근로시간 (주 40시간 + 주휴)
+DEFAULT_DAILY_HOURS = Decimal(8)  # 1일 소정근로시간
+
+# 결과 표시 소수 자릿수
+_DISPLAY_QUANTUM = Decimal('1E-10')
+
+# Decimal 연산 컨텍스트 (스레드별 컨텍스트와 분리)
+_CONTEXT = decimal.Context(prec=34, Emax=999, Emin=-999, traps=[
+    decimal.InvalidOperation, decimal.DivisionByZero, decimal.Overflow
+])
+
+
+class CalculationError(ValueError):
+    """수식이 허용되지 않거나 계산 제한을 초과한 경우 발생합니다."""
+
+
+def _to_decimal(value: Any) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, bool):
+        raise CalculationError("불리언 값은 사용할 수 없습니다")
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise CalculationError("유한한 숫자가 아닙니다")
+        return Decimal(repr(value))
+    raise CalculationError(f"숫자가 아닌 값입니다: {type(value).__name__}")
+
+
+def _check_magnitude(value: Decimal) -> Decimal:
+    """결과 크기가 제한 이내인지 확인합니다."""
+    if not value.is_finite():
+        raise CalculationError("유한한 숫자가 아닙니다")
+    if value != 0 and value.adjusted() >= MAX_DIGITS:
+        raise CalculationError(f"결과가 너무 큽니다 (최대 {MAX_DIGITS}자리)")
+    return value
+
+
+def _number(value: Union[Decimal, List[Decimal]]) -> Decimal:
+    """연산자 피연산자가 숫자인지 확인합니다."""
+    if isinstance(value, list):
+        raise CalculationError("리스트는 연산할 수 없습니다 (min/max/sum 인자로만 사용 가능)")
+    return value
+
+
+def _power(base: Decimal, exponent: Decimal) -> Decimal:
+    if abs(exponent) > MAX_EXPONENT:
+        raise CalculationError(f"지수가 너무 큽니다 (최대 {MAX_EXPONENT})")
+    # 결과 자릿수(exponent * log10|base|)를 미리 추정하여 큰 거듭제곱은 계산 전에 거부
+    # (1.05**100처럼 밑이 1에 가까운 복리 계산은 지수가 커도 결과는 작음)
+    if base != 0 and exponent * _CONTEXT.log10(abs(base)) > MAX_DIGITS * 2:
+        raise CalculationError(f"결과가 너무 큽니다 (최대 {MAX_DIGITS}자리)")
+    return _CONTEXT.power(base, exponent)
+
+
+def _floor_divide(dividend: Decimal, divisor: Decimal) -> Decimal:
+    """Python의 // 와 같이 음의 무한대 방향으로 내림한 몫입니다 (Decimal divide_int는 0 방향 절사)."""
+    quotient = _CONTEXT.divide_int(dividend, divisor)
+    remainder = _CONTEXT.remainder(dividend, divisor)
+    if remainder != 0 and (remainder < 0) != (divisor < 0):
+        quotient -= 1
+    return quotient
+
+
+def _modulo(dividend: Decimal, divisor: Decimal) -> Decimal:
+    """Python의 % 와 같이 나누는 수와 부호가 같은 나머지입니다 (Decimal remainder는 나뉘는 수의 부호)."""
+    remainder = _CONTEXT.remainder(dividend, divisor)
+    if remainder != 0 and (remainder < 0) != (divisor < 0):
+        remainder = _CONTEXT.add(remainder, divisor)
+    return remainder
+
+
+def _round(value: Decimal, digits: Decimal = Decimal(0)) -> Decimal:
+    """사사오입(ROUND_HALF_UP) 반올림합니다. 음수 자릿수는 십/백 단위 반올림입니다."""
+    return value.quantize(Decimal(1).scaleb(-int(digits)), rounding=ROUND_HALF_UP, context=_CONTEXT)
+
+
+def _float_function(func: Callable[[float], float]) -> Callable[[Decimal], Decimal]:
+    def wrapper(value: Decimal) -> Decimal:
+        return _to_decimal(func(float(value)))
+    return wrapper
+
+
+def _aggregate(func: Callable[..., Decimal]) -> Callable[..., Decimal]:
+    """min/max/sum이 인자 목록과 리스트 하나를 모두 받도록 합니다."""
+    def wrapper(*args: Any) -> Decimal:
+        values = args[0] if len(args) == 1 and isinstance(args[0], list) else list(args)
+        if not values:
+            raise CalculationError("값이 없습니다")
+        return func(values)
+    return wrapper
+
+
+# HR 계산 함수 ---------------------------------------------------------------
+
+def ordinary_hourly_wage(monthly_wage: Decimal, monthly_hours: Decimal = DEFAULT_MONTHLY_HOURS) -> Decimal:
+    """통상임금(시간급) = 월 통상임금 ÷ 월 소정근로시간"""
+    return _CONTEXT.divide(monthly_wage, monthly_hours)
+
+
+def ordinary_daily_wage(
+    monthly_wage: Decimal,
+    monthly_hours: Decimal = DEFAULT_MONTHLY_HOURS,
+    daily_hours: Decimal = DEFAULT_DAILY_HOURS
+) -> Decimal:
+    """1일 통상임금 = 통상임금(시간급) × 1일 소정근로시간"""
+    return _CONTEXT.multiply(ordinary_hourly_wage(monthly_wage, monthly_hours), daily_hours)
+
+
+def annual_leave_allowance(
+    monthly_wage: Decimal,
+    days: Decimal = Decimal(1),
+    monthly_hours: Decimal = DEFAULT_MONTHLY_HOURS,
+    daily_hours: Decimal = DEFAULT_DAILY_HOURS
+) -> Decimal:
+    """연차수당 = 1일 통상임금 × 미사용 연차 일수"""
+    return _CONTEXT.multiply(ordinary_daily_wage(monthly_wage, monthly_hours, daily_hours), days)
+
+
+def annual_leave_days(years_of_service: Decimal) -> Decimal:
+    """근로기준법 기준 연차 일수.
+
+    1년 미만: 1개월 개근 시 1일 (최대 11일)
+    1년 이상: 15일 + 최초 1년 이후 2년마다 1일 가산 (최대 25일)
+    """
+    if years_of_service < 0:
+        raise CalculationError("근속연수는 0 이상이어야 합니다")
+    if years_of_service < 1:
+        months = (years_of_service * 12).to_integral_value(rounding=ROUND_FLOOR)
+        return min(months, Decimal(11))
+    extra = ((years_of_service - 1) / 2).to_integral_value(rounding=ROUND_FLOOR)
+    return min(Decimal(15) + extra, Decimal(25))
+
+
+def overtime_pay(hourly_wage: Decimal, hours: Decimal, rate: Decimal = Decimal('1.5')) -> Decimal:
+    """연장/야간/휴일근로수당 = 통상임금(시간급) × 근로시간 × 가산율(기본 1.5배)"""
+    return _CONTEXT.multiply(_CONTEXT.multiply(hourly_wage, hours), rate)
+
+
+def prorated_wage(monthly_wage: Decimal, days_worked: Decimal, days_in_month: Decimal) -> Decimal:
+    """일할계산 급여 = 월급 × 근무일수 ÷ 해당 월 일수"""
+    return _CONTEXT.divide(_CONTEXT.multiply(monthly_wage, days_worked), days_in_month)
+
+
+HR_FUNCTIONS: Dict[str, Callable[..., Decimal]] = {
+    '통상임금': ordinary_hourly_wage,
+    '통상시급': ordinary_hourly_wage,
+    '통상일급': ordinary_daily_wage,
+    '연차수당': annual_leave_allowance,
+    '연차일수': annual_leave_days,
+    '연장근로수당': overtime_pay,
+    '일할계산': prorated_wage,
+    'ordinary_hourly_wage': ordinary_hourly_wage,
+    'ordinary_daily_wage': ordinary_daily_wage,
+    'annual_leave_allowance': annual_leave_allowance,
+    'annual_leave_days': annual_leave_days,
+    'overtime_pay': overtime_pay,
+    'prorated_wage': prorated_wage,
+}
+
+FUNCTIONS: Dict[str, Callable[..., Decimal]] = {
+    'abs': abs,
+    'round': _round,
+    'min': _aggregate(min),
+    'max': _aggregate(max),
+    'sum': _aggregate(lambda values: sum(values, Decimal(0))),
+    'pow': _power,
+    'sqrt': lambda value: value.sqrt(context=_CONTEXT),
+    'exp': lambda value: value.exp(context=_CONTEXT),
+    'log': lambda value, base=None: (
+        value.ln(context=_CONTEXT) if base is None
+        else _CONTEXT.divide(value.ln(context=_CONTEXT), base.ln(context=_CONTEXT))
+    ),
+    'log10': lambda value: value.log10(context=_CONTEXT),
+    'ceil': lambda value: value.to_integral_value(rounding=ROUND_CEILING),
+    'floor': lambda value: value.to_integral_value(rounding=ROUND_FLOOR),
+    'sin': _float_function(math.sin),
+    'cos': _float_function(math.cos),
+    'tan': _float_function(math.tan),
+    **HR_FUNCTIONS,
+}
+
+CONSTANTS: Dict[str, Decimal] = {
+    'pi': _to_decimal(math.pi),
+    'e': _to_decimal(math.e),
+}
+
+_BINARY_OPERATORS: Dict[type, Callable[[Decimal, Decimal], Decimal]] = {
+    ast.Add: _CONTEXT.add,
+    ast.Sub: _CONTEXT.subtract,
+    ast.Mult: _CONTEXT.multiply,
+    ast.Div: _CONTEXT.divide,
+    ast.FloorDiv: _floor_divide,
+    ast.Mod: _modulo,
+    ast.Pow: _power,
+}
+
+_UNARY_OPERATORS: Dict[type, Callable[[Decimal], Decimal]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+Evaluator = Callable[[], Union[Decimal, List[Decimal]]]
+
+
+def _compile_node(node: ast.AST) -> Evaluator:
+    """검증된 AST 노드를 평가 클로저로 변환합니다."""
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body)
+
+    if isinstance(node, ast.Constant):
+        value = _to_decimal(node.value)
+        return lambda: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in CONSTANTS:
+            raise CalculationError(f"허용되지 않은 이름입니다: {node.id}")
+        value = CONSTANTS[node.id]
+        return lambda: value
+
+    if isinstance(node, ast.BinOp):
+        op = _BINARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise CalculationError(f"허용되지 않은 연산자입니다: {type(node.op).__name__}")
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        return lambda: _check_magnitude(op(_number(left()), _number(right())))
+
+    if isinstance(node, ast.UnaryOp):
+        op = _UNARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise CalculationError(f"허용되지 않은 연산자입니다: {type(node.op).__name__}")
+        operand = _compile_node(node.operand)
+        return lambda: op(_number(operand()))
+
+    if isinstance(node, (ast.List, ast.Tuple)):
+        if len(node.elts) > MAX_COLLECTION_SIZE:
+            raise CalculationError(f"원소가 너무 많습니다 (최대 {MAX_COLLECTION_SIZE}개)")
+        elements = [_compile_node(element) for element in node.elts]
+        return lambda: [element() for element in elements]
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            name = getattr(node.func, 'id', type(node.func).__name__)
+            raise CalculationError(f"허용되지 않은 함수입니다: {name}")
+        if node.keywords:
+            raise CalculationError("키워드 인자는 사용할 수 없습니다")
+        func = FUNCTIONS[node.func.id]
+        args = [_compile_node(arg) for arg in node.args]
+
+        def call() -> Decimal:
+            try:
+                result = func(*[arg() for arg in args])
+            except (TypeError, AttributeError) as e:
+                raise CalculationError(f"{node.func.id} 함수 인자가 올바르지 않습니다: {e}") from e
+            return _check_magnitude(_to_decimal(result))
+        return call
+
+    raise CalculationError(f"허용되지 않은 구문입니다: {type(node).__name__}")
+
+
+@lru_cache(maxsize=512)
+def compile_expression(expression: str) -> Evaluator:
+    """수식을 파싱/검증하여 평가 함수로 컴파일합니다 (결과는 캐시됨)."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalculationError(f"수식이 너무 깁니다 (최대 {MAX_EXPRESSION_LENGTH}자)")
+
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise CalculationError(f"수식 구문 오류: {e.msg}") from e
+
+    node_count = sum(1 for _ in ast.walk(tree))
+    if node_count > MAX_NODES:
+        raise CalculationError(f"수식이 너무 복잡합니다 (노드 {node_count}개, 최대 {MAX_NODES}개)")
+
+    return _compile_node(tree)
+
+
+def evaluate(expression: str) -> Decimal:
+    """수식을 계산하여 Decimal로 반환합니다.
+
+    Raises:
+        CalculationError: 허용되지 않은 수식이거나 계산 제한을 초과한 경우
+    """
+    try:
+        result = compile_expression(expression)()
+    except decimal.DecimalException as e:
+        raise CalculationError(f"계산할 수 없는 값입니다 ({type(e).__name__})") from e
+
+    if isinstance(result, list):
+        raise CalculationError("결과가 숫자가 아닙니다")
+    return _check_magnitude(result)
+
+
+def format_result(value: Decimal) -> str:
+    """계산 결과를 표시용 문자열로 변환합니다 (소수점 10자리, 불필요한 0 제거).
+
+    소수점 10자리에서 0이 되는 아주 작은 값은 지수 표기(예: 9.332636185e-302)로 표시합니다.
+    """
+    if value.is_zero():
+        return "0"
+    if value == value.to_integral_value():
+        return f"{value.to_integral_value():f}"
+    if abs(value) < _DISPLAY_QUANTUM:
+        return f"{value:.10g}"
+    text = f"{value.quantize(_DISPLAY_QUANTUM, rounding=ROUND_HALF_UP, context=_CONTEXT):f}"
+    return text.rstrip('0').rstrip('.')
@@ -0,0 +1,217 @@
+"""
+Conversation Store - 세션별 대화 메모리
+
+Slack 스레드 단위 세션(session_id)별로 Strands Agent 대화 히스토리를 보관합니다.
+후속 질문 시 이전 검색 결과와 답변을 재사용할 수 있도록 히스토리를 다시 불러옵니다.
+
+- 세션별 토큰 예산: 오래된 턴은 도구 호출/검색 결과를 제거한 요약 형태로 압축하고,
+  그래도 예산을 넘으면 가장 오래된 턴부터 제거
+- 세션 간 LRU 제거 및 TTL 만료
+- 전체 메모리(추정 토큰 합계) 상한
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# 오래된 턴 압축 시 남길 사용자 질문/답변 최대 길이(문자)
+_COMPACT_TEXT_LIMIT = 500
+
+
+def estimate_tokens(value: Any) -> int:
+    """텍스트/메시지의 토큰 수를 추정합니다 (한국어 기준 약 2자당 1토큰)."""
+    if value is None:
+        return 0
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, default=str)
+    return (len(value) + 1) // 2
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    """메시지의 text 블록만 이어붙여 반환합니다."""
+    return ''.join(
+        block.get('text', '') for block in message.get('content', [])
+        if isinstance(block, dict) and 'text' in block
+    )
+
+
+def _is_user_prompt(message: Dict[str, Any]) -> bool:
+    """도구 결과가 아닌 실제 사용자 질문 메시지인지 확인합니다."""
+    if message.get('role') != 'user':
+        return False
+    return not any(isinstance(block, dict) and 'toolResult' in block for block in message.get('content', []))
+
+
+def split_turns(messages: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """메시지를 사용자 질문 단위의 턴(질문 → 도구 호출 → 최종 답변)으로 나눕니다."""
+    turns: List[List[Dict[str, Any]]] = []
+    for message in messages:
+        if _is_user_prompt(message) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def compact_turn(turn: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """턴을 사용자 질문과 최종 답변 텍스트만 남긴 두 개의 메시지로 압축합니다."""
+    question = _message_text(turn[0])[:_COMPACT_TEXT_LIMIT]
+    answer = ''
+    for message in reversed(turn):
+        if message.get('role') == 'assistant':
+            answer = _message_text(message)
+            if answer:
+                break
+
+    compacted = [{'role': 'user', 'content': [{'text': question}]}]
+    if answer:
+        compacted.append({'role': 'assistant', 'content': [{'text': answer[:_COMPACT_TEXT_LIMIT]}]})
+    else:
+        compacted.append({'role': 'assistant', 'content': [{'text': '(답변 없음)'}]})
+    return compacted
+
+
+class ConversationStore:
+    """토큰 예산과 LRU 제거를 적용한 스레드 안전 세션 대화 저장소입니다.
+
+    Args:
+        max_sessions: 보관할 최대 세션 수
+        session_token_budget: 세션당 히스토리 토큰 예산
+        max_total_tokens: 전체 세션 히스토리 토큰 합계 상한
+        ttl_seconds: 마지막 사용 이후 세션 유지 시간(초)
+        keep_full_turns: 압축하지 않고 원본(도구 호출/검색 결과 포함)으로 유지할 최근 턴 수
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 500,
+        session_token_budget: int = 4000,
+        max_total_tokens: int = 1_000_000,
+        ttl_seconds: float = 3600.0,
+        keep_full_turns: int = 1
+    ):
+        self.max_sessions = max_sessions
+        self.session_token_budget = session_token_budget
+        self.max_total_tokens = max_total_tokens
+        self.ttl_seconds = ttl_seconds
+        self.keep_full_turns = keep_full_turns
+        # session_id -> (expires_at, tokens, messages)
+        self._sessions: "OrderedDict[str, Tuple[float, int, List[Dict[str, Any]]]]" = OrderedDict()
+        self._total_tokens = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.compactions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_sessions > 0 and self.session_token_budget > 0
+
+    def load(self, session_id: Optional[str]) -> List[Dict[str, Any]]:
+        """세션 히스토리의 복사본을 반환합니다. 없거나 만료된 경우 빈 리스트를 반환합니다."""
+        if not session_id or not self.enabled:
+            return []
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return []
+
+            expires_at, tokens, messages = entry
+            if expires_at <= time.monotonic():
+                self._remove(session_id)
+                return []
+
+            self._sessions.move_to_end(session_id)
+            return copy.deepcopy(messages)
+
+    def has_history(self, session_id: Optional[str]) -> bool:
+        """세션에 유효한 대화 히스토리가 있는지 확인합니다."""
+        if not session_id or not self.enabled:
+            return False
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def save(self, session_id: Optional[str], messages: List[Dict[str, Any]]) -> None:
+        """세션 히스토리를 예산에 맞게 압축하여 저장합니다."""
+        if not session_id or not self.enabled:
+            return
+
+        compacted, tokens, was_compacted = self._compact(messages)
+        with self._lock:
+            if was_compacted:
+                self.compactions += 1
+            if session_id in self._sessions:
+                self._remove(session_id)
+            self._sessions[session_id] = (time.monotonic() + self.ttl_seconds, tokens, compacted)
+            self._total_tokens += tokens
+            self._evict()
+
+    def clear(self, session_id: Optional[str] = None) -> None:
+        """특정 세션 또는 전체 세션을 제거합니다."""
+        with self._lock:
+            if session_id is None:
+                self._sessions.clear()
+                self._total_tokens = 0
+            elif session_id in self._sessions:
+                self._remove(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """저장소 상태를 반환합니다."""
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'total_tokens': self._total_tokens,
+                'evictions': self.evictions,
+                'compactions': self.compactions,
+            }
+
+    def _compact(self, messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """최근 턴은 원본으로, 오래된 턴은 압축하여 세션 토큰 예산 이내로 줄입니다.
+
+        Returns:
+            (압축된 메시지, 추정 토큰 수, 압축 발생 여부)
+        """
+        turns = split_turns(copy.deepcopy(messages))
+        was_compacted = len(turns) > self.keep_full_turns
+        if was_compacted:
+            cutoff = len(turns) - self.keep_full_turns
+            turns = [compact_turn(turn) for turn in turns[:cutoff]] + turns[cutoff:]
+
+        token_counts = [estimate_tokens(turn) for turn in turns]
+        # 예산 초과 시 가장 오래된 턴부터 제거 (최소 마지막 턴은 유지)
+        while len(turns) > 1 and sum(token_counts) > self.session_token_budget:
+            turns.pop(0)
+            token_counts.pop(0)
+
+        # 마지막 턴만으로도 예산을 넘으면 압축본으로 대체
+        if turns and sum(token_counts) > self.session_token_budget:
+            turns[-1] = compact_turn(turns[-1])
+            token_counts[-1] = estimate_tokens(turns[-1])
+            was_compacted = True
+
+        compacted = [message for turn in turns for message in turn]
+        return compacted, sum(token_counts), was_compacted
+
+    def _remove(self, session_id: str) -> None:
+        _, tokens, _ = self._sessions.pop(session_id)
+        self._total_tokens -= tokens
+
+    def _evict(self) -> None:
+        """만료된 세션을 정리하고, 세션 수/메모리 상한을 넘으면 LRU 순으로 제거합니다."""
+        now = time.monotonic()
+        for session_id in [sid for sid, (expires_at, _, _) in self._sessions.items() if expires_at <= now]:
+            self._remove(session_id)
+            self.evictions += 1
+
+        while self._sessions and (
+            len(self._sessions) > self.max_sessions or self._total_tokens > self.max_total_tokens
+        ):
+            self._remove(next(iter(self._sessions)))
+            self.evictions += 1
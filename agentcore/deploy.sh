@@ -187,6 +187,12 @@ if [ -n "$KNOWLEDGE_BASE_ID" ]; then
     ENV_VARS="$ENV_VARS --env KNOWLEDGE_BASE_ID=$KNOWLEDGE_BASE_ID --env KB_REGION=$KB_REGION"
 fi
 
+# 로컬 하이브리드 검색 인덱스 (build_local_index.py로 생성한 경우 함께 배포)
+if [ -f "hr_index/index.json" ]; then
+    echo "  Local Index: hr_index"
+    ENV_VARS="$ENV_VARS --env LOCAL_INDEX_PATH=hr_index"
+fi
+
 # Knowledge Base 권한 추가 (필요한 경우)
 if [ -n "$KNOWLEDGE_BASE_ID" ] && [[ "$ADD_KB_PERMS" =~ ^[Yy]$ ]]; then
     echo ""
@@ -296,6 +302,16 @@ if [ -n "$KNOWLEDGE_BASE_ID" ] && [[ "$ADD_KB_PERMS" =~ ^[Yy]$ ]]; then
     echo ""
 fi
 
+# 공용 모듈 (Slack 직접 전달, 구조화 로깅) 함께 배포
+cp ../shared/slack_delivery.py ../shared/structured_logging.py .
+trap 'rm -f "$SCRIPT_DIR/slack_delivery.py" "$SCRIPT_DIR/structured_logging.py"' EXIT
+
+# Slack 직접 전달 (Lambda Bridge ASYNC_HANDOFF=true 사용 시)
+if [ -n "$SLACK_BOT_TOKEN" ]; then
+    echo "  Slack Direct Delivery: enabled"
+    ENV_VARS="$ENV_VARS --env SLACK_BOT_TOKEN=$SLACK_BOT_TOKEN"
+fi
+
 # AgentCore 배포
 echo "Deploying to AgentCore..."
 agentcore launch --agent "$AGENT_NAME" --auto-update-on-conflict $ENV_VARS
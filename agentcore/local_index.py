@@ -0,0 +1,404 @@
+"""
+Local Index - 프로세스 내 하이브리드(BM25 + 벡터) HR 문서 인덱스
+
+HR 문서 규모(수백 페이지)에서는 Knowledge Base retrieve의 리전 간 왕복 없이
+프로세스 안에서 검색할 수 있습니다. build_local_index.py로 만든 인덱스 디렉터리를 읽어
+search_hr_documents의 1차 검색으로 사용하고, 확신도가 낮으면 Knowledge Base로 넘깁니다.
+
+- BM25 역색인: 한국어 조사 제거 + 한글 문자 bigram 토큰화 (형태소 분석기 없이 복합어 부분 일치)
+- 벡터 검색: 정규화된 임베딩 행렬(embeddings.npy)을 memory-map으로 읽어 코사인 유사도 계산 (NumPy 필요)
+- 하이브리드 점수: 벡터 가중치 × 코사인 + (1 - 가중치) × BM25/최고 BM25
+- 확신도: 최상위 문서의 질의 단어 IDF 가중 커버리지 또는 코사인 유사도가 임계값 이상이면 확신
+- 결과는 retrieve 응답(retrievalResults)과 같은 형식이므로 기존 후처리를 그대로 사용
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from retrieval_cache import TTLCache, normalize_query
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+EMBEDDINGS_FILE = 'embeddings.npy'
+INDEX_FORMAT_VERSION = 1
+
+# 길이가 긴 것부터 제거 (예: '에서는'을 '는'보다 먼저)
+_JOSA_SUFFIXES = tuple(sorted((
+    '은', '는', '이', '가', '을', '를', '의', '에', '와', '과', '도', '만', '로', '으로', '에서', '에게', '까지',
+    '부터', '처럼', '보다', '에는', '에서는', '으로는', '로는', '이나', '나', '이란', '란', '인가요', '인가', '은요', '는요',
+    '하나요', '나요', '인지', '이야', '야', '이에요', '예요', '입니까', '인데',
+), key=len, reverse=True))
+_HANGUL_WORD = re.compile(r'^[가-힣]+$')
+# 질의에서만 제외하는 질문 표현 (문서에 없어 커버리지를 낮추는 단어)
+QUERY_STOPWORDS = frozenset((
+    '알려줘', '알려주세요', '알려줄래', '뭐야', '뭐예요', '뭔가요', '무엇', '무엇인가요', '어떻게', '어떤', '언제',
+    '있나요', '있어', '있어요', '되나요', '하나요', '할까요', '돼', '돼요', '해줘', '해주세요', '좀', '제', '저', '내', '관련', '대해',
+    '대해서', '궁금해', '궁금해요', '궁금합니다', 'what', 'how', 'is', 'are', 'the', 'a', 'an', 'of', 'to',
+))
+
+Embedder = Callable[[str], Sequence[float]]
+
+
+def strip_josa(word: str) -> str:
+    """한글 단어 끝의 조사를 제거합니다. 남는 어간이 2자 미만이면 그대로 둡니다."""
+    for suffix in _JOSA_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            return word[:-len(suffix)]
+    return word
+
+
+def word_terms(word: str) -> Tuple[str, List[str], List[str]]:
+    """정규화된 단어 하나의 (어간, 단어/어간 토큰, 문자 bigram)을 반환합니다."""
+    if not _HANGUL_WORD.match(word):
+        return word, [word], []
+    stem = strip_josa(word)
+    exact = [word, stem] if stem != word else [word]
+    bigrams = [stem[i:i + 2] for i in range(len(stem) - 1)] if len(stem) > 2 else []
+    return stem, exact, bigrams
+
+
+def tokenize(text: str) -> List[str]:
+    """BM25용 토큰 목록을 반환합니다.
+
+    정규화된 단어와 조사를 제거한 어간, 그리고 3자 이상 한글 어간의 문자 bigram을 함께 사용하여
+    "연차휴가는"이 "연차 휴가" 질의와도 일치하도록 합니다.
+    """
+    tokens: List[str] = []
+    for word in normalize_query(text).split():
+        _, exact, bigrams = word_terms(word)
+        tokens.extend(exact)
+        tokens.extend(bigrams)
+    return tokens
+
+
+def chunk_text(text: str, max_chars: int = 800, overlap: int = 100) -> List[str]:
+    """문단 경계를 우선하여 텍스트를 max_chars 이하 청크로 나눕니다."""
+    paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text or '') if p.strip()]
+    chunks: List[str] = []
+    current = ''
+    for paragraph in paragraphs:
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars - overlap:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = current[-overlap:] + '\n\n' + paragraph if overlap else paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class BedrockEmbedder:
+    """Bedrock Titan Text Embeddings 호출기입니다. 정규화된 임베딩 벡터를 반환합니다.
+
+    Args:
+        model_id: 임베딩 모델 ID (예: amazon.titan-embed-text-v2:0)
+        region_name: 모델 호출 리전
+        dimensions: 임베딩 차원 (Titan v2: 256/512/1024)
+    """
+
+    def __init__(self, model_id: str, region_name: str, dimensions: int = 1024):
+        self.model_id = model_id
+        self.region_name = region_name
+        self.dimensions = dimensions
+        self._client = None
+
+    def __call__(self, text: str) -> List[float]:
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('bedrock-runtime', region_name=self.region_name)
+        response = self._client.invoke_model(
+            modelId=self.model_id,
+            body=json.dumps({'inputText': text, 'dimensions': self.dimensions, 'normalize': True}),
+            contentType='application/json',
+            accept='application/json'
+        )
+        return json.loads(response['body'].read())['embedding']
+
+
+@dataclass
+class LocalSearchResult:
+    """로컬 인덱스 검색 결과입니다.
+
+    Attributes:
+        results: retrievalResults 형식의 항목 리스트
+        confident: Knowledge Base 재검색 없이 사용해도 되는지 여부
+        coverage: 최상위 문서의 질의 단어 IDF 가중 커버리지 (0~1)
+        similarity: 최상위 문서의 코사인 유사도 (벡터 검색 미사용 시 None)
+        elapsed_ms: 검색 소요 시간(ms)
+    """
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    confident: bool = False
+    coverage: float = 0.0
+    similarity: Optional[float] = None
+    elapsed_ms: float = 0.0
+
+
+class LocalIndex:
+    """BM25 역색인과 (선택) 임베딩 행렬로 구성된 읽기 전용 검색 인덱스입니다.
+
+    Args:
+        documents: 청크 목록 ({'text', 'location', 'metadata'})
+        postings: 토큰별 (문서 번호 리스트, 빈도 리스트)
+        lengths: 문서별 토큰 수
+        embeddings: (문서 수 × 차원) 정규화 임베딩 행렬 (없으면 BM25만 사용)
+        embedder: 질의 임베딩 함수 (embeddings가 있을 때 필요)
+        k1, b: BM25 파라미터
+        min_coverage: 이 커버리지 이상이면 확신
+        min_similarity: 이 코사인 유사도 이상이면 확신
+        vector_weight: 하이브리드 점수에서 벡터 점수 비중
+    """
+
+    def __init__(
+        self,
+        documents: List[Dict[str, Any]],
+        postings: Dict[str, Tuple[List[int], List[int]]],
+        lengths: List[int],
+        embeddings: Any = None,
+        embedder: Optional[Embedder] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        min_coverage: float = 0.6,
+        min_similarity: float = 0.55,
+        vector_weight: float = 0.5
+    ):
+        self.documents = documents
+        self.postings = postings
+        self.lengths = lengths
+        self.embeddings = embeddings if embedder is not None else None
+        self.embedder = embedder
+        self.k1 = k1
+        self.b = b
+        self.min_coverage = min_coverage
+        self.min_similarity = min_similarity
+        self.vector_weight = vector_weight
+        self.average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        self._query_embeddings = TTLCache(max_size=256, ttl_seconds=3600)
+        self._doc_sets: Dict[str, frozenset] = {}
+
+    @property
+    def uses_vectors(self) -> bool:
+        return self.embeddings is not None
+
+    def idf(self, token: str) -> float:
+        """BM25 IDF입니다. 인덱스에 없는 토큰은 문서 빈도 1로 계산하여 가장 드문 토큰과 같게 취급합니다."""
+        document_frequency = len(self.postings[token][0]) if token in self.postings else 1
+        count = len(self.documents)
+        return math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _bm25(self, tokens: List[str]) -> Dict[int, float]:
+        """문서별 BM25 점수를 반환합니다."""
+        scores: Dict[int, float] = {}
+        for token in tokens:
+            if token not in self.postings:
+                continue
+            idf = self.idf(token)
+            doc_ids, frequencies = self.postings[token]
+            for doc_id, frequency in zip(doc_ids, frequencies):
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / (self.average_length or 1.0))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def _coverage(self, words: List[Tuple[str, List[str], List[str]]], doc_id: int) -> float:
+        """질의 단어가 문서에 포함된 비율을 어간 IDF로 가중 평균합니다.
+
+        단어 또는 어간이 있으면 1, 없으면 포함된 bigram 비율을 부분 점수로 사용합니다.
+        """
+        def contains(token: str) -> bool:
+            return token in self.postings and doc_id in self._doc_sets.setdefault(
+                token, frozenset(self.postings[token][0])
+            )
+
+        covered = total = 0.0
+        for stem, exact, bigrams in words:
+            # 인덱스에 없는 단어는 가장 드문 단어와 같은 가중치 (idf 참고)
+            weight = self.idf(stem)
+            total += weight
+            if any(contains(token) for token in exact):
+                covered += weight
+            elif bigrams:
+                covered += weight * sum(contains(token) for token in bigrams) / len(bigrams)
+        return covered / total if total else 0.0
+
+    def _cosine(self, query: str, limit: int) -> Dict[int, float]:
+        """코사인 유사도 상위 limit개 문서를 반환합니다."""
+        import numpy as np
+
+        key = normalize_query(query)
+        vector = self._query_embeddings.get(key)
+        if vector is None:
+            vector = np.asarray(self.embedder(query), dtype=np.float32)
+            norm = float(np.linalg.norm(vector))
+            vector = vector / norm if norm else vector
+            self._query_embeddings.put(key, vector)
+
+        similarities = self.embeddings @ vector
+        limit = min(limit, len(similarities))
+        top = np.argpartition(-similarities, limit - 1)[:limit] if limit else []
+        return {int(doc_id): float(similarities[doc_id]) for doc_id in top}
+
+    def search(self, query: str, number_of_results: int = 5) -> LocalSearchResult:
+        """질의로 문서를 검색합니다. 결과는 retrieve 응답과 같은 형식입니다."""
+        started_at = time.perf_counter()
+        words = [word_terms(word) for word in normalize_query(query).split() if word not in QUERY_STOPWORDS]
+        tokens = list(dict.fromkeys(token for _, exact, bigrams in words for token in exact + bigrams))
+        if not tokens or not self.documents:
+            return LocalSearchResult(elapsed_ms=(time.perf_counter() - started_at) * 1000)
+
+        bm25 = self._bm25(tokens)
+        top_bm25 = max(bm25.values(), default=0.0)
+
+        similarities: Dict[int, float] = {}
+        if self.uses_vectors:
+            try:
+                similarities = self._cosine(query, number_of_results * 2)
+            except Exception as e:
+                logger.warning("[Local Index] Vector search failed, using BM25 only: %s", e)
+
+        weight = self.vector_weight if similarities else 0.0
+        combined: Dict[int, float] = {}
+        for doc_id in set(bm25) | set(similarities):
+            lexical = bm25.get(doc_id, 0.0) / top_bm25 if top_bm25 else 0.0
+            combined[doc_id] = weight * max(0.0, similarities.get(doc_id, 0.0)) + (1 - weight) * lexical
+
+        ranked = sorted(combined.items(), key=lambda pair: pair[1], reverse=True)[:number_of_results]
+        results = []
+        for doc_id, score in ranked:
+            document = self.documents[doc_id]
+            results.append({
+                'content': {'text': document['text'], 'type': 'TEXT'},
+                'location': document.get('location') or {},
+                'metadata': document.get('metadata') or {},
+                'score': round(score, 4),
+            })
+
+        coverage, similarity = 0.0, None
+        if ranked:
+            best = ranked[0][0]
+            coverage = self._coverage(words, best)
+            similarity = similarities.get(best) if similarities else None
+        confident = bool(ranked) and (
+            coverage >= self.min_coverage or (similarity is not None and similarity >= self.min_similarity)
+        )
+        return LocalSearchResult(
+            results=results,
+            confident=confident,
+            coverage=round(coverage, 4),
+            similarity=round(similarity, 4) if similarity is not None else None,
+            elapsed_ms=(time.perf_counter() - started_at) * 1000
+        )
+
+    @classmethod
+    def load(cls, path: str, embedder: Optional[Embedder] = None, **options: Any) -> 'LocalIndex':
+        """build_index로 저장한 인덱스 디렉터리를 읽습니다.
+
+        임베딩 행렬은 memory-map으로 열어 필요한 페이지만 읽습니다.
+        NumPy가 없거나 embedder가 없으면 BM25만 사용합니다.
+        """
+        with open(os.path.join(path, INDEX_FILE), encoding='utf-8') as index_file:
+            data = json.load(index_file)
+        if data.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported local index version: {data.get('version')}")
+
+        embeddings = None
+        embeddings_path = os.path.join(path, EMBEDDINGS_FILE)
+        if embedder is not None and os.path.exists(embeddings_path):
+            try:
+                import numpy as np
+                embeddings = np.load(embeddings_path, mmap_mode='r')
+            except ImportError:
+                logger.warning("[Local Index] numpy not available, vector search disabled")
+
+        postings = {token: (entry[0], entry[1]) for token, entry in data['postings'].items()}
+        params = data.get('bm25', {})
+        return cls(
+            documents=data['documents'],
+            postings=postings,
+            lengths=data['lengths'],
+            embeddings=embeddings,
+            embedder=embedder if embeddings is not None else None,
+            k1=params.get('k1', 1.2),
+            b=params.get('b', 0.75),
+            **options
+        )
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """인덱스의 메타 정보(문서 수, 임베딩 모델 등)를 반환합니다."""
+    with open(os.path.join(path, INDEX_FILE), encoding='utf-8') as index_file:
+        data = json.load(index_file)
+    return {key: value for key, value in data.items() if key not in ('documents', 'postings', 'lengths')}
+
+
+def build_index(
+    documents: List[Dict[str, Any]],
+    output_dir: str,
+    embedder: Optional[Embedder] = None,
+    embedding_model: str = '',
+    k1: float = 1.2,
+    b: float = 0.75
+) -> Dict[str, Any]:
+    """청크 목록으로 인덱스를 만들어 output_dir에 저장하고 메타 정보를 반환합니다.
+
+    Args:
+        documents: 청크 목록 ({'text', 'location', 'metadata'})
+        output_dir: 인덱스 디렉터리 (index.json, embeddings.npy)
+        embedder: 청크 임베딩 함수 (없으면 BM25만 저장)
+        embedding_model: 질의 임베딩에 사용할 모델 ID (메타 정보에 기록)
+    """
+    postings: Dict[str, Tuple[List[int], List[int]]] = {}
+    lengths: List[int] = []
+    for doc_id, document in enumerate(documents):
+        tokens = tokenize(document['text'])
+        lengths.append(len(tokens))
+        for token, frequency in Counter(tokens).items():
+            entry = postings.setdefault(token, ([], []))
+            entry[0].append(doc_id)
+            entry[1].append(frequency)
+
+    os.makedirs(output_dir, exist_ok=True)
+    dimensions = 0
+    embeddings_path = os.path.join(output_dir, EMBEDDINGS_FILE)
+    if embedder is not None and documents:
+        import numpy as np
+        matrix = np.asarray([embedder(document['text']) for document in documents], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+        np.save(embeddings_path, matrix)
+        dimensions = int(matrix.shape[1])
+    elif os.path.exists(embeddings_path):
+        os.remove(embeddings_path)
+
+    manifest = {
+        'version': INDEX_FORMAT_VERSION,
+        'created_at': int(time.time()),
+        'document_count': len(documents),
+        'token_count': len(postings),
+        'bm25': {'k1': k1, 'b': b},
+        'embedding_model': embedding_model if dimensions else '',
+        'dimensions': dimensions,
+    }
+    data = dict(manifest, documents=[
+        {'text': document['text'], 'location': document.get('location') or {}, 'metadata': document.get('metadata') or {}}
+        for document in documents
+    ], lengths=lengths, postings={token: [ids, freqs] for token, (ids, freqs) in postings.items()})
+    with open(os.path.join(output_dir, INDEX_FILE), 'w', encoding='utf-8') as index_file:
+        json.dump(data, index_file, ensure_ascii=False, separators=(',', ':'))
+    return manifest
@@ -0,0 +1,146 @@
+"""
+Model Router - 요청 난이도별 모델 라우팅
+
+인사말이나 단일 사실 조회처럼 간단한 질문은 작고 빠른 모델(fast tier)로 처리하고,
+계산이 필요하거나 복잡한 질문은 기본 모델(default tier)로 보냅니다.
+fast tier 답변이 확신도/근거 검사를 통과하지 못하면 기본 모델로 다시 실행(승격)합니다.
+
+- 분류: 질문 길이, 인사말/복잡도 키워드, 숫자 포함 여부(계산 필요)
+- 검사: 빈 답변, 불확실 표현, 검색 미수행, 검색 결과에 없는 숫자, 검색 결과와의 문자 shingle 겹침 비율
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from retrieval_cache import normalize_query
+
+FAST_TIER = 'fast'
+DEFAULT_TIER = 'default'
+
+# 짧은 인사말/감사 표현
+GREETING_KEYWORDS = ('안녕', '감사', '고마', '반가', '수고', 'hello', 'hi', 'thanks', 'thank you')
+# 여러 문서를 비교하거나 추론이 필요한 질문
+COMPLEX_KEYWORDS = ('계산', '얼마', '수당', '퇴직금', '세금', '비교', '차이', '만약', '경우', '왜', '모든', '전부')
+# 모델이 확신하지 못할 때 쓰는 표현
+HEDGE_PHRASES = ('잘 모르', '확실하지 않', '정확하지 않을 수', '추측', '아마도', "i'm not sure", 'i am not sure')
+
+_NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)*')
+_SHINGLE_SIZE = 3
+
+
+@dataclass
+class RouteDecision:
+    """라우팅 결과입니다. escalated는 fast tier 답변이 검사에 실패하여 기본 모델로 재실행한 경우입니다."""
+    tier: str
+    reason: str
+    escalated: bool = False
+    escalation_reason: Optional[str] = None
+
+    def escalate(self, reason: str) -> None:
+        self.tier = DEFAULT_TIER
+        self.escalated = True
+        self.escalation_reason = reason
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _numbers(text: str) -> FrozenSet[str]:
+    return frozenset(number.replace(',', '') for number in _NUMBER_PATTERN.findall(text or ''))
+
+
+def _shingles(text: str) -> FrozenSet[str]:
+    normalized = normalize_query(text).replace(' ', '')
+    if len(normalized) <= _SHINGLE_SIZE:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(normalized[i:i + _SHINGLE_SIZE] for i in range(len(normalized) - _SHINGLE_SIZE + 1))
+
+
+def tool_result_texts(messages: List[Dict[str, Any]]) -> List[str]:
+    """메시지에서 도구 결과 텍스트를 추출합니다."""
+    texts = []
+    for message in messages:
+        for block in message.get('content', []):
+            tool_result = block.get('toolResult') if isinstance(block, dict) else None
+            if tool_result:
+                texts.extend(item['text'] for item in tool_result.get('content', []) if 'text' in item)
+    return texts
+
+
+class ModelRouter:
+    """질문을 fast/default tier로 분류하고 fast tier 답변을 검사합니다.
+
+    Args:
+        enabled: fast tier 모델이 설정된 경우 True
+        simple_max_chars: 이 길이 이하의 질문만 fast tier 후보
+        min_grounding: 답변 shingle 중 검색 결과에 포함되어야 하는 최소 비율
+    """
+
+    def __init__(self, enabled: bool, simple_max_chars: int = 60, min_grounding: float = 0.2):
+        self.enabled = enabled
+        self.simple_max_chars = simple_max_chars
+        self.min_grounding = min_grounding
+
+    def route(self, user_message: str) -> RouteDecision:
+        """질문의 길이와 키워드로 처리할 모델 tier를 결정합니다."""
+        if not self.enabled:
+            return RouteDecision(DEFAULT_TIER, 'routing_disabled')
+
+        text = normalize_query(user_message)
+        if len(text) <= 20 and any(keyword in text for keyword in GREETING_KEYWORDS):
+            return RouteDecision(FAST_TIER, 'greeting')
+        if _numbers(user_message):
+            return RouteDecision(DEFAULT_TIER, 'calculation')
+        if any(keyword in text for keyword in COMPLEX_KEYWORDS):
+            return RouteDecision(DEFAULT_TIER, 'complex_keyword')
+        if len(user_message) > self.simple_max_chars or user_message.count('?') > 1:
+            return RouteDecision(DEFAULT_TIER, 'long_question')
+        return RouteDecision(FAST_TIER, 'simple_lookup')
+
+    def check_answer(
+        self,
+        user_message: str,
+        answer: str,
+        turn_messages: List[Dict[str, Any]],
+        decision: RouteDecision
+    ) -> Optional[str]:
+        """fast tier 답변을 검사합니다. 승격이 필요하면 사유를, 통과하면 None을 반환합니다.
+
+        Args:
+            user_message: 사용자 질문
+            answer: fast tier 모델의 최종 답변 텍스트
+            turn_messages: 이번 질문에서 추가된 메시지 (도구 호출/결과 포함)
+            decision: 라우팅 결과
+        """
+        if not answer.strip():
+            return 'empty_answer'
+
+        lowered = answer.lower()
+        if any(phrase in lowered for phrase in HEDGE_PHRASES):
+            return 'low_confidence'
+
+        if decision.reason == 'greeting':
+            return None
+
+        # 인사말 외에는 반드시 문서 검색을 거쳐야 함 (시스템 프롬프트 업무 절차)
+        sources = tool_result_texts(turn_messages)
+        if not sources:
+            return 'no_retrieval'
+
+        source_text = '\n'.join(sources)
+        # 한 자리 숫자는 목록 번호 등으로 흔히 쓰이므로 제외
+        answer_numbers = {number for number in _numbers(answer) if len(number) > 1}
+        if answer_numbers - _numbers(source_text) - _numbers(user_message):
+            return 'ungrounded_number'
+
+        answer_shingles = _shingles(answer)
+        if answer_shingles:
+            coverage = len(answer_shingles & _shingles(source_text)) / len(answer_shingles)
+            if coverage < self.min_grounding:
+                return 'low_grounding'
+        return None
@@ -0,0 +1,168 @@
+"""
+Prefetch - 첫 모델 턴과 겹치는 Knowledge Base 선행 검색
+
+시스템 프롬프트가 모든 질문에서 search_hr_documents를 먼저 호출하도록 하므로,
+요청마다 도구 호출을 만드는 모델 턴 하나가 끝난 뒤에야 retrieve가 시작됩니다.
+요청이 도착하면 원문 질문으로 retrieve를 백그라운드에서 먼저 시작해 두고,
+모델이 요청한 검색어가 원문 질문과 충분히 겹치면 도구가 그 결과를 사용합니다.
+
+- 요청 단위 슬롯은 contextvars로 전달 (도구 함수에서 별도 인자 없이 사용)
+- 검색어 토큰 중 원문 질문에 포함된 비율(겹침 비율)로 일치 여부 판단
+- 요청별 결과(hit/miss/unused/error) 카운터 및 hit 비율
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from local_index import tokenize
+from request_metrics import timed
+from structured_logging import prompt_text
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_HIT = 'hit'
+PREFETCH_MISS = 'miss'
+PREFETCH_UNUSED = 'unused'
+PREFETCH_ERROR = 'error'
+
+_current_slot: contextvars.ContextVar[Optional["PrefetchSlot"]] = contextvars.ContextVar(
+    "prefetch_slot", default=None
+)
+
+
+def query_overlap(query: str, source: str) -> float:
+    """query 토큰 중 source에도 있는 토큰의 비율을 반환합니다 (0.0 ~ 1.0)."""
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        return 0.0
+    return len(query_terms & set(tokenize(source))) / len(query_terms)
+
+
+class PrefetchSlot:
+    """요청 하나의 선행 검색 결과를 보관합니다."""
+
+    def __init__(self, query: str, future: "Future[Any]"):
+        self.query = query
+        self.future = future
+        self.consumed = False
+        self.missed = False
+        self.failed = False
+
+
+class Prefetcher:
+    """원문 질문으로 검색을 미리 시작하고, 일치하는 도구 검색어에 결과를 넘겨줍니다.
+
+    Args:
+        fetch: 검색 함수 (질의 → 검색 결과)
+        max_workers: 선행 검색 스레드 수 (0 이하이면 비활성화)
+        min_overlap: 결과를 사용할 최소 검색어 겹침 비율
+    """
+
+    def __init__(self, fetch: Callable[[str], Any], max_workers: int = 4, min_overlap: float = 0.6):
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.min_overlap = min_overlap
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.unused = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def start(self, query: str) -> Optional[PrefetchSlot]:
+        """백그라운드 검색을 시작합니다. 현재 컨텍스트(요청 메트릭 등)를 복사하여 실행합니다."""
+        if not self.enabled or not query.strip():
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kb-prefetch")
+            self.started += 1
+        future = self._executor.submit(contextvars.copy_context().run, self.fetch, query)
+        return PrefetchSlot(query, future)
+
+    @contextmanager
+    def scope(self, slot: Optional[PrefetchSlot]) -> Iterator[Optional[PrefetchSlot]]:
+        """블록 실행 동안 slot을 현재 요청의 선행 검색 슬롯으로 설정합니다."""
+        token = _current_slot.set(slot)
+        try:
+            yield slot
+        finally:
+            _current_slot.reset(token)
+
+    def take(self, query: str) -> Optional[Any]:
+        """
+        현재 요청의 선행 검색 결과가 query와 일치하면 (필요하면 완료를 기다려) 반환합니다.
+        결과는 요청당 한 번만 사용되며, 일치하지 않거나 실패하면 None을 반환합니다.
+        """
+        slot = _current_slot.get()
+        if slot is None:
+            return None
+
+        overlap = query_overlap(query, slot.query)
+        with self._lock:
+            if slot.consumed or slot.failed:
+                return None
+            if overlap < self.min_overlap:
+                slot.missed = True
+                logger.info("[Prefetch] Miss (overlap=%.2f): %s", overlap, prompt_text(query))
+                return None
+            slot.consumed = True
+
+        try:
+            with timed('prefetch_wait'):
+                results = slot.future.result()
+        except Exception as e:
+            logger.error("[Prefetch] Background retrieve failed: %s", e)
+            with self._lock:
+                slot.consumed = False
+                slot.failed = True
+            return None
+        logger.info("[Prefetch] Hit (overlap=%.2f)", overlap)
+        return results
+
+    def finish(self, slot: Optional[PrefetchSlot]) -> Optional[str]:
+        """요청 종료 시 선행 검색 결과(hit/miss/unused/error)를 집계하여 반환합니다."""
+        if slot is None:
+            return None
+        with self._lock:
+            if slot.consumed:
+                outcome = PREFETCH_HIT
+                self.hits += 1
+            elif slot.failed:
+                outcome = PREFETCH_ERROR
+                self.errors += 1
+            elif slot.missed:
+                outcome = PREFETCH_MISS
+                self.misses += 1
+            else:
+                outcome = PREFETCH_UNUSED
+                self.unused += 1
+        # 아직 시작되지 않은 검색은 취소 (실행 중인 검색은 완료 후 검색 캐시에 남음)
+        slot.future.cancel()
+        return outcome
+
+    def stats(self) -> Dict[str, Any]:
+        """선행 검색 카운터를 반환합니다."""
+        with self._lock:
+            finished = self.hits + self.misses + self.unused + self.errors
+            return {
+                'started': self.started,
+                'hits': self.hits,
+                'misses': self.misses,
+                'unused': self.unused,
+                'errors': self.errors,
+                'hit_ratio': round(self.hits / finished, 4) if finished else 0.0,
+            }
@@ -0,0 +1,165 @@
+"""
+Request Metrics - 요청 단위 지연 시간 및 토큰 계측
+
+AgentCore 요청 하나를 처리하는 동안 단계별 소요 시간과 토큰 사용량을 수집하여
+invoke 응답의 `metrics` 필드로 반환합니다. Lambda Bridge는 이 값을
+CloudWatch Embedded Metric Format으로 기록하여 단계별 p50/p99를 확인할 수 있게 합니다.
+
+- 단계: agent_init, retrieve, prefetch_wait, model_turn, calculator (호출 횟수, 합계, 최대 ms)
+- 토큰: 입력, 출력, 프롬프트 캐시 읽기/쓰기
+- 이벤트 루프 사이클 수 및 도구 호출 수
+- 이벤트 카운터 (검색 헤지 발생/승리, 검색 대체 결과 사용 등)
+- 모델 라우팅 결과 (tier, 사유, 승격 여부)
+
+현재 요청의 메트릭은 contextvars로 전달되므로 도구 함수에서 별도 인자 없이 기록할 수 있습니다.
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from strands.hooks import AfterModelCallEvent, BeforeModelCallEvent, HookProvider, HookRegistry
+
+_current_metrics: contextvars.ContextVar[Optional["RequestMetrics"]] = contextvars.ContextVar(
+    "request_metrics", default=None
+)
+
+
+class RequestMetrics:
+    """요청 하나의 단계별 소요 시간과 토큰 사용량을 수집합니다.
+
+    도구가 여러 스레드에서 동시에 실행될 수 있으므로 기록은 잠금으로 보호합니다.
+    """
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self._stages: Dict[str, List[float]] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.tokens: Dict[str, int] = {'input': 0, 'output': 0, 'cache_read': 0, 'cache_write': 0}
+        self.cycles = 0
+        self.tool_calls = 0
+        self.cached = False
+        self.coalesced = False  # 동시에 실행 중인 같은 질문의 결과를 공유했는지 여부
+        self.prefetch: Optional[str] = None  # 선행 검색 결과 (hit | miss | unused | error)
+        self.stopped_by: Optional[str] = None  # 예산 초과로 실행을 중단한 사유 (deadline | iterations)
+        self.route: Optional[Any] = None  # 모델 라우팅 결과 (to_dict() 지원 객체)
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        """단계 소요 시간(ms)을 기록합니다."""
+        with self._lock:
+            self._stages.setdefault(stage, []).append(elapsed_ms)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """이벤트 카운터를 증가시킵니다."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """블록 실행 시간을 단계 소요 시간으로 기록합니다 (예외 발생 시에도 기록)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def record_agent_result(self, result: Any) -> None:
+        """Strands AgentResult의 누적 토큰 사용량과 사이클/도구 호출 수를 반영합니다."""
+        loop_metrics = getattr(result, 'metrics', None)
+        if loop_metrics is None:
+            return
+
+        usage = getattr(loop_metrics, 'accumulated_usage', None) or {}
+        self.tokens['input'] += usage.get('inputTokens', 0)
+        self.tokens['output'] += usage.get('outputTokens', 0)
+        self.tokens['cache_read'] += usage.get('cacheReadInputTokens', 0)
+        self.tokens['cache_write'] += usage.get('cacheWriteInputTokens', 0)
+        self.cycles += getattr(loop_metrics, 'cycle_count', 0)
+        tool_metrics = getattr(loop_metrics, 'tool_metrics', None) or {}
+        self.tool_calls += sum(getattr(metric, 'call_count', 0) for metric in tool_metrics.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """응답 `metrics` 필드용 딕셔너리를 반환합니다."""
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': len(samples),
+                    'total_ms': round(sum(samples), 2),
+                    'max_ms': round(max(samples), 2),
+                }
+                for stage, samples in self._stages.items()
+            }
+            counters = dict(self._counters)
+        return {
+            'total_ms': round((time.perf_counter() - self._start) * 1000, 2),
+            'stages': stages,
+            'counters': counters,
+            'tokens': dict(self.tokens),
+            'cycles': self.cycles,
+            'tool_calls': self.tool_calls,
+            'cached': self.cached,
+            'coalesced': self.coalesced,
+            'prefetch': self.prefetch,
+            'stopped_by': self.stopped_by,
+            'route': self.route.to_dict() if self.route is not None else None,
+        }
+
+
+class ModelTurnTimer(HookProvider):
+    """Agent 훅으로 모델 호출(턴)마다 소요 시간을 기록합니다."""
+
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+        self._started_at: Optional[float] = None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._after_model_call)
+
+    def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        self._started_at = time.perf_counter()
+
+    def _after_model_call(self, event: AfterModelCallEvent) -> None:
+        if self._started_at is not None:
+            self.metrics.record('model_turn', (time.perf_counter() - self._started_at) * 1000)
+            self._started_at = None
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """현재 컨텍스트에서 처리 중인 요청의 메트릭을 반환합니다."""
+    return _current_metrics.get()
+
+
+@contextmanager
+def activate(metrics: Optional[RequestMetrics]) -> Iterator[Optional[RequestMetrics]]:
+    """블록 실행 동안 metrics를 현재 요청의 메트릭으로 설정합니다."""
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """현재 요청의 메트릭에 단계 소요 시간을 기록합니다 (요청 컨텍스트 밖에서는 아무것도 하지 않음)."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.timer(stage):
+        yield
+
+
+def count(name: str, amount: int = 1) -> None:
+    """현재 요청의 메트릭에 이벤트 카운터를 기록합니다 (요청 컨텍스트 밖에서는 아무것도 하지 않음)."""
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.increment(name, amount)
@@ -0,0 +1,321 @@
+"""
+Resilient Retrieval - 헤지 요청과 서킷 브레이커를 적용한 Knowledge Base 검색
+
+교차 리전 Knowledge Base가 느려지면 retrieve 한 번이 기본 재시도와 함께 수십 초를 잡아먹고,
+오류 문자열을 받은 모델이 도구를 다시 호출하여 지연이 두 배가 됩니다.
+
+- 헤지 요청: 최근 retrieve 지연 시간의 백분위수(p95)만큼 기다려도 응답이 없으면 같은 요청을 한 번 더 보내고
+  먼저 도착한 응답을 사용 (헤지 전에 첫 요청이 실패하면 즉시 한 번 더 시도)
+- 오류 분류: 시간 초과, 연결 오류, 요청 수 제한, 5xx처럼 일시적인 오류만 헤지하고 실패로 집계하며,
+  권한/요청/리소스 오류(AccessDenied, Validation, ResourceNotFound 등)는 다시 시도하지 않고 즉시 전달
+- 서킷 브레이커: 연속 실패가 임계값에 도달하면 일정 시간 동안 호출하지 않고 즉시 실패,
+  이후 요청 하나로 복구 여부 확인 (half-open)
+- 헤지 발생/승리, 실패, 즉시 전달한 오류, 차단 카운터 및 현재 헤지 지연 시간
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from request_metrics import count
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+RETRIEVAL_UNAVAILABLE_MESSAGE = (
+    "검색 서비스가 일시적으로 응답하지 않습니다. 검색 도구를 다시 호출하지 말고, "
+    "HR 문서를 확인하지 못했다고 안내한 뒤 잠시 후 다시 질문하거나 인사팀에 문의하도록 답변하세요."
+)
+
+# 다시 시도하면 성공할 수 있는 오류 코드 (그 외 코드는 권한/요청/리소스 문제로 보고 즉시 실패)
+TRANSIENT_ERROR_CODES = frozenset({
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'InternalServerException',
+    'DependencyFailedException',
+    'BadGatewayException',
+    'RequestTimeout',
+    'RequestTimeoutException',
+})
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷 브레이커가 열려 있어 호출하지 않은 경우 발생합니다."""
+
+
+class RetrievalUnavailableError(RuntimeError):
+    """검색에 실패했고 대신 사용할 캐시/로컬 결과도 없는 경우 발생합니다."""
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """시간 초과, 연결 오류, 요청 수 제한(429), 5xx처럼 다시 시도하면 성공할 수 있는 오류인지 판단합니다."""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        code = response.get('Error', {}).get('Code')
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return code in TRANSIENT_ERROR_CODES or status == 429 or status >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        from botocore.exceptions import ConnectionError as BotoConnectionError, HTTPClientError
+    except ImportError:
+        return False
+    # EndpointConnectionError, ConnectTimeoutError, ReadTimeoutError, ConnectionClosedError 등
+    return isinstance(error, (BotoConnectionError, HTTPClientError))
+
+
+class LatencyWindow:
+    """최근 성공한 호출의 지연 시간(ms)을 보관하고 백분위수를 계산합니다.
+
+    Args:
+        size: 보관할 최대 표본 수
+    """
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def add(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self._samples.append(elapsed_ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """최근접 순위 백분위수를 반환합니다 (표본이 없으면 None)."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커입니다.
+
+    Args:
+        failure_threshold: 회로를 여는 연속 실패 횟수 (0 이하이면 비활성화)
+        reset_seconds: 회로를 연 뒤 복구 확인 요청을 허용하기까지의 시간(초)
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opens = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """호출 가능 여부를 반환합니다. half-open 상태에서는 복구 확인 요청 하나만 허용합니다."""
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == STATE_OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self.state = STATE_HALF_OPEN
+                self._probing = False
+            if self.state == STATE_HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != STATE_CLOSED:
+                logger.info("[Circuit] Closed (retrieve recovered)")
+            self.state = STATE_CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == STATE_HALF_OPEN or (self.state == STATE_CLOSED and self.failures >= self.failure_threshold):
+                self.state = STATE_OPEN
+                self._opened_at = time.monotonic()
+                self.opens += 1
+                logger.warning(
+                    "[Circuit] Opened after %s consecutive failures (retrying in %.0fs)",
+                    self.failures, self.reset_seconds
+                )
+
+    def release(self) -> None:
+        """성공/실패로 집계하지 않고 복구 확인 요청 슬롯만 반납합니다 (일시적이지 않은 오류)."""
+        with self._lock:
+            self._probing = False
+
+
+class ResilientRetriever:
+    """Knowledge Base retrieve 호출에 헤지 요청과 서킷 브레이커를 적용합니다.
+
+    Args:
+        client_factory: bedrock-agent-runtime 클라이언트를 반환하는 함수 (연결/읽기 제한 시간 설정 권장)
+        hedge_percentile: 헤지 지연 시간으로 사용할 지연 시간 백분위수 (0 이하이면 헤지 비활성화)
+        hedge_delay_ms: 표본이 min_samples보다 적을 때 사용할 헤지 지연 시간(ms)
+        min_hedge_delay_ms: 헤지 지연 시간 하한(ms)
+        min_samples: 백분위수를 사용하기 위한 최소 표본 수
+        breaker: 서킷 브레이커 (None이면 기본 설정)
+        max_workers: retrieve 호출 스레드 수
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        hedge_percentile: float = 95.0,
+        hedge_delay_ms: float = 800.0,
+        min_hedge_delay_ms: float = 50.0,
+        min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 16
+    ):
+        self.client_factory = client_factory
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay_ms = hedge_delay_ms
+        self.min_hedge_delay_ms = min_hedge_delay_ms
+        self.min_samples = min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = LatencyWindow()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kb-hedge")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+        self.rejected = 0
+        self.short_circuited = 0
+
+    @property
+    def hedging(self) -> bool:
+        return self.hedge_percentile > 0
+
+    def hedge_delay(self) -> float:
+        """헤지 요청을 보내기 전 대기 시간(초)을 반환합니다."""
+        delay_ms = self.hedge_delay_ms
+        if len(self.latencies) >= self.min_samples:
+            delay_ms = self.latencies.percentile(self.hedge_percentile) or delay_ms
+        return max(self.min_hedge_delay_ms, delay_ms) / 1000
+
+    def _attempt(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        response = self.client_factory().retrieve(**request)
+        self.latencies.add((time.perf_counter() - start) * 1000)
+        return response
+
+    def retrieve(self, **request: Any) -> Dict[str, Any]:
+        """retrieve를 호출하고 먼저 성공한 응답을 반환합니다.
+
+        Raises:
+            CircuitOpenError: 서킷 브레이커가 열려 있는 경우
+            retrieve 예외: 첫 요청과 헤지 요청이 모두 실패했거나, 일시적이지 않은 오류가 발생한 경우
+        """
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuited += 1
+            raise CircuitOpenError("Knowledge Base retrieve circuit is open")
+
+        with self._lock:
+            self.calls += 1
+        try:
+            response = self._first_success(request)
+        except Exception as e:
+            if not is_transient_error(e):
+                # 권한/요청 오류는 서비스 장애가 아니므로 회로를 열지 않음
+                with self._lock:
+                    self.rejected += 1
+                self.breaker.release()
+                raise
+            with self._lock:
+                self.failures += 1
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def _first_success(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        pending: Dict["Future[Dict[str, Any]]", bool] = {self._executor.submit(self._attempt, request): False}
+        hedge_at = time.monotonic() + self.hedge_delay() if self.hedging else None
+        errors: List[Exception] = []
+
+        while pending:
+            timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at is not None else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                self._hedge(pending, request, 'slow')
+                hedge_at = None
+                continue
+
+            for future in done:
+                is_hedge = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    if not is_transient_error(e):
+                        # 다시 보내도 같은 오류이므로 헤지하지 않고 바로 전달
+                        for other in pending:
+                            other.cancel()
+                        raise
+                    errors.append(e)
+                    continue
+                if is_hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                    count('retrieve_hedge_won')
+                # 늦게 도착하는 응답은 버림 (지연 시간 표본으로만 사용)
+                for other in pending:
+                    other.cancel()
+                return response
+
+            # 헤지 전에 첫 요청이 일시적인 오류로 실패하면 기다리지 않고 한 번 더 시도
+            if not pending and hedge_at is not None:
+                self._hedge(pending, request, 'error')
+                hedge_at = None
+
+        raise errors[-1]
+
+    def _hedge(self, pending: Dict["Future[Dict[str, Any]]", bool], request: Dict[str, Any], reason: str) -> None:
+        with self._lock:
+            self.hedges += 1
+        count('retrieve_hedged')
+        logger.info("[KB Hedge] Sending hedged retrieve (%s)", reason)
+        pending[self._executor.submit(self._attempt, request)] = True
+
+    def stats(self) -> Dict[str, Any]:
+        """헤지/서킷 브레이커 상태 및 카운터를 반환합니다."""
+        with self._lock:
+            stats = {
+                'calls': self.calls,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'short_circuited': self.short_circuited,
+            }
+        stats.update({
+            'hedge_delay_ms': round(self.hedge_delay() * 1000, 1) if self.hedging else None,
+            'circuit_state': self.breaker.state,
+            'circuit_opens': self.breaker.opens,
+        })
+        return stats
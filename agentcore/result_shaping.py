@@ -0,0 +1,220 @@
+"""
+Result Shaping - Knowledge Base 검색 결과 후처리
+
+search_hr_documents 도구 결과가 모델 입력 토큰을 불필요하게 늘리지 않도록
+retrieve 결과를 정리합니다.
+
+- 최소 관련도 점수 필터
+- 유사 청크 제거: 문자 shingle Jaccard 유사도 또는 MMR(Maximal Marginal Relevance)
+- 같은 출처 문서의 청크 병합
+- 도구 결과 토큰 예산 적용 및 절감 토큰 수 보고
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from conversation_store import estimate_tokens
+from retrieval_cache import normalize_query
+
+RESULT_SEPARATOR = "\n\n---\n\n"
+_TRUNCATION_MARK = " …(생략)"
+
+
+@dataclass
+class ShapingOptions:
+    """검색 결과 후처리 설정입니다.
+
+    Attributes:
+        min_score: 이 점수 미만의 결과는 제외
+        dedup_method: 'jaccard' | 'mmr' | 'none'
+        dedup_threshold: jaccard 방식에서 이 유사도 이상이면 중복으로 간주
+        mmr_lambda: MMR 관련도/다양성 가중치 (1.0이면 관련도만 고려)
+        max_results: 최대 결과 수 (MMR 선택 개수)
+        merge_by_source: 같은 출처의 청크를 하나로 병합
+        token_budget: 도구 결과 최대 토큰 수 (0 이하이면 제한 없음)
+        shingle_size: 유사도 계산용 문자 shingle 길이
+    """
+    min_score: float = 0.0
+    dedup_method: str = 'jaccard'
+    dedup_threshold: float = 0.8
+    mmr_lambda: float = 0.7
+    max_results: int = 5
+    merge_by_source: bool = True
+    token_budget: int = 1500
+    shingle_size: int = 3
+
+
+@dataclass
+class ShapedResult:
+    """후처리된 검색 결과와 통계입니다."""
+    text: str
+    documents: List[Dict[str, Any]] = field(default_factory=list)
+    original_count: int = 0
+    original_tokens: int = 0
+    shaped_tokens: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.original_tokens - self.shaped_tokens)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'original_count': self.original_count,
+            'shaped_count': len(self.documents),
+            'original_tokens': self.original_tokens,
+            'shaped_tokens': self.shaped_tokens,
+            'saved_tokens': self.saved_tokens,
+        }
+
+
+def get_source(item: Dict[str, Any]) -> Optional[str]:
+    """retrieve 결과 항목의 출처(URI)를 반환합니다."""
+    location = item.get('location') or {}
+    for value in location.values():
+        if isinstance(value, dict):
+            for key in ('uri', 'url'):
+                if value.get(key):
+                    return value[key]
+    metadata = item.get('metadata') or {}
+    return metadata.get('x-amz-bedrock-kb-source-uri')
+
+
+def format_document(text: str, score: float, source: Optional[str] = None) -> str:
+    """단일 검색 결과를 도구 결과 형식으로 변환합니다."""
+    if source:
+        return f"[관련도: {score:.2f} | 출처: {source.rsplit('/', 1)[-1]}]\n{text}"
+    return f"[관련도: {score:.2f}]\n{text}"
+
+
+def _shingles(text: str, size: int) -> FrozenSet[str]:
+    normalized = normalize_query(text).replace(' ', '')
+    if len(normalized) <= size:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(normalized[i:i + size] for i in range(len(normalized) - size + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _deduplicate_jaccard(docs: List[Dict[str, Any]], options: ShapingOptions) -> List[Dict[str, Any]]:
+    """점수 순으로 순회하며 이미 선택된 문서와 유사도가 임계값 이상인 문서를 제거합니다."""
+    kept: List[Dict[str, Any]] = []
+    for doc in docs:
+        if all(jaccard(doc['shingles'], other['shingles']) < options.dedup_threshold for other in kept):
+            kept.append(doc)
+        if len(kept) >= options.max_results:
+            break
+    return kept
+
+
+def _select_mmr(docs: List[Dict[str, Any]], options: ShapingOptions) -> List[Dict[str, Any]]:
+    """MMR로 관련도가 높으면서 서로 겹치지 않는 문서를 선택합니다."""
+    remaining = list(docs)
+    selected: List[Dict[str, Any]] = []
+    while remaining and len(selected) < options.max_results:
+        def mmr_score(doc: Dict[str, Any]) -> float:
+            redundancy = max((jaccard(doc['shingles'], other['shingles']) for other in selected), default=0.0)
+            return options.mmr_lambda * doc['score'] - (1 - options.mmr_lambda) * redundancy
+
+        best = max(remaining, key=mmr_score)
+        # 이미 선택된 문서와 사실상 동일한 청크는 MMR 점수와 무관하게 제외
+        if selected and max(jaccard(best['shingles'], other['shingles']) for other in selected) >= options.dedup_threshold:
+            remaining.remove(best)
+            continue
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+def _merge_by_source(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """같은 출처의 청크를 하나로 합치고, 최고 점수를 대표 점수로 사용합니다."""
+    merged: Dict[Any, Dict[str, Any]] = {}
+    for index, doc in enumerate(docs):
+        key = doc['source'] or f"__doc_{index}"
+        if key in merged:
+            merged[key]['text'] += "\n...\n" + doc['text']
+            merged[key]['score'] = max(merged[key]['score'], doc['score'])
+        else:
+            merged[key] = dict(doc)
+    return sorted(merged.values(), key=lambda doc: doc['score'], reverse=True)
+
+
+def _apply_budget(blocks: List[str], token_budget: int) -> List[str]:
+    """토큰 예산 안에 들어가는 블록만 남기고, 마지막 블록은 잘라서 채웁니다."""
+    if token_budget <= 0:
+        return blocks
+
+    kept: List[str] = []
+    used = 0
+    separator_tokens = estimate_tokens(RESULT_SEPARATOR)
+    for block in blocks:
+        cost = estimate_tokens(block) + (separator_tokens if kept else 0)
+        if used + cost <= token_budget:
+            kept.append(block)
+            used += cost
+            continue
+
+        # 남은 예산만큼 잘라서 추가 (한국어 기준 토큰당 약 2자)
+        remaining_chars = (token_budget - used - (separator_tokens if kept else 0)) * 2 - len(_TRUNCATION_MARK)
+        if remaining_chars > 100:
+            kept.append(block[:remaining_chars] + _TRUNCATION_MARK)
+        break
+    return kept
+
+
+def shape_results(items: List[Dict[str, Any]], options: Optional[ShapingOptions] = None) -> ShapedResult:
+    """retrieve 결과를 필터링/중복 제거/병합/예산 적용하여 도구 결과 텍스트로 만듭니다."""
+    options = options or ShapingOptions()
+
+    docs = []
+    for item in items:
+        text = item.get('content', {}).get('text', '')
+        if not text:
+            continue
+        docs.append({
+            'text': text,
+            'score': float(item.get('score', 0) or 0),
+            'source': get_source(item),
+            'item': item,
+        })
+
+    original_tokens = estimate_tokens(RESULT_SEPARATOR.join(
+        format_document(doc['text'], doc['score']) for doc in docs
+    ))
+
+    docs = [doc for doc in docs if doc['score'] >= options.min_score]
+    docs.sort(key=lambda doc: doc['score'], reverse=True)
+
+    if options.dedup_method in ('jaccard', 'mmr'):
+        for doc in docs:
+            doc['shingles'] = _shingles(doc['text'], options.shingle_size)
+        if options.dedup_method == 'mmr':
+            docs = _select_mmr(docs, options)
+        else:
+            docs = _deduplicate_jaccard(docs, options)
+    else:
+        docs = docs[:options.max_results]
+
+    if options.merge_by_source:
+        docs = _merge_by_source(docs)
+
+    blocks = _apply_budget(
+        [format_document(doc['text'], doc['score'], doc['source']) for doc in docs],
+        options.token_budget
+    )
+    text = RESULT_SEPARATOR.join(blocks)
+
+    return ShapedResult(
+        text=text,
+        documents=[doc['item'] for doc in docs[:len(blocks)]],
+        original_count=len(items),
+        original_tokens=original_tokens,
+        shaped_tokens=estimate_tokens(text),
+    )
@@ -0,0 +1,144 @@
+"""
+Retrieval Cache - Knowledge Base 검색 결과 캐시
+
+search_hr_documents 도구의 Knowledge Base retrieve 결과를 프로세스 단위로 캐싱합니다.
+비슷한 질문("연차 며칠?", "연차 며칠")이 반복될 때 retrieve 왕복을 생략합니다.
+
+- 정규화된 질의 + Knowledge Base ID + numberOfResults 기준 캐시 키
+- 최대 크기 기반 LRU 제거 및 TTL 만료
+- 만료 후 stale_seconds 동안은 검색 장애 시 대체 결과로 사용 (get_stale)
+- hit/miss 카운터 및 KB 재동기화 시 전체 무효화
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# 한글/영문/숫자/공백 이외의 문자(문장부호 등) 제거용 패턴
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]', re.UNICODE)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키 생성을 위해 질의를 정규화합니다.
+
+    - NFKC 정규화 (호환 자모/전각 문자 통일, 한글 자모 조합)
+    - 소문자 변환
+    - 문장부호 제거 및 연속 공백 축약
+    """
+    if not text:
+        return ''
+    normalized = unicodedata.normalize('NFKC', text).lower()
+    normalized = _PUNCTUATION_PATTERN.sub(' ', normalized).replace('_', ' ')
+    return _WHITESPACE_PATTERN.sub(' ', normalized).strip()
+
+
+class TTLCache:
+    """TTL과 최대 크기를 가진 스레드 안전 LRU 캐시입니다.
+
+    Args:
+        max_size: 최대 보관 항목 수 (0 이하이면 캐시 비활성화)
+        ttl_seconds: 항목 유효 시간(초)
+        stale_seconds: 만료 후에도 get_stale로 반환할 수 있도록 보관하는 시간(초)
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 600.0, stale_seconds: float = 0.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """캐시된 값을 반환합니다. 없거나 만료된 경우 None을 반환합니다."""
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                if expires_at + self.stale_seconds <= now:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_stale(self, key: Hashable) -> Optional[Any]:
+        """만료되었더라도 stale_seconds 이내인 값을 반환합니다 (hit/miss 카운터에 반영하지 않음)."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] + self.stale_seconds <= time.monotonic():
+                return None
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """값을 저장하고, 최대 크기를 넘으면 가장 오래 사용되지 않은 항목을 제거합니다."""
+        if not self.enabled:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> int:
+        """모든 항목을 제거합니다 (KB 재동기화 시 호출). 제거된 항목 수를 반환합니다."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self.invalidations += 1
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 상태 및 카운터를 반환합니다."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+class RetrievalCache(TTLCache):
+    """Knowledge Base retrieve 결과 캐시입니다."""
+
+    @staticmethod
+    def make_key(query: str, knowledge_base_id: str, number_of_results: int) -> Tuple[str, int, str]:
+        """Knowledge Base ID, 결과 개수, 정규화된 질의로 캐시 키를 생성합니다."""
+        return (knowledge_base_id, number_of_results, normalize_query(query))
@@ -0,0 +1,143 @@
+"""
+Run Budget - 요청 마감 시각과 도구 사용 횟수 제한
+
+Lambda Bridge는 자신의 남은 실행 시간으로 계산한 절대 마감 시각(deadline)을 payload로 보냅니다.
+마감 시각을 넘겨 Bridge가 타임아웃되면 SQS 재전달로 LLM 실행이 통째로 반복되므로,
+Agent 실행을 마감 전에 끝내고 지금까지 검색한 내용으로 부분 답변을 반환합니다.
+
+- 도구 배치 실행 횟수가 MAX_ITERATIONS에 도달하면 이후 도구 호출을 취소하여 모델이 바로 답변하도록 함
+- 남은 시간이 마지막 모델 턴에 필요한 시간보다 적으면 도구 호출을 취소
+- 마감 시각이 지나면 모델 호출을 건너뛰거나 진행 중인 모델 스트리밍을 취소하고 부분 답변 반환
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from strands.hooks import AfterToolsEvent, BeforeModelCallEvent, BeforeToolCallEvent, HookProvider, HookRegistry
+
+from model_router import tool_result_texts
+
+logger = logging.getLogger(__name__)
+
+STOP_ITERATIONS = 'iterations'
+STOP_DEADLINE = 'deadline'
+
+ITERATION_LIMIT_MESSAGE = "도구 사용 횟수 제한에 도달했습니다. 도구를 더 호출하지 말고 지금까지 확인한 내용으로 답변하세요."
+DEADLINE_TOOL_MESSAGE = "응답 시간이 부족합니다. 도구를 더 호출하지 말고 지금까지 확인한 내용으로 바로 답변하세요."
+PARTIAL_ANSWER_HEADER = "⏱️ 답변 생성 시간이 부족하여 검색된 HR 문서 내용을 먼저 안내드립니다. 자세한 내용은 다시 질문해 주세요.\n\n"
+TIMEOUT_ANSWER = "⏱️ 답변 생성 시간이 초과되었습니다. 잠시 후 다시 질문해 주세요."
+PARTIAL_ANSWER_CHARS = 1500
+
+
+def partial_answer(messages: List[Dict[str, Any]]) -> str:
+    """지금까지의 도구 결과(마지막 검색 결과)로 부분 답변을 만듭니다."""
+    texts = [text for text in tool_result_texts(messages) if text.strip()]
+    if not texts:
+        return TIMEOUT_ANSWER
+    excerpt = texts[-1].strip()
+    if len(excerpt) > PARTIAL_ANSWER_CHARS:
+        excerpt = excerpt[:PARTIAL_ANSWER_CHARS].rstrip() + '…'
+    return PARTIAL_ANSWER_HEADER + excerpt
+
+
+class RunBudget(HookProvider):
+    """요청 하나의 마감 시각과 도구 사용 횟수를 Agent 훅으로 강제합니다.
+
+    같은 요청에서 여러 Agent(빠른 모델 → 기본 모델 승격)를 실행해도 하나의 예산을 공유합니다.
+
+    Args:
+        max_iterations: 도구 배치 최대 실행 횟수 (0 이하이면 제한 없음)
+        deadline: 절대 마감 시각 (epoch 초, None이면 시간 제한 없음)
+        margin_seconds: 마감 전에 남겨 둘 응답 반환 시간(초)
+        final_turn_seconds: 도구 호출 후 마지막 모델 턴에 필요한 시간(초)
+    """
+
+    def __init__(
+        self,
+        max_iterations: int,
+        deadline: Optional[float] = None,
+        margin_seconds: float = 2.0,
+        final_turn_seconds: float = 8.0
+    ):
+        self.max_iterations = max_iterations
+        self.deadline = deadline
+        self.margin_seconds = margin_seconds
+        self.final_turn_seconds = final_turn_seconds
+        self.cancel_signal = threading.Event()
+        self.iterations = 0
+        self.stopped_by: Optional[str] = None
+        self._stopped_at: Optional[int] = None
+        self._timer: Optional[threading.Timer] = None
+
+    def time_left(self) -> Optional[float]:
+        """응답 반환 시간을 제외한 남은 시간(초)을 반환합니다 (마감 시각이 없으면 None)."""
+        if self.deadline is None:
+            return None
+        return self.deadline - self.margin_seconds - time.time()
+
+    def _stop(self, reason: str) -> None:
+        if self.stopped_by is None:
+            self.stopped_by = reason
+            self._stopped_at = self.iterations
+            logger.warning(
+                "[Budget] Stopping agent early (%s, iterations=%s, time_left=%s)",
+                reason, self.iterations, self.time_left()
+            )
+
+    def start(self) -> None:
+        """마감 시각에 진행 중인 모델 스트리밍을 취소하는 타이머를 시작합니다."""
+        time_left = self.time_left()
+        if time_left is None:
+            return
+        self._timer = threading.Timer(max(0.0, time_left), self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def settle(self, agent: Any, result: Any) -> Any:
+        """마감 시각으로 모델 스트리밍이 취소된 결과를 부분 답변으로 바꾸고 대화 히스토리에 추가합니다."""
+        if getattr(result, 'stop_reason', None) == 'cancelled' and self.cancel_signal.is_set():
+            result.message = {'role': 'assistant', 'content': [{'text': partial_answer(agent.messages)}]}
+            agent.messages.append(result.message)
+        return result
+
+    def _expire(self) -> None:
+        self._stop(STOP_DEADLINE)
+        self.cancel_signal.set()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+        registry.add_callback(BeforeToolCallEvent, self._before_tool_call)
+        registry.add_callback(AfterToolsEvent, self._after_tools)
+
+    def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        time_left = self.time_left()
+        if time_left is not None and time_left <= 0:
+            self._stop(STOP_DEADLINE)
+            event.cancel = partial_answer(event.agent.messages)
+
+    def _before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        if self.max_iterations > 0 and self.iterations >= self.max_iterations:
+            self._stop(STOP_ITERATIONS)
+            event.cancel_tool = ITERATION_LIMIT_MESSAGE
+            return
+        time_left = self.time_left()
+        if time_left is not None and time_left < self.final_turn_seconds:
+            self._stop(STOP_DEADLINE)
+            event.cancel_tool = DEADLINE_TOOL_MESSAGE
+
+    def _after_tools(self, event: AfterToolsEvent) -> None:
+        self.iterations += 1
+        # 취소 안내 후에도 모델이 계속 도구를 호출하면 더 기다리지 않고 부분 답변으로 종료
+        if self._stopped_at is not None and self.iterations >= self._stopped_at + 2:
+            event.end_turn = partial_answer(event.agent.messages)
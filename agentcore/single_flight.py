@@ -0,0 +1,145 @@
+"""
+Single Flight - 동일한 질문의 동시 실행 합치기
+
+공지가 올라온 직후처럼 같은 질문이 몇 초 안에 몰리면, 답변 캐시가 아직 비어 있어
+요청마다 Agent 루프(모델 호출 + 검색)가 따로 실행됩니다.
+같은 키로 실행 중인 작업이 있으면 새 요청은 그 결과를 기다렸다가 함께 받습니다.
+
+- 키별 첫 요청(leader)만 실행하고 나머지(waiter)는 결과를 공유
+- leader가 실패하면 같은 예외를 모든 waiter에게 전달
+- 대기자 수 상한을 넘거나 대기 시간이 초과되면 waiter가 직접 실행
+- leader/공유/초과/시간 초과 카운터
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """실행 중인 작업 하나의 결과와 대기자 수를 보관합니다."""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """키별로 동시에 하나의 작업만 실행하는 스레드 안전 single-flight 그룹입니다.
+
+    Args:
+        max_waiters: 작업 하나를 기다릴 수 있는 최대 요청 수 (0 이하이면 비활성화)
+        wait_timeout: waiter가 결과를 기다리는 최대 시간(초), 초과하면 직접 실행
+    """
+
+    def __init__(self, max_waiters: int = 100, wait_timeout: float = 90.0):
+        self.max_waiters = max_waiters
+        self.wait_timeout = wait_timeout
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.shared_errors = 0
+        self.overflows = 0
+        self.timeouts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_waiters > 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        같은 키로 실행 중인 작업이 있으면 그 결과를 기다리고, 없으면 fn을 실행합니다.
+
+        Args:
+            key: 작업 키
+            fn: 실행할 함수
+            timeout: 이 요청의 최대 대기 시간(초), wait_timeout보다 짧을 때만 적용
+
+        Returns:
+            (결과, 다른 요청의 실행 결과를 공유했는지 여부)
+
+        Raises:
+            fn 또는 leader 실행에서 발생한 예외
+        """
+        if not self.enabled:
+            return fn(), False
+
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+                is_leader = True
+            elif flight.waiters >= self.max_waiters:
+                self.overflows += 1
+                flight = None
+                is_leader = False
+            else:
+                flight.waiters += 1
+                is_leader = False
+
+        if flight is None:
+            logger.info("[SingleFlight] Waiter limit (%s) reached; running independently", self.max_waiters)
+            return fn(), False
+
+        if is_leader:
+            return self._lead(key, flight, fn), False
+
+        wait_timeout = self.wait_timeout if timeout is None else max(0.0, min(self.wait_timeout, timeout))
+        if not flight.done.wait(wait_timeout):
+            with self._lock:
+                self.timeouts += 1
+                flight.waiters -= 1
+            logger.warning("[SingleFlight] Gave up waiting after %.1fs; running independently", wait_timeout)
+            return fn(), False
+
+        with self._lock:
+            if flight.error is not None:
+                self.shared_errors += 1
+            else:
+                self.coalesced += 1
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, True
+
+    def _lead(self, key: Hashable, flight: _Flight, fn: Callable[[], Any]) -> Any:
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            # 완료 후 도착한 요청은 새 작업을 시작하거나 답변 캐시를 사용
+            with self._lock:
+                self._flights.pop(key, None)
+                waiters = flight.waiters
+                saved = self.coalesced + waiters
+            flight.done.set()
+            if waiters:
+                logger.info("[SingleFlight] %s waiting request(s) shared one run (runs saved: %s)", waiters, saved)
+
+    def stats(self) -> Dict[str, Any]:
+        """single-flight 상태 및 카운터를 반환합니다."""
+        with self._lock:
+            return {
+                'in_flight': len(self._flights),
+                'max_waiters': self.max_waiters,
+                'wait_timeout': self.wait_timeout,
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'shared_errors': self.shared_errors,
+                'overflows': self.overflows,
+                'timeouts': self.timeouts,
+            }
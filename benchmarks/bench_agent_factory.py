@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agent Factory Micro-benchmark
+
+요청마다 BedrockModel과 Agent를 새로 생성하던 기존 방식과
+AgentFactory로 모델/도구 목록을 재사용하는 방식의 요청당 준비 비용을 비교합니다.
+네트워크 호출은 발생하지 않으며, 리전 설정만 있으면 AWS 자격 증명 없이 실행됩니다.
+
+Usage:
+    python benchmarks/bench_agent_factory.py [--iterations 50]
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'agentcore'))
+
+import agent as hr_agent  # noqa: E402
+
+
+def legacy_get_agent():
+    """기존 get_agent(): 요청마다 BedrockModel과 Agent를 새로 생성합니다."""
+    bedrock_model = hr_agent.BedrockModel(
+        model_id=hr_agent.MODEL_ID,
+        region_name=hr_agent.MODEL_REGION,
+        temperature=0.3,
+        streaming=hr_agent.ENABLE_STREAMING
+    )
+    return hr_agent.Agent(
+        model=bedrock_model,
+        tools=list(hr_agent.agent_factory.tools),
+        system_prompt=hr_agent.HR_SYSTEM_PROMPT,
+        name="KB Fintech HR Assistant",
+        description="KB Fintech 직원들의 HR 관련 질문에 답변하는 AI 어시스턴트",
+        agent_id="kb-fintech-hr-assistant",
+        callback_handler=None
+    )
+
+
+def factory_get_agent():
+    """AgentFactory: 공유 모델로 요청별 Agent만 생성합니다."""
+    return hr_agent.agent_factory.create(callback_handler=lambda **kwargs: None)
+
+
+def measure(func: Callable[[], object], iterations: int) -> Dict[str, float]:
+    """함수 실행 시간을 측정하여 통계(ms)를 반환합니다."""
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean': statistics.mean(samples),
+        'p50': samples[len(samples) // 2],
+        'p99': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request agent setup cost benchmark")
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    # 공유 모델 생성 비용은 프로세스당 1회이므로 측정 전에 미리 생성
+    warmup_start = time.perf_counter()
+    hr_agent.agent_factory.model
+    warmup_ms = (time.perf_counter() - warmup_start) * 1000
+
+    results = {
+        'legacy (model + agent per request)': measure(legacy_get_agent, args.iterations),
+        'factory (shared model)': measure(factory_get_agent, args.iterations),
+    }
+
+    print(f"Iterations: {args.iterations}")
+    print(f"Factory one-time model setup: {warmup_ms:.2f} ms")
+    print(f"{'variant':<38}{'mean':>10}{'p50':>10}{'p99':>10}  (ms)")
+    for name, stats in results.items():
+        print(f"{name:<38}{stats['mean']:>10.3f}{stats['p50']:>10.3f}{stats['p99']:>10.3f}")
+
+    legacy_mean = results['legacy (model + agent per request)']['mean']
+    factory_mean = results['factory (shared model)']['mean']
+    if factory_mean > 0:
+        print(f"Speedup: {legacy_mean / factory_mean:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
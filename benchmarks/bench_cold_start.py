@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Import-time and Cold-start Benchmark
+
+세 Python 진입점(Lambda Receiver, Lambda Bridge, AgentCore agent)을 각각 새 인터프리터에서
+`python -X importtime`으로 import하여 콜드 스타트 비용을 측정합니다.
+AWS 자격 증명이나 네트워크가 필요하지 않습니다 (클라이언트 생성까지만 수행).
+
+측정 항목:
+    - 프로세스 전체 시간 (인터프리터 시작 → 종료)
+    - 진입점 모듈 import 시간 및 직접 import한 모듈별 누적 비용
+    - 패키지별 self 시간 합계 (상위 N개)
+    - 첫 호출/warm-up 호출 시간과 그 안에서 지연 import된 모듈 비용
+
+Usage:
+    python benchmarks/bench_cold_start.py --runs 5
+    python benchmarks/bench_cold_start.py --entry agentcore --top 15 --json /tmp/cold_start.json
+    python benchmarks/bench_cold_start.py --env LOCAL_INDEX_PATH=index
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# 진입점별 디렉터리, 모듈, import 이후 순서대로 실행할 호출 (이름, 코드)
+ENTRY_POINTS: Dict[str, Dict[str, Any]] = {
+    'receiver': {
+        'dir': 'lambda-receiver',
+        'module': 'lambda_receiver',
+        'calls': [
+            ('first_call', "entry.lambda_handler("
+                           "{'body': '{\"type\": \"url_verification\", \"challenge\": \"bench\"}'}, None)"),
+            ('warmup', "entry.lambda_handler({'warmup': True}, None)"),
+        ],
+    },
+    'bridge': {
+        'dir': 'lambda-bridge',
+        'module': 'lambda_bridge',
+        'calls': [
+            ('first_call', "entry.lambda_handler({'Records': []}, None)"),
+            ('warmup', "entry.lambda_handler({'warmup': True}, None)"),
+        ],
+    },
+    'agentcore': {
+        'dir': 'agentcore',
+        'module': 'agent',
+        'calls': [
+            ('warmup', "entry.invoke({'action': 'warmup'})"),
+        ],
+    },
+}
+
+# 자식 프로세스 코드: 측정 전에는 time/sys 외에 아무것도 import하지 않음 (이미 로드된 모듈은 importtime에 나오지 않음)
+CHILD_TEMPLATE = """
+import sys, time
+timings = {{}}
+sys.stderr.write('##phase import\\n'); sys.stderr.flush()
+start = time.perf_counter()
+import {module} as entry
+timings['import'] = (time.perf_counter() - start) * 1000
+for name, code in {calls!r}:
+    sys.stderr.write('##phase ' + name + '\\n'); sys.stderr.flush()
+    start = time.perf_counter()
+    exec(code)
+    timings[name] = (time.perf_counter() - start) * 1000
+sys.stderr.write('##phase end\\n'); sys.stderr.flush()
+import json
+sys.stdout.write('##timings ' + json.dumps(timings) + '\\n')
+"""
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-entry-point import-time and cold-start benchmark")
+    parser.add_argument('--entry', action='append', choices=sorted(ENTRY_POINTS),
+                        help="entry point to measure (repeatable, default: all)")
+    parser.add_argument('--runs', type=int, default=5, help="measured runs per entry point (median is reported)")
+    parser.add_argument('--no-prime', action='store_true',
+                        help="do not run once before measuring (include .pyc compilation in the first run)")
+    parser.add_argument('--top', type=int, default=10, help="modules/packages to list per entry point")
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help="environment variable for the entry point process")
+    parser.add_argument('--json', dest='json_path', help="write the full report as JSON")
+    return parser.parse_args()
+
+
+def build_environment(args: argparse.Namespace) -> Dict[str, str]:
+    """앱 모듈이 import 시점에 읽는 설정을 로컬 값으로 채웁니다."""
+    env = dict(os.environ)
+    defaults = {
+        'AWS_DEFAULT_REGION': 'us-east-1',
+        'AWS_ACCESS_KEY_ID': 'bench',
+        'AWS_SECRET_ACCESS_KEY': 'bench',
+        'SQS_QUEUE_URL': 'https://sqs.local/000000000000/slack-bot-bench',
+        'AGENTCORE_RUNTIME_ARN': 'arn:aws:bedrock-agentcore:us-east-1:000000000000:runtime/bench',
+        'SLACK_BOT_TOKEN': 'xoxb-bench',
+        'IDEMPOTENCY_BACKEND': 'memory',
+        'ADMISSION_BACKEND': 'none',
+        'SLACK_DELIVERY_SINK': 'memory',
+    }
+    for key, value in defaults.items():
+        env.setdefault(key, value)
+    for item in args.env:
+        key, _, value = item.partition('=')
+        env[key] = value
+    return env
+
+
+def parse_importtime(stderr: str) -> Dict[str, List[Tuple[str, int, float, float]]]:
+    """importtime 출력을 단계별 (모듈, 깊이, self ms, cumulative ms) 목록으로 나눕니다."""
+    phases: Dict[str, List[Tuple[str, int, float, float]]] = {}
+    current = None
+    for line in stderr.splitlines():
+        if line.startswith('##phase '):
+            current = line.split(' ', 1)[1]
+            phases.setdefault(current, [])
+            continue
+        match = IMPORT_LINE.match(line)
+        if match and current not in (None, 'end'):
+            self_us, cumulative_us, indent, name = match.groups()
+            phases[current].append((name, (len(indent) - 1) // 2, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return phases
+
+
+def run_once(entry: Dict[str, Any], env: Dict[str, str]) -> Dict[str, Any]:
+    """진입점 하나를 새 인터프리터에서 import/호출하고 측정값을 반환합니다."""
+    code = CHILD_TEMPLATE.format(module=entry['module'], calls=entry['calls'])
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=os.path.join(ROOT_DIR, entry['dir']),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    process_ms = (time.perf_counter() - started) * 1000
+    timings_line = [line for line in completed.stdout.splitlines() if line.startswith('##timings ')]
+    if completed.returncode != 0 or not timings_line:
+        raise RuntimeError(f"{entry['module']} failed (exit {completed.returncode}):\n{completed.stderr[-2000:]}")
+
+    phases = parse_importtime(completed.stderr)
+    imported = phases.get('import', [])
+    # 진입점 모듈 바로 아래 깊이의 모듈이 직접 import한 모듈
+    entry_level = min((level for _, level, _, _ in imported), default=0)
+    direct = {name: cumulative for name, level, _, cumulative in imported if level == entry_level + 1}
+    packages: Dict[str, float] = {}
+    for name, _, self_ms, _ in imported:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0.0) + self_ms
+    return {
+        'process_ms': process_ms,
+        'timings_ms': json.loads(timings_line[-1].split(' ', 1)[1]),
+        'direct_imports_ms': direct,
+        'packages_self_ms': packages,
+        'lazy_imports_ms': {
+            phase: round(sum(self_ms for _, _, self_ms, _ in lines), 2)
+            for phase, lines in phases.items() if phase not in ('import', 'end')
+        },
+    }
+
+
+def median_of(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    """실행별 {이름: 값}의 이름별 중앙값을 계산합니다 (일부 실행에만 있는 이름은 0으로 간주)."""
+    names = dict.fromkeys(name for sample in samples for name in sample)
+    return {name: round(statistics.median(sample.get(name, 0.0) for sample in samples), 2) for name in names}
+
+
+def measure(name: str, args: argparse.Namespace, env: Dict[str, str]) -> Dict[str, Any]:
+    entry = ENTRY_POINTS[name]
+    if not args.no_prime:
+        # __pycache__ 생성 비용은 배포 패키지 구성에 따라 다르므로 제외
+        run_once(entry, env)
+    runs = [run_once(entry, env) for _ in range(max(1, args.runs))]
+
+    def top(values: Dict[str, float]) -> Dict[str, float]:
+        return dict(sorted(values.items(), key=lambda item: item[1], reverse=True)[:args.top])
+
+    return {
+        'module': f"{entry['dir']}/{entry['module']}.py",
+        'runs': len(runs),
+        'process_ms': round(statistics.median(run['process_ms'] for run in runs), 2),
+        'timings_ms': median_of([run['timings_ms'] for run in runs]),
+        'lazy_imports_ms': median_of([run['lazy_imports_ms'] for run in runs]),
+        'direct_imports_ms': top(median_of([run['direct_imports_ms'] for run in runs])),
+        'packages_self_ms': top(median_of([run['packages_self_ms'] for run in runs])),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    for name, result in report.items():
+        timings = result['timings_ms']
+        print(f"== {name} ({result['module']}, median of {result['runs']} runs) ==")
+        print(f"process: {result['process_ms']:.1f} ms, import: {timings['import']:.1f} ms")
+        for phase, elapsed in timings.items():
+            if phase != 'import':
+                print(f"{phase}: {elapsed:.1f} ms (lazy imports {result['lazy_imports_ms'].get(phase, 0.0):.1f} ms)")
+        print(f"{'direct imports (cumulative ms)':<44}{'packages (self ms)':<36}")
+        direct = list(result['direct_imports_ms'].items())
+        packages = list(result['packages_self_ms'].items())
+        for index in range(max(len(direct), len(packages))):
+            left = f"  {direct[index][0]:<32}{direct[index][1]:>8.1f}" if index < len(direct) else ''
+            right = f"  {packages[index][0]:<24}{packages[index][1]:>8.1f}" if index < len(packages) else ''
+            print(f"{left:<44}{right}")
+        print()
+
+
+def main() -> None:
+    args = parse_args()
+    env = build_environment(args)
+    report = {name: measure(name, args, env) for name in (args.entry or list(ENTRY_POINTS))}
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, ensure_ascii=False, indent=2)
+        print(f"Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
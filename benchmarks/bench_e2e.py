@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+End-to-end Load and Latency Benchmark
+
+Slack 이벤트 코퍼스(JSONL)를 Lambda Receiver → SQS → Lambda Bridge → AgentCore 엔트리포인트로
+한 프로세스 안에서 흘려보내며 처리량과 지연 시간을 측정합니다.
+Slack, SQS, AgentCore Runtime, Knowledge Base, 모델은 standins.py의 가짜 구현이
+설정한 지연 시간을 주입하여 대신합니다. AWS 자격 증명이나 네트워크가 필요하지 않습니다.
+
+측정 항목:
+    - 사용자 체감 지연 시간 (이벤트 수신 → 최종 답변 반영) p50/p95/p99
+    - 첫 화면 갱신까지의 시간 (스트리밍 부분 응답 또는 최종 답변)
+    - N개 동시 발신자 기준 처리량
+    - 단계별 분포 (Receiver, SQS 대기, Bridge/AgentCore EMF 메트릭)
+
+Usage:
+    python benchmarks/bench_e2e.py --requests 200 --senders 8
+    python benchmarks/bench_e2e.py --model-latency 800 --kb-latency 300 --env ANSWER_CACHE_SIZE=0
+    python benchmarks/bench_e2e.py --env ASYNC_HANDOFF=true
+    python benchmarks/bench_e2e.py --kb-slow-ratio 0.1 --env RETRIEVAL_CACHE_SIZE=0
+    python benchmarks/bench_e2e.py --env IDEMPOTENCY_BACKEND=dynamodb --env ADMISSION_BACKEND=dynamodb
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'slack_prompts.jsonl')
+QUEUE_ARN = 'arn:aws:sqs:us-east-1:000000000000:slack-bot-bench'
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """정렬된 표본의 백분위수(최근접 순위)를 반환합니다."""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, int(round(pct / 100 * len(samples) + 0.5)) - 1))
+    return samples[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered) if ordered else 0.0,
+        'p50': percentile(ordered, 50),
+        'p95': percentile(ordered, 95),
+        'p99': percentile(ordered, 99),
+        'max': ordered[-1] if ordered else 0.0,
+    }
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    """프롬프트 코퍼스를 읽습니다. 각 줄: {"prompt": "...", "channel": "...", "user": "...", "calculation": "..."}"""
+    entries = []
+    with open(path, encoding='utf-8') as corpus_file:
+        for line in corpus_file:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    if not entries:
+        raise ValueError(f"Corpus is empty: {path}")
+    return entries
+
+
+def slack_envelope(entry: Dict[str, Any], sequence: int, channels: int = 1, users: int = 1) -> Dict[str, Any]:
+    """코퍼스 항목을 Slack event_callback 페이로드로 변환합니다 (재생 시마다 고유 ID 부여).
+
+    코퍼스에 channel/user가 없으면 channels개의 채널(DM)과 users명의 사용자에 순서대로 분산합니다.
+    """
+    ts = f"{int(time.time())}.{sequence:06d}"
+    return {
+        'type': 'event_callback',
+        'event_id': f"Ev{uuid.uuid4().hex[:16].upper()}",
+        'event': {
+            'type': 'message',
+            'client_msg_id': str(uuid.uuid4()),
+            'user': entry.get('user', f"U0BENCH{sequence % max(1, users)}"),
+            'channel': entry.get('channel', f"D0BENCH{sequence % max(1, channels)}"),
+            'text': entry['prompt'],
+            'ts': ts,
+        },
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline end-to-end Slack → AgentCore benchmark")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="JSONL prompt corpus")
+    parser.add_argument('--requests', type=int, default=100, help="total events to send (corpus is replayed)")
+    parser.add_argument('--senders', type=int, default=4, help="concurrent Slack event senders")
+    parser.add_argument('--bridge-instances', type=int, default=2, help="concurrent Lambda Bridge invocations")
+    parser.add_argument('--batch-size', type=int, default=10, help="SQS batch size")
+    parser.add_argument('--batching-window', type=float, default=0.05, help="SQS batching window (s)")
+    parser.add_argument('--stream', choices=['on', 'off'], default='on', help="AgentCore streaming responses")
+    parser.add_argument('--model-latency', type=float, default=400, help="model time to first token per turn (ms)")
+    parser.add_argument('--fast-model-latency', type=float, default=150,
+                        help="fast tier model time to first token per turn (ms, used when FAST_MODEL_ID is set)")
+    parser.add_argument('--token-latency', type=float, default=20, help="delay between streamed chunks (ms)")
+    parser.add_argument('--kb-latency', type=float, default=150, help="Knowledge Base retrieve latency (ms)")
+    parser.add_argument('--kb-slow-ratio', type=float, default=0, help="share of retrieve calls that are slow")
+    parser.add_argument('--kb-slow-latency', type=float, default=3000, help="slow retrieve latency (ms)")
+    parser.add_argument('--kb-error-ratio', type=float, default=0, help="share of retrieve calls that fail")
+    parser.add_argument('--slack-latency', type=float, default=80, help="Slack Web API latency (ms)")
+    parser.add_argument('--channels', type=int, default=16, help="Slack channels (DMs) events are spread across")
+    parser.add_argument('--users', type=int, default=16, help="Slack users events are spread across")
+    parser.add_argument('--slack-http', action='store_true',
+                        help="deliver through the real HTTP client against a local fake Slack API server")
+    parser.add_argument('--slack-rate-limit', type=float, default=0,
+                        help="fake Slack API requests per channel per second before 429 (with --slack-http)")
+    parser.add_argument('--dynamodb-latency', type=float, default=5,
+                        help="DynamoDB latency (ms) when --env IDEMPOTENCY_BACKEND/ADMISSION_BACKEND=dynamodb")
+    parser.add_argument('--sqs-latency', type=float, default=15, help="SQS SendMessage latency (ms)")
+    parser.add_argument('--lambda-timeout', type=float, default=60, help="Lambda Bridge timeout per batch (s)")
+    parser.add_argument('--agentcore-latency', type=float, default=30, help="AgentCore invoke overhead (ms)")
+    parser.add_argument('--jitter', type=float, default=0.2, help="latency jitter ratio (0.2 → ±20%%)")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help="extra environment variables applied before importing the apps")
+    parser.add_argument('--json', dest='json_path', help="write the full report as JSON")
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """앱 모듈은 import 시점에 환경 변수를 읽으므로 import 전에 설정합니다."""
+    defaults = {
+        'AWS_DEFAULT_REGION': 'us-east-1',
+        'AWS_ACCESS_KEY_ID': 'bench',
+        'AWS_SECRET_ACCESS_KEY': 'bench',
+        'SQS_QUEUE_URL': 'https://sqs.local/000000000000/slack-bot-bench',
+        'AGENTCORE_RUNTIME_ARN': 'arn:aws:bedrock-agentcore:us-east-1:000000000000:runtime/bench',
+        'SLACK_BOT_TOKEN': 'xoxb-bench',
+        'ENABLE_STREAMING': 'true' if args.stream == 'on' else 'false',
+        'IDEMPOTENCY_BACKEND': 'memory',
+        'ENABLE_EMF_METRICS': 'false',
+        'ADMISSION_BACKEND': 'none',
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+    for item in args.env:
+        key, _, value = item.partition('=')
+        os.environ[key] = value
+
+    for subdir in ('agentcore', 'lambda-receiver', 'lambda-bridge', 'shared'):
+        sys.path.insert(0, os.path.join(ROOT_DIR, subdir))
+
+
+def main() -> None:
+    args = parse_args()
+    configure_environment(args)
+    corpus = load_corpus(args.corpus)
+
+    import agent as hr_agent  # noqa: E402
+    import lambda_bridge  # noqa: E402
+    import lambda_receiver  # noqa: E402
+    from standins import (  # noqa: E402
+        FakeAgentCoreClient, FakeDynamoDB, FakeKnowledgeBase, FakeLambdaContext, FakeModel, FakeSlackApiServer,
+        FakeSlackClient, FakeSQS, Latency
+    )
+    from slack_delivery import SlackHttpClient  # noqa: E402
+
+    logging.disable(logging.INFO)
+
+    def latency(ms: float) -> Latency:
+        return Latency(ms=ms, jitter=args.jitter)
+
+    sent_at: Dict[str, float] = {}
+    first_update_at: Dict[str, float] = {}
+    finished_at: Dict[str, float] = {}
+    receiver_ms: List[float] = []
+    queue_wait_ms: List[float] = []
+    stage_samples: Dict[str, List[float]] = {}
+    lock = threading.Lock()
+    all_done = threading.Event()
+
+    def on_first_update(thread_ts: str, at: float) -> None:
+        with lock:
+            first_update_at.setdefault(thread_ts, at)
+
+    def on_final(thread_ts: str, at: float) -> None:
+        with lock:
+            if thread_ts in sent_at and thread_ts not in finished_at:
+                finished_at[thread_ts] = at
+                first_update_at.setdefault(thread_ts, at)
+                if len(finished_at) >= args.requests:
+                    all_done.set()
+
+    # 가짜 백엔드 연결
+    sqs = FakeSQS(latency(args.sqs_latency), seed=args.seed)
+    slack = FakeSlackClient(
+        latency(args.slack_latency), on_first_update, on_final,
+        streaming_cursor=lambda_bridge.STREAMING_CURSOR, seed=args.seed + 1
+    )
+    knowledge_base = FakeKnowledgeBase(
+        latency(args.kb_latency), seed=args.seed + 2, slow_ratio=args.kb_slow_ratio,
+        slow_latency=latency(args.kb_slow_latency), error_ratio=args.kb_error_ratio
+    )
+    calculations = {entry['prompt']: entry['calculation'] for entry in corpus if entry.get('calculation')}
+    model = FakeModel(
+        latency(args.model_latency), latency(args.token_latency), calculations=calculations, seed=args.seed + 3
+    )
+
+    lambda_receiver.sqs_client = sqs
+    lambda_bridge.sqs_client = sqs
+    # IDEMPOTENCY_BACKEND/ADMISSION_BACKEND=dynamodb이면 Receiver와 Bridge가 가짜 DynamoDB 테이블 하나를 공유
+    dynamodb = FakeDynamoDB(latency(args.dynamodb_latency), seed=args.seed + 6)
+    for backend in (
+        lambda_receiver.idempotency_store.backend, lambda_bridge.idempotency_store.backend,
+        lambda_bridge.admission.backend
+    ):
+        if hasattr(backend, '_client'):
+            backend._client = dynamodb
+    slack_server = None
+    if args.slack_http:
+        slack_server = FakeSlackApiServer(slack, rate_limit=args.slack_rate_limit or None).start()
+        lambda_bridge.slack_delivery.client = SlackHttpClient(
+            lambda_bridge.SLACK_BOT_TOKEN, base_url=slack_server.base_url
+        )
+    else:
+        lambda_bridge.slack_delivery.client = slack
+    # 비동기 전달(ASYNC_HANDOFF=true)에서는 AgentCore가 같은 가짜 Slack으로 직접 답변
+    if hr_agent.reply_delivery is not None:
+        hr_agent.reply_delivery.client = lambda_bridge.slack_delivery.client
+    lambda_bridge.agentcore_client = FakeAgentCoreClient(
+        hr_agent.invoke, latency(args.agentcore_latency), seed=args.seed + 4
+    )
+    hr_agent.agent_factory._model = model
+    if hr_agent.fast_agent_factory is not None:
+        hr_agent.fast_agent_factory._model = FakeModel(
+            latency(args.fast_model_latency), latency(args.token_latency), calculations=calculations,
+            seed=args.seed + 5
+        )
+    hr_agent._bedrock_agent_runtime = knowledge_base
+
+    # 비스트리밍 경로의 Strands 기본 콜백(stdout 출력)이 보고서와 섞이지 않도록 무시
+    create_agent = hr_agent.agent_factory.create
+    hr_agent.agent_factory.create = lambda callback_handler=None, **kwargs: create_agent(
+        callback_handler=callback_handler or (lambda **_: None), **kwargs
+    )
+
+    # Bridge EMF 레코드를 로그 대신 수집하여 단계별 분포 계산
+    def collect_metrics(response_data: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> None:
+        record = lambda_bridge.build_emf_record(response_data.get('metrics') or {}, timings or {})
+        with lock:
+            for definition in record['_aws']['CloudWatchMetrics'][0]['Metrics']:
+                stage_samples.setdefault(definition['Name'], []).append(record[definition['Name']])
+
+    lambda_bridge._log_metrics = collect_metrics
+
+    # Lambda Bridge 인스턴스: SQS 배치를 받아 lambda_handler 호출
+    stop_consumers = threading.Event()
+
+    def bridge_instance() -> None:
+        while not (stop_consumers.is_set() and sqs.messages.empty()):
+            batch = sqs.receive_batch(args.batch_size, args.batching_window, stop_consumers)
+            if not batch:
+                continue
+            now = time.perf_counter()
+            with lock:
+                queue_wait_ms.extend((now - message['enqueued_at']) * 1000 for message in batch)
+            records = [
+                {'messageId': message['messageId'], 'body': message['body'], 'eventSourceARN': QUEUE_ARN}
+                for message in batch
+            ]
+            lambda_bridge.lambda_handler({'Records': records}, FakeLambdaContext(args.lambda_timeout))
+
+    consumers = [
+        threading.Thread(target=bridge_instance, name=f"bridge-{index}", daemon=True)
+        for index in range(args.bridge_instances)
+    ]
+    for consumer in consumers:
+        consumer.start()
+
+    # Slack 이벤트 발신자: API Gateway 이벤트로 lambda_receiver 호출
+    def send(sequence: int) -> None:
+        envelope = slack_envelope(corpus[sequence % len(corpus)], sequence, args.channels, args.users)
+        thread_ts = envelope['event']['ts']
+        start = time.perf_counter()
+        with lock:
+            sent_at[thread_ts] = start
+        response = lambda_receiver.lambda_handler(
+            {'body': json.dumps(envelope, ensure_ascii=False), 'headers': {}}, None
+        )
+        with lock:
+            receiver_ms.append((time.perf_counter() - start) * 1000)
+        if response['statusCode'] != 200:
+            raise RuntimeError(f"Receiver returned {response['statusCode']}: {response['body']}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.senders, thread_name_prefix="sender") as senders:
+        list(senders.map(send, range(args.requests)))
+
+    # 모든 답변이 반영될 때까지 대기 (처리 중 멈춤에 대비한 상한)
+    all_done.wait(timeout=max(60.0, args.requests * 5.0))
+    elapsed = time.perf_counter() - started
+    stop_consumers.set()
+    for consumer in consumers:
+        consumer.join(timeout=10)
+    if slack_server is not None:
+        slack_server.stop()
+
+    e2e_ms = [(finished_at[ts] - sent_at[ts]) * 1000 for ts in finished_at]
+    first_ms = [(first_update_at[ts] - sent_at[ts]) * 1000 for ts in finished_at if ts in first_update_at]
+
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key != 'json_path'},
+        'completed': len(finished_at),
+        'sent': args.requests,
+        'elapsed_s': elapsed,
+        'throughput_rps': len(finished_at) / elapsed if elapsed else 0.0,
+        'latency_ms': {
+            'end_to_end': summarize(e2e_ms),
+            'first_update': summarize(first_ms),
+            'receiver': summarize(receiver_ms),
+            'sqs_wait': summarize(queue_wait_ms),
+        },
+        'stages': {name: summarize(samples) for name, samples in sorted(stage_samples.items())},
+        'backend_calls': {
+            'slack': slack.calls,
+            'sqs_delayed': sqs.delayed,
+            'dynamodb': {'calls': dynamodb.calls, 'conditional_failures': dynamodb.conditional_failures},
+            'slack_delivery': dict(lambda_bridge.slack_delivery.stats),
+            'slack_connections': slack_server.connections if slack_server else None,
+            'kb_retrieve': knowledge_base.calls,
+            'kb_retrieval': hr_agent.kb_retriever.stats(),
+            'retrieval_cache': hr_agent.retrieval_cache.stats(),
+            'answer_cache': hr_agent.answer_cache.stats(),
+            'single_flight': hr_agent.single_flight.stats(),
+            'prefetch': hr_agent.prefetcher.stats(),
+        },
+    }
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, ensure_ascii=False, indent=2)
+        print(f"\nReport written to {args.json_path}")
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    config = report['config']
+    print(f"Requests: {report['completed']}/{report['sent']} completed, "
+          f"senders={config['senders']}, bridge instances={config['bridge_instances']}, stream={config['stream']}")
+    print(f"Elapsed: {report['elapsed_s']:.2f} s, throughput: {report['throughput_rps']:.2f} req/s")
+    print()
+    header = f"{'metric (ms unless count)':<28}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+    print(header)
+    rows = list(report['latency_ms'].items()) + list(report['stages'].items())
+    for index, (name, stats) in enumerate(rows):
+        if index == len(report['latency_ms']):
+            print(f"{'-- stages (EMF) --':<28}")
+        print(f"{name:<28}{stats['count']:>7}{stats['mean']:>10.1f}{stats['p50']:>10.1f}"
+              f"{stats['p95']:>10.1f}{stats['p99']:>10.1f}{stats['max']:>10.1f}")
+    calls = report['backend_calls']
+    print()
+    print(f"Slack API calls: {calls['slack']}, KB retrieve calls: {calls['kb_retrieve']}, "
+          f"deferred (requeued) messages: {calls['sqs_delayed']}")
+    if calls['dynamodb']['calls']:
+        print(f"DynamoDB calls: {calls['dynamodb']['calls']}, "
+              f"conditional check failures: {calls['dynamodb']['conditional_failures']}")
+    delivery = calls['slack_delivery']
+    print(f"Slack delivery: retries={delivery['retries']}, rate limited={delivery['rate_limited']}, "
+          f"coalesced updates={delivery['coalesced']}, failures={delivery['failures']}"
+          + (f", connections={calls['slack_connections']}" if calls['slack_connections'] is not None else ""))
+    print(f"Retrieval cache hit ratio: {calls['retrieval_cache']['hit_ratio']}, "
+          f"answer cache hit ratio: {calls['answer_cache']['hit_ratio']}, "
+          f"coalesced agent runs: {calls['single_flight']['coalesced']}")
+    kb = calls['kb_retrieval']
+    print(f"KB retrieval: hedges={kb['hedges']}, hedge wins={kb['hedge_wins']}, failures={kb['failures']}, "
+          f"rejected={kb['rejected']}, short-circuited={kb['short_circuited']}, circuit={kb['circuit_state']}, "
+          f"hedge delay={kb['hedge_delay_ms']} ms")
+    print(f"Prefetch hit ratio: {calls['prefetch']['hit_ratio']} "
+          f"(hits={calls['prefetch']['hits']}, misses={calls['prefetch']['misses']}, "
+          f"unused={calls['prefetch']['unused']})")
+
+
+if __name__ == "__main__":
+    main()
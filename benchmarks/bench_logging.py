@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Logging Overhead Benchmark
+
+요청 처리 경로에서 로깅이 차지하는 시간을 로깅 설정별로 비교합니다.
+Lambda Receiver 핸들러(API Gateway 이벤트 전체 덤프 포함)와 Lambda Bridge의 메시지당 로그
+(AgentCore 응답 덤프, 성능 메트릭, EMF 레코드)를 반복 실행하며 호출 스레드의 소요 시간을 측정합니다.
+로그는 Lambda 런타임처럼 별도 스레드가 읽어 가는 파이프로 출력합니다.
+
+설정:
+    - legacy: 텍스트 형식, 호출 스레드에서 출력, 페이로드 전체 덤프, 마스킹 없음 (기존 동작에 해당)
+    - json-sync: JSON 형식, 호출 스레드에서 출력, 페이로드 샘플링/마스킹 (Lambda Receiver 기본값)
+    - json-async: JSON 형식, 리스너 스레드에서 출력, 페이로드 샘플링/마스킹 (Lambda Bridge, AgentCore 기본값)
+    - off: LOG_LEVEL=CRITICAL (로깅을 제외한 처리 시간 기준선, EMF 레코드는 호출 스레드에서 계속 출력)
+
+Receiver 핸들러는 반환 전에 로그를 비우므로(Lambda 실행 환경 정지 대비) 리스너 스레드로 넘기는 비용이 그대로 더해지고,
+Bridge는 배치가 끝날 때 한 번만 비우므로 메시지 처리 중 출력 대기가 없습니다.
+
+Usage:
+    python benchmarks/bench_logging.py --requests 2000
+    python benchmarks/bench_logging.py --env LOG_PAYLOAD_SAMPLE=INFO=0.1 --json /tmp/logging.json
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'slack_prompts.jsonl')
+
+SCENARIOS: Dict[str, Dict[str, str]] = {
+    'legacy': {
+        'LOG_FORMAT': 'text', 'LOG_ASYNC': 'false', 'LOG_PAYLOAD_SAMPLE': 'INFO=1', 'LOG_REDACT_PROMPTS': 'false',
+    },
+    'json-sync': {'LOG_ASYNC': 'false'},
+    'json-async': {'LOG_ASYNC': 'true'},
+    'off': {'LOG_LEVEL': 'CRITICAL', 'LOG_ASYNC': 'false'},
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """정렬된 표본의 백분위수(최근접 순위)를 반환합니다."""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, int(round(pct / 100 * len(samples) + 0.5)) - 1))
+    return samples[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'mean': sum(ordered) / len(ordered) if ordered else 0.0,
+        'p50': percentile(ordered, 50),
+        'p99': percentile(ordered, 99),
+    }
+
+
+class PipeSink:
+    """별도 스레드가 읽어 가는 파이프 (Lambda 런타임의 stdout 수집에 해당)."""
+
+    def __init__(self):
+        read_fd, write_fd = os.pipe()
+        self.stream = os.fdopen(write_fd, 'w', encoding='utf-8')
+        self.bytes = 0
+        self._reader = os.fdopen(read_fd, 'rb', buffering=0)
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            chunk = self._reader.read(65536)
+            if not chunk:
+                return
+            self.bytes += len(chunk)
+
+
+class FakeSQS:
+    def send_message(self, **kwargs: Any) -> Dict[str, Any]:
+        return {'MessageId': 'bench'}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-request logging overhead by logging configuration")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="JSONL prompt corpus")
+    parser.add_argument('--requests', type=int, default=2000, help="requests per scenario and path")
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help="environment variable applied to every scenario")
+    parser.add_argument('--json', dest='json_path', help="write the full report as JSON")
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    defaults = {
+        'AWS_DEFAULT_REGION': 'us-east-1',
+        'AWS_ACCESS_KEY_ID': 'bench',
+        'AWS_SECRET_ACCESS_KEY': 'bench',
+        'SQS_QUEUE_URL': 'https://sqs.local/000000000000/slack-bot-bench',
+        'AGENTCORE_RUNTIME_ARN': 'arn:aws:bedrock-agentcore:us-east-1:000000000000:runtime/bench',
+        'SLACK_BOT_TOKEN': 'xoxb-bench',
+        'IDEMPOTENCY_BACKEND': 'none',
+        'ADMISSION_BACKEND': 'none',
+        'ENABLE_EMF_METRICS': 'true',
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+    for subdir in ('lambda-receiver', 'lambda-bridge', 'shared'):
+        sys.path.insert(0, os.path.join(ROOT_DIR, subdir))
+
+
+def api_gateway_event(prompt: str, index: int) -> Dict[str, Any]:
+    """Slack 메시지 이벤트를 담은 API Gateway 프록시 이벤트 (실제 요청 크기에 가깝게 헤더/컨텍스트 포함)."""
+    body = {
+        'token': 'bench-verification-token',
+        'team_id': 'T0BENCH',
+        'api_app_id': 'A0BENCH',
+        'type': 'event_callback',
+        'event_id': f'Ev{index:08d}',
+        'event_time': 1700000000 + index,
+        'event': {
+            'type': 'message',
+            'client_msg_id': f'msg-{index}',
+            'user': f'U{index % 16:04d}',
+            'channel': f'D{index % 16:04d}',
+            'channel_type': 'im',
+            'ts': f'1700000000.{index:06d}',
+            'text': prompt,
+            'blocks': [{
+                'type': 'rich_text',
+                'block_id': f'b{index}',
+                'elements': [{'type': 'rich_text_section', 'elements': [{'type': 'text', 'text': prompt}]}],
+            }],
+        },
+        'authorizations': [{'team_id': 'T0BENCH', 'user_id': 'U0BOT', 'is_bot': True}],
+    }
+    return {
+        'resource': '/slack/events',
+        'path': '/slack/events',
+        'httpMethod': 'POST',
+        'headers': {
+            'Accept': '*/*',
+            'Content-Type': 'application/json',
+            'Host': 'bench.execute-api.ap-northeast-2.amazonaws.com',
+            'User-Agent': 'Slackbot 1.0 (+https://api.slack.com/robots)',
+            'X-Amzn-Trace-Id': f'Root=1-bench-{index}',
+            'X-Forwarded-For': '3.0.0.1',
+            'X-Forwarded-Port': '443',
+            'X-Forwarded-Proto': 'https',
+            'X-Slack-Request-Timestamp': str(1700000000 + index),
+            'X-Slack-Signature': 'v0=' + 'a' * 64,
+        },
+        'requestContext': {
+            'accountId': '000000000000',
+            'apiId': 'bench',
+            'stage': 'prod',
+            'requestId': f'req-{index}',
+            'identity': {'sourceIp': '3.0.0.1', 'userAgent': 'Slackbot 1.0'},
+            'requestTimeEpoch': 1700000000000 + index,
+        },
+        'body': json.dumps(body, ensure_ascii=False),
+        'isBase64Encoded': False,
+    }
+
+
+def agentcore_response(prompt: str) -> Dict[str, Any]:
+    """AgentCore 응답 형태의 답변과 요청 메트릭."""
+    return {
+        'result': f"{prompt}에 대한 답변입니다. " * 20,
+        'metrics': {
+            'total_ms': 2310.4,
+            'stages': {
+                'agent_init': {'count': 1, 'total_ms': 0.8, 'max_ms': 0.8},
+                'retrieve': {'count': 1, 'total_ms': 152.3, 'max_ms': 152.3},
+                'prefetch_wait': {'count': 1, 'total_ms': 12.1, 'max_ms': 12.1},
+                'model_turn': {'count': 2, 'total_ms': 2050.2, 'max_ms': 1210.7},
+            },
+            'tokens': {'input': 3120, 'output': 412, 'cache_read': 2048, 'cache_write': 0},
+            'counters': {'retrieve_hedged': 0},
+            'cycles': 2,
+            'tool_calls': 1,
+            'cached': False,
+            'coalesced': False,
+            'prefetch': 'hit',
+            'stopped_by': None,
+            'route': {'tier': 'default', 'reason': 'complex', 'escalated': False},
+        },
+    }
+
+
+def run_scenario(name: str, prompts: List[str], args: argparse.Namespace, sink: PipeSink) -> Dict[str, Any]:
+    import lambda_bridge
+    import lambda_receiver
+    import structured_logging
+
+    for key in ('LOG_LEVEL', 'LOG_FORMAT', 'LOG_ASYNC', 'LOG_PAYLOAD_SAMPLE', 'LOG_REDACT_PROMPTS'):
+        os.environ.pop(key, None)
+    os.environ.update(SCENARIOS[name])
+    for item in args.env:
+        key, _, value = item.partition('=')
+        os.environ[key] = value
+    active = structured_logging.configure_logging(service='bench', stream=sink.stream)
+    written_before = sink.bytes
+
+    receiver_us: List[float] = []
+    bridge_us: List[float] = []
+    started = time.perf_counter()
+    for index in range(args.requests):
+        prompt = prompts[index % len(prompts)]
+        event = api_gateway_event(prompt, index)
+        start = time.perf_counter()
+        lambda_receiver.lambda_handler(event, None)
+        receiver_us.append((time.perf_counter() - start) * 1_000_000)
+
+        response_data = agentcore_response(prompt)
+        timings = {'slack_post': 85.2, 'agentcore_invoke': 40.1, 'agentcore_read': 2290.3, 'total': 2420.7}
+        start = time.perf_counter()
+        # Bridge가 메시지 하나를 처리하며 남기는 로그 (응답 수신 이후)
+        lambda_bridge.logger.info(
+            "Processing message from user %s in channel %s: %s",
+            'U0001', 'D0001', structured_logging.prompt_text(prompt)
+        )
+        structured_logging.log_payload(lambda_bridge.logger, logging.INFO, "AgentCore response", payload=response_data)
+        lambda_bridge._log_metrics(response_data, timings)
+        bridge_us.append((time.perf_counter() - start) * 1_000_000)
+    handler_s = time.perf_counter() - started
+
+    start = time.perf_counter()
+    active.flush(timeout=30)
+    drain_ms = (time.perf_counter() - start) * 1000
+    time.sleep(0.05)
+    stats = active.stats()
+    active.stop()
+    return {
+        'env': SCENARIOS[name],
+        'receiver_handler_us': summarize(receiver_us),
+        'bridge_logging_us': summarize(bridge_us),
+        'elapsed_s': handler_s,
+        'final_drain_ms': drain_ms,
+        'bytes_written': sink.bytes - written_before,
+        'dropped': stats['dropped'],
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    configure_environment(args)
+    with open(args.corpus, encoding='utf-8') as corpus_file:
+        prompts = [json.loads(line)['prompt'] for line in corpus_file if line.strip()]
+
+    sink = PipeSink()
+    import lambda_receiver
+    lambda_receiver.sqs_client = FakeSQS()
+
+    report = {name: run_scenario(name, prompts, args, sink) for name in (args.scenario or list(SCENARIOS))}
+
+    print(f"Requests per scenario: {args.requests}")
+    print(f"{'scenario':<12}{'receiver mean':>15}{'p50':>9}{'p99':>9}{'bridge mean':>14}{'p50':>9}{'p99':>9}"
+          f"{'log KB':>10}{'drain ms':>10}")
+    for name, result in report.items():
+        receiver, bridge = result['receiver_handler_us'], result['bridge_logging_us']
+        print(f"{name:<12}{receiver['mean']:>15.1f}{receiver['p50']:>9.1f}{receiver['p99']:>9.1f}"
+              f"{bridge['mean']:>14.1f}{bridge['p50']:>9.1f}{bridge['p99']:>9.1f}"
+              f"{result['bytes_written'] / 1024:>10.1f}{result['final_drain_ms']:>10.1f}")
+    print("(receiver: lambda_handler per request incl. end-of-invocation flush, bridge: per-message logging, µs)")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, ensure_ascii=False, indent=2)
+        print(f"\nReport written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Calculator Engine Check
+
+agentcore/calculator_engine.py의 계산 결과와 제한을 확인합니다.
+Python과 같은 내림 나눗셈/나머지, 아주 작은 결과의 지수 표기, 복리 계산처럼 밑이 1에 가까운
+거듭제곱, 계산 제한(자릿수/지수/허용되지 않은 연산)을 표로 정리하여 실행합니다.
+AWS 자격 증명이 필요하지 않으며, 실패한 항목이 있으면 종료 코드 1로 끝납니다.
+
+Usage:
+    python benchmarks/check_calculator.py
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import os
+import sys
+from typing import List, Tuple
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'agentcore'))
+
+from calculator_engine import CalculationError, evaluate, format_result  # noqa: E402
+
+# (수식, 표시 결과)
+RESULTS: List[Tuple[str, str]] = [
+    ('10 * 5', '50'),
+    ('0.1 + 0.2', '0.3'),
+    ('1/3', '0.3333333333'),
+    # Python과 같은 내림 나눗셈/나머지
+    ('-7 // 2', '-4'),
+    ('-7 % 3', '2'),
+    ('7 // -2', '-4'),
+    ('7 % -3', '-2'),
+    ('-7.5 % 2', '0.5'),
+    ('-6 % 3', '0'),
+    # 밑이 1에 가까운 거듭제곱 (복리 계산)
+    ('1.0000001 ** 1000', '1.000100005'),
+    ('1.05 ** 100', '131.5012578463'),
+    ('2 ** 61', '2305843009213693952'),
+    ('(-2) ** 3', '-8'),
+    # 소수점 10자리에서 0이 되는 값은 지수 표기
+    ('2 ** -1000', '9.332636185e-302'),
+    ('1e-12', '1e-12'),
+    # HR 계산 함수
+    ('연차수당(3000000, 3)', '344497.6076555024'),
+    ('연차일수(3)', '16'),
+]
+
+# 거부해야 하는 수식
+REJECTED: List[str] = [
+    '10 ** 30',
+    '10 ** 61',
+    '0.001 ** -100',
+    '9 ** 9 ** 9',
+    '(-8) ** 0.5',
+    '1 / 0',
+    '__import__("os")',
+    '[1] * 10',
+]
+
+
+def main() -> None:
+    failed = 0
+    for expression, expected in RESULTS:
+        try:
+            actual = format_result(evaluate(expression))
+        except CalculationError as e:
+            actual = f"<rejected: {e}>"
+        ok = actual == expected
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'}  {expression} = {actual}" + ('' if ok else f" (expected {expected})"))
+
+    for expression in REJECTED:
+        try:
+            actual = format_result(evaluate(expression))
+        except CalculationError as e:
+            print(f"ok    {expression} rejected: {e}")
+            continue
+        failed += 1
+        print(f"FAIL  {expression} = {actual} (expected rejection)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Idempotency Store Check against a DynamoDB Stand-in
+
+DynamoDB 멱등성/요청 수 제한 저장소를 standins.FakeDynamoDB에 연결하여
+조건부 쓰기(ConditionalCheckFailedException), TTL 만료, 키 해제, 처리 중 키 만료 후 재처리 흐름을 확인합니다.
+시간 경과는 FakeDynamoDB.elapse로 흉내 내므로 대기 없이 끝나며, AWS 자격 증명이 필요하지 않습니다.
+
+Usage:
+    python benchmarks/check_idempotency.py
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import os
+import sys
+import time
+import traceback
+from typing import Any, Callable, List, Tuple
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+for subdir in ('shared', 'lambda-bridge'):
+    sys.path.insert(0, os.path.join(ROOT_DIR, subdir))
+
+from admission import DynamoDBAdmissionBackend, InMemoryAdmissionBackend  # noqa: E402
+from idempotency import DynamoDBIdempotencyBackend, IdempotencyStore  # noqa: E402
+from standins import FakeDynamoDB  # noqa: E402
+
+TABLE = 'slack-bot-idempotency'
+
+
+def check_backend() -> None:
+    """put_if_absent / 만료 / delete / put과 조건부 쓰기 실패 경로를 확인합니다."""
+    dynamodb = FakeDynamoDB()
+    backend = DynamoDBIdempotencyBackend(TABLE, client=dynamodb)
+
+    assert backend.put_if_absent('receiver:Ev1', 60) is True
+    assert 'expires_at' in dynamodb.items['receiver:Ev1']
+    assert backend.put_if_absent('receiver:Ev1', 60) is False
+    assert dynamodb.conditional_failures == 1
+
+    # TTL이 지난 항목은 DynamoDB가 아직 삭제하지 않았어도 다시 잡을 수 있음
+    dynamodb.elapse(61)
+    assert backend.put_if_absent('receiver:Ev1', 60) is True
+
+    backend.delete('receiver:Ev1')
+    assert 'receiver:Ev1' not in dynamodb.items
+    assert backend.put_if_absent('receiver:Ev1', 60) is True
+
+    backend.put('receiver:Ev1', 3600)
+    dynamodb.elapse(61)
+    assert backend.put_if_absent('receiver:Ev1', 60) is False
+
+
+def check_in_progress_expiry() -> None:
+    """처리 중 키는 짧게 유지되어 타임아웃/OOM 후 재전달을 처리하고, 완료 후에는 전체 TTL 동안 중복을 거릅니다."""
+    dynamodb = FakeDynamoDB()
+    store = IdempotencyStore(
+        DynamoDBIdempotencyBackend(TABLE, client=dynamodb), namespace='bridge',
+        ttl_seconds=3600, in_progress_ttl_seconds=120
+    )
+
+    assert store.claim('C1:1700000000.000100') is True
+    assert store.claim('C1:1700000000.000100') is False
+    # release 없이 Lambda가 중단된 경우: 가시성 타임아웃 후 재전달되면 다시 처리
+    dynamodb.elapse(300)
+    assert store.claim('C1:1700000000.000100') is True
+
+    store.complete('C1:1700000000.000100')
+    dynamodb.elapse(300)
+    assert store.claim('C1:1700000000.000100') is False
+    dynamodb.elapse(3600)
+    assert store.claim('C1:1700000000.000100') is True
+
+    # 처리 실패로 해제한 키는 바로 다시 처리
+    store.release('C1:1700000000.000100')
+    assert store.claim('C1:1700000000.000100') is True
+    assert store.claim(None) is True
+
+
+def check_fail_open() -> None:
+    """조건부 쓰기 실패가 아닌 오류는 메시지 유실을 막기 위해 처리를 허용합니다."""
+
+    class BrokenDynamoDB(FakeDynamoDB):
+        def put_item(self, *args: Any, **kwargs: Any) -> Any:
+            raise ConnectionError("endpoint unreachable")
+
+    store = IdempotencyStore(DynamoDBIdempotencyBackend(TABLE, client=BrokenDynamoDB()), namespace='receiver')
+    assert store.claim('Ev2') is True
+    assert store.claim('Ev2') is True
+
+
+def check_admission_backend() -> None:
+    """요청 수 제한 버킷이 같은 테이블 스키마로 소진/보충/환불되는지 확인합니다."""
+    dynamodb = FakeDynamoDB()
+    backend = DynamoDBAdmissionBackend(TABLE, client=dynamodb)
+
+    assert [backend.take('admission:user:U1', rate=0.1, capacity=2) for _ in range(2)] == [0.0, 0.0]
+    assert backend.take('admission:user:U1', rate=0.1, capacity=2) > 0
+    backend.refund('admission:user:U1', capacity=2)
+    assert backend.take('admission:user:U1', rate=0.1, capacity=2) == 0.0
+    # 없는 버킷은 환불하지 않음 (조건부 갱신 실패는 무시)
+    backend.refund('admission:user:U2', capacity=2)
+    assert 'admission:user:U2' not in dynamodb.items
+
+
+def check_in_memory_purge() -> None:
+    """메모리 버킷 정리 시 버킷마다 자신의 보충 속도/용량으로 가득 찼는지 판단합니다."""
+    backend = InMemoryAdmissionBackend(max_entries=2)
+
+    # 느리게 보충되는 채널 버킷을 소진하고, 빠르게 보충되는 사용자 버킷을 하나 둠
+    assert [backend.take('admission:channel:C1', rate=0.01, capacity=3) for _ in range(3)] == [0.0] * 3
+    assert backend.take('admission:user:U1', rate=20, capacity=1) == 0.0
+    time.sleep(0.1)
+    # 새 사용자 버킷이 정리를 일으켜도 소진된 채널 버킷은 사용자 버킷의 속도로 보충되어 지워지지 않음
+    assert backend.take('admission:user:U2', rate=20, capacity=1) == 0.0
+    assert backend.take('admission:channel:C1', rate=0.01, capacity=3) > 0
+
+
+CHECKS: List[Tuple[str, Callable[[], None]]] = [
+    ('backend put_if_absent/expiry/delete', check_backend),
+    ('in-progress key expiry and completion', check_in_progress_expiry),
+    ('fail-open on backend errors', check_fail_open),
+    ('admission token bucket on the shared table', check_admission_backend),
+    ('in-memory admission purge uses per-bucket limits', check_in_memory_purge),
+]
+
+
+def main() -> None:
+    failed = 0
+    for name, check in CHECKS:
+        try:
+            check()
+            print(f"ok    {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL  {name} (line {traceback.extract_tb(e.__traceback__)[-1].lineno})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Slack Retry Behaviour Check - slack-sdk WebClient와 SlackDelivery 비교
+
+Lambda Bridge는 slack-sdk WebClient 대신 shared/slack_delivery.py(SlackDelivery + SlackHttpClient)를 사용합니다.
+같은 로컬 가짜 Slack API 서버(standins.FakeSlackApiServer)에 장애(429, 5xx, 연결 끊김, 4xx)를 주입하고
+세 클라이언트의 결과, 서버가 받은 요청 수, 소요 시간을 비교합니다.
+
+    - sdk-default: 기존 Bridge와 같은 WebClient(token=...) (기본 재시도: 연결 오류 1회)
+    - sdk-retry: WebClient + Connection/RateLimit/ServerError 재시도 핸들러 (각 max_retry_count=3)
+    - delivery: SlackDelivery(SlackHttpClient(...), max_retries=3)
+
+delivery의 성공/실패와 요청 수가 sdk-retry와 같은지 확인하며, 다르면 종료 코드 1로 끝납니다.
+slack-sdk는 배포 패키지에 포함하지 않으므로 비교할 때만 설치합니다 (pip install slack-sdk).
+
+Usage:
+    python benchmarks/check_slack_retry.py
+    python benchmarks/check_slack_retry.py --retry-after 2
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'shared'))
+
+from slack_delivery import MemorySlackClient, SlackApiError, SlackDelivery, SlackHttpClient  # noqa: E402
+from standins import FakeSlackApiServer  # noqa: E402
+
+MAX_RETRIES = 3
+
+# (이름, 주입할 장애)
+SCENARIOS: List[Tuple[str, List[Any]]] = [
+    ('ok', []),
+    ('429 once', [429]),
+    ('429 x4', [429] * 4),
+    ('503 once', [503]),
+    ('500 x4', [500] * 4),
+    ('disconnect once', ['disconnect']),
+    ('400', [400]),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare Slack retry/429 behaviour with slack-sdk WebClient")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After (s) returned with 429 responses")
+    return parser.parse_args()
+
+
+def sdk_client(base_url: str, with_retries: bool) -> Callable[[], str]:
+    from slack_sdk import WebClient
+    from slack_sdk.errors import SlackApiError as SdkApiError
+    from slack_sdk.http_retry.builtin_handlers import (
+        ConnectionErrorRetryHandler, RateLimitErrorRetryHandler, ServerErrorRetryHandler
+    )
+
+    if with_retries:
+        client = WebClient(token='xoxb-check', base_url=base_url, retry_handlers=[
+            ConnectionErrorRetryHandler(max_retry_count=MAX_RETRIES),
+            RateLimitErrorRetryHandler(max_retry_count=MAX_RETRIES),
+            ServerErrorRetryHandler(max_retry_count=MAX_RETRIES),
+        ])
+    else:
+        client = WebClient(token='xoxb-check', base_url=base_url)
+
+    def post() -> str:
+        try:
+            client.chat_postMessage(channel='C1', text='check')
+            return 'ok'
+        except SdkApiError as e:
+            return f"error {e.response.status_code}"
+        except Exception as e:
+            return f"error {type(e).__name__}"
+    return post
+
+
+def delivery_client(base_url: str) -> Callable[[], str]:
+    delivery = SlackDelivery(SlackHttpClient('xoxb-check', base_url=base_url), max_retries=MAX_RETRIES)
+
+    def post() -> str:
+        try:
+            delivery.call('chat.postMessage', 'C1', {'text': 'check'})
+            return 'ok'
+        except SlackApiError as e:
+            return f"error {e.status}"
+        except Exception as e:
+            return f"error {type(e).__name__}"
+    return post
+
+
+def run(server: FakeSlackApiServer, factory: Callable[[], Callable[[], str]], faults: List[Any]) -> Dict[str, Any]:
+    post = factory()
+    server.inject(*faults)
+    before = server.requests
+    started = time.perf_counter()
+    outcome = post()
+    return {
+        'outcome': outcome,
+        'requests': server.requests - before,
+        'elapsed_s': round(time.perf_counter() - started, 2),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.WARNING)
+    server = FakeSlackApiServer(MemorySlackClient(), retry_after=args.retry_after).start()
+    clients: Dict[str, Callable[[], Callable[[], str]]] = {
+        'sdk-default': lambda: sdk_client(server.base_url, with_retries=False),
+        'sdk-retry': lambda: sdk_client(server.base_url, with_retries=True),
+        'delivery': lambda: delivery_client(server.base_url),
+    }
+
+    mismatches = 0
+    print(f"{'scenario':<18}" + ''.join(f"{name:<30}" for name in clients))
+    try:
+        for name, faults in SCENARIOS:
+            results = {client: run(server, factory, faults) for client, factory in clients.items()}
+            print(f"{name:<18}" + ''.join(
+                f"{result['outcome'] + ', ' + str(result['requests']) + ' req, ' + str(result['elapsed_s']) + 's':<30}"
+                for result in results.values()
+            ))
+            expected, actual = results['sdk-retry'], results['delivery']
+            if (expected['outcome'] == 'ok') != (actual['outcome'] == 'ok') or expected['requests'] != actual['requests']:
+                mismatches += 1
+                print(f"  MISMATCH: delivery differs from sdk-retry in '{name}'")
+    finally:
+        server.stop()
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
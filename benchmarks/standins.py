@@ -0,0 +1,623 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local Stand-ins for End-to-end Benchmarks
+
+Slack, SQS, DynamoDB, AgentCore Runtime, Bedrock Knowledge Base, Bedrock 모델을 대신하는
+프로세스 내 가짜 구현입니다. 각 구현은 설정한 지연 시간만큼 대기한 뒤 실제 API와
+같은 형태의 응답을 반환하므로, AWS 없이 파이프라인 전체의 처리량과 지연 시간을 측정할 수 있습니다.
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import asyncio
+import io
+import json
+import operator
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+from strands.models.model import Model
+
+
+@dataclass
+class Latency:
+    """주입할 지연 시간(ms)과 무작위 편차 비율입니다. (예: 100ms, jitter 0.2 → 80~120ms)"""
+    ms: float = 0.0
+    jitter: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """지연 시간(초)을 샘플링합니다."""
+        if self.ms <= 0:
+            return 0.0
+        spread = self.ms * self.jitter
+        return max(0.0, self.ms + rng.uniform(-spread, spread)) / 1000
+
+    def sleep(self, rng: random.Random) -> None:
+        delay = self.sample(rng)
+        if delay:
+            time.sleep(delay)
+
+
+class _Jittered:
+    """스레드 안전한 난수 생성기를 공유하는 베이스 클래스입니다."""
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _wait(self, latency: Latency) -> None:
+        with self._rng_lock:
+            delay = latency.sample(self._rng)
+        if delay:
+            time.sleep(delay)
+
+
+class FakeLambdaContext:
+    """Lambda 컨텍스트 대용. 생성 시점부터 timeout 초가 지나면 남은 시간이 0이 됩니다."""
+
+    def __init__(self, timeout: float):
+        self._expires_at = time.time() + timeout
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._expires_at - time.time()) * 1000))
+
+
+class FakeSQS(_Jittered):
+    """boto3 SQS 클라이언트 대용. send_message로 받은 메시지를 메모리 큐에 보관합니다 (DelaySeconds 지원)."""
+
+    def __init__(self, latency: Latency, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.latency = latency
+        self.messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self.delayed = 0
+
+    def send_message(self, QueueUrl: str, MessageBody: str, DelaySeconds: int = 0, **kwargs: Any) -> Dict[str, Any]:
+        self._wait(self.latency)
+        message_id = str(uuid.uuid4())
+
+        def enqueue() -> None:
+            self.messages.put({
+                'messageId': message_id,
+                'body': MessageBody,
+                'attributes': {'SentTimestamp': str(int(time.time() * 1000))},
+                'enqueued_at': time.perf_counter(),
+            })
+
+        if DelaySeconds:
+            with self._rng_lock:
+                self.delayed += 1
+            timer = threading.Timer(DelaySeconds, enqueue)
+            timer.daemon = True
+            timer.start()
+        else:
+            enqueue()
+        return {'MessageId': message_id}
+
+    def receive_batch(self, max_messages: int, window_seconds: float, stop: threading.Event) -> List[Dict[str, Any]]:
+        """Lambda 이벤트 소스 매핑처럼 최대 max_messages개 또는 window_seconds까지 모아 반환합니다."""
+        batch: List[Dict[str, Any]] = []
+        deadline: Optional[float] = None
+        while len(batch) < max_messages:
+            timeout = 0.05 if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                batch.append(self.messages.get(timeout=timeout))
+            except queue.Empty:
+                if batch and (deadline is None or time.perf_counter() >= deadline):
+                    break
+                if not batch and stop.is_set():
+                    break
+                continue
+            if deadline is None:
+                deadline = time.perf_counter() + window_seconds
+        return batch
+
+
+class FakeDynamoDB(_Jittered):
+    """boto3 DynamoDB 클라이언트 대용. 멱등성/요청 수 제한 저장소가 쓰는 연산만 지원합니다.
+
+    - put_item / get_item / delete_item, update_item (`ADD 속성 :값` 형식)
+    - ConditionExpression: `attribute_exists(a)`, `attribute_not_exists(a)`, `a <op> :값`을 AND/OR로 연결
+      (괄호 없음, AND 우선), 조건이 거짓이면 ConditionalCheckFailedException (botocore ClientError)
+    - 테이블 구분 없이 파티션 키 `pk`로 저장하며, TTL 만료 항목은 삭제하지 않음 (DynamoDB TTL도 지연 삭제)
+    """
+
+    _COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+        '=': operator.eq, '<>': operator.ne, '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+    }
+    _COMPARISON = re.compile(r'^(\w+)\s*(<>|<=|>=|=|<|>)\s*(:\w+)$')
+    _FUNCTION = re.compile(r'^(attribute_exists|attribute_not_exists)\((\w+)\)$')
+
+    def __init__(self, latency: Optional[Latency] = None, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.latency = latency or Latency()
+        self.items: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self.calls = 0
+        self.conditional_failures = 0
+        self._lock = threading.Lock()
+
+    def elapse(self, seconds: float, attribute: str = 'expires_at') -> None:
+        """시간이 흐른 것처럼 모든 항목의 epoch 초 속성을 seconds만큼 앞당깁니다 (TTL 만료 확인용)."""
+        with self._lock:
+            for item in self.items.values():
+                if attribute in item:
+                    item[attribute] = {'N': str(float(item[attribute]['N']) - seconds)}
+
+    def put_item(self, TableName: str, Item: Dict[str, Dict[str, str]], **kwargs: Any) -> Dict[str, Any]:
+        self._begin()
+        with self._lock:
+            key = Item['pk']['S']
+            self._check(self.items.get(key), kwargs)
+            self.items[key] = dict(Item)
+        return {}
+
+    def get_item(self, TableName: str, Key: Dict[str, Dict[str, str]], **kwargs: Any) -> Dict[str, Any]:
+        self._begin()
+        with self._lock:
+            item = self.items.get(Key['pk']['S'])
+            return {'Item': dict(item)} if item is not None else {}
+
+    def delete_item(self, TableName: str, Key: Dict[str, Dict[str, str]], **kwargs: Any) -> Dict[str, Any]:
+        self._begin()
+        with self._lock:
+            key = Key['pk']['S']
+            self._check(self.items.get(key), kwargs)
+            self.items.pop(key, None)
+        return {}
+
+    def update_item(
+        self,
+        TableName: str,
+        Key: Dict[str, Dict[str, str]],
+        UpdateExpression: str,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        self._begin()
+        action, attribute, placeholder = UpdateExpression.split()
+        if action != 'ADD':
+            raise ValueError(f"Unsupported UpdateExpression: {UpdateExpression}")
+        with self._lock:
+            key = Key['pk']['S']
+            current = self.items.get(key)
+            self._check(current, kwargs)
+            item = dict(current or Key)
+            value = float(kwargs['ExpressionAttributeValues'][placeholder]['N'])
+            item[attribute] = {'N': repr(float(item.get(attribute, {'N': '0'})['N']) + value)}
+            self.items[key] = item
+        return {}
+
+    def _begin(self) -> None:
+        self._wait(self.latency)
+        with self._rng_lock:
+            self.calls += 1
+
+    def _check(self, item: Optional[Dict[str, Dict[str, str]]], request: Dict[str, Any]) -> None:
+        expression = request.get('ConditionExpression')
+        if not expression:
+            return
+        values = request.get('ExpressionAttributeValues') or {}
+        if not any(
+            all(self._evaluate(term.strip(), item, values) for term in clause.split(' AND '))
+            for clause in expression.split(' OR ')
+        ):
+            self.conditional_failures += 1
+            raise ClientError(
+                {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'The conditional request failed'}},
+                'ConditionalCheck'
+            )
+
+    def _evaluate(self, term: str, item: Optional[Dict[str, Dict[str, str]]], values: Dict[str, Any]) -> bool:
+        function = self._FUNCTION.match(term)
+        if function:
+            exists = item is not None and function.group(2) in item
+            return exists if function.group(1) == 'attribute_exists' else not exists
+        comparison = self._COMPARISON.match(term)
+        if not comparison:
+            raise ValueError(f"Unsupported ConditionExpression term: {term}")
+        attribute, op, placeholder = comparison.groups()
+        if item is None or attribute not in item:
+            return False
+        return self._COMPARISONS[op](_attribute_value(item[attribute]), _attribute_value(values[placeholder]))
+
+
+def _attribute_value(value: Dict[str, str]) -> Any:
+    """DynamoDB 속성 값({'N': ...} 또는 {'S': ...})을 비교 가능한 파이썬 값으로 변환합니다."""
+    return float(value['N']) if 'N' in value else value['S']
+
+
+class FakeSlackClient(_Jittered):
+    """Slack Web API 대용. 전송/갱신 시각을 기록하여 사용자 체감 지연 시간을 계산합니다.
+
+    SlackDelivery에는 api_call로 직접 연결하거나, FakeSlackApiServer로 감싸 HTTP로 연결합니다.
+
+    on_final은 스레드 루트 ts와 최종 답변이 반영된 시각으로 호출됩니다.
+    상태 메시지("생각 중", "대기 안내")와 스트리밍 커서가 붙은 부분 응답은 최종 답변으로 보지 않습니다.
+    """
+
+    STATUS_PREFIXES = ("🤔", "⏳")
+
+    def __init__(
+        self,
+        latency: Latency,
+        on_first_update: Callable[[str, float], None],
+        on_final: Callable[[str, float], None],
+        streaming_cursor: str,
+        seed: Optional[int] = None
+    ):
+        super().__init__(seed)
+        self.latency = latency
+        self.on_first_update = on_first_update
+        self.on_final = on_final
+        self.streaming_cursor = streaming_cursor
+        self.calls = 0
+        self._status_threads: Dict[str, str] = {}
+        self._updated: set = set()
+        self._lock = threading.Lock()
+
+    def chat_postMessage(self, channel: str, text: str, thread_ts: Optional[str] = None, **kwargs: Any) -> Dict[str, Any]:
+        self._wait(self.latency)
+        ts = f"{time.time():.6f}{uuid.uuid4().hex[:6]}"
+        with self._lock:
+            self.calls += 1
+            self._status_threads[ts] = thread_ts or ts
+        if not text.startswith(self.STATUS_PREFIXES) and thread_ts:
+            self.on_final(thread_ts, time.perf_counter())
+        return {'ok': True, 'channel': channel, 'ts': ts}
+
+    def chat_update(self, channel: str, ts: str, text: str, **kwargs: Any) -> Dict[str, Any]:
+        self._wait(self.latency)
+        now = time.perf_counter()
+        with self._lock:
+            self.calls += 1
+            thread_ts = self._status_threads.get(ts, ts)
+            if text.startswith(self.STATUS_PREFIXES):
+                return {'ok': True, 'channel': channel, 'ts': ts}
+            first = thread_ts not in self._updated
+            self._updated.add(thread_ts)
+        if first:
+            self.on_first_update(thread_ts, now)
+        if not text.endswith(self.streaming_cursor):
+            self.on_final(thread_ts, now)
+        return {'ok': True, 'channel': channel, 'ts': ts}
+
+    def api_call(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if method == 'chat.postMessage':
+            return self.chat_postMessage(**params)
+        if method == 'chat.update':
+            return self.chat_update(**params)
+        return {'ok': False, 'error': 'unknown_method'}
+
+
+class FakeSlackApiServer:
+    """로컬 가짜 Slack API HTTP 서버입니다. keep-alive(HTTP/1.1)를 지원하며,
+    채널별 초당 요청 수가 rate_limit을 넘으면 Retry-After와 함께 429를 반환합니다.
+    inject로 다음 요청들에 돌려줄 장애(HTTP 상태 코드 또는 'disconnect')를 순서대로 지정할 수 있습니다.
+
+    Args:
+        client: 실제 처리를 담당할 api_call 제공 객체 (FakeSlackClient)
+        rate_limit: 채널별 초당 허용 요청 수 (None이면 제한 없음)
+        retry_after: 429 응답의 Retry-After(초)
+    """
+
+    def __init__(self, client: Any, rate_limit: Optional[float] = None, retry_after: int = 1, port: int = 0):
+        self.client = client
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.rate_limited = 0
+        self.connections = 0
+        self.requests = 0
+        self._faults: Deque[Any] = deque()
+        self._recent: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/"
+
+    def inject(self, *faults: Any) -> None:
+        """다음 요청부터 차례로 장애를 반환합니다 (429는 Retry-After 포함, 'disconnect'는 응답 없이 연결 종료).
+
+        남아 있던 장애는 버리고 새로 지정한 장애로 바꿉니다.
+        """
+        with self._lock:
+            self._faults = deque(faults)
+
+    def _next_fault(self) -> Any:
+        with self._lock:
+            self.requests += 1
+            return self._faults.popleft() if self._faults else None
+
+    def _over_limit(self, channel: str) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent.setdefault(channel, deque())
+            while recent and now - recent[0] >= 1.0:
+                recent.popleft()
+            if len(recent) >= self.rate_limit:
+                self.rate_limited += 1
+                return True
+            recent.append(now)
+            return False
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+            def _send(self, status: int, payload: Dict[str, Any], headers: Tuple[Tuple[str, str], ...] = ()) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get('Content-Length') or 0)
+                params = json.loads(self.rfile.read(length) or b'{}')
+                method = self.path.rsplit('/', 1)[-1]
+                fault = server._next_fault()
+                if fault == 'disconnect':
+                    self.close_connection = True
+                    return
+                if fault == 429:
+                    self._send(429, {'ok': False, 'error': 'ratelimited'}, (('Retry-After', str(server.retry_after)),))
+                    return
+                if fault is not None:
+                    self._send(fault, {'ok': False, 'error': 'fatal_error' if fault >= 500 else 'invalid_request'})
+                    return
+                if server._over_limit(params.get('channel', '')):
+                    self._send(429, {'ok': False, 'error': 'ratelimited'}, (('Retry-After', str(server.retry_after)),))
+                    return
+                self._send(200, server.client.api_call(method, params))
+
+        return Handler
+
+    def start(self) -> 'FakeSlackApiServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-slack-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeKnowledgeBase(_Jittered):
+    """bedrock-agent-runtime 클라이언트 대용. retrieve 호출마다 고정 형식의 문서를 반환합니다.
+
+    Args:
+        latency: 일반 retrieve 지연 시간
+        slow_ratio: slow_latency로 응답하는 호출 비율 (꼬리 지연 주입)
+        slow_latency: 느린 호출의 지연 시간
+        error_ratio: 지연 후 오류를 내는 호출 비율
+    """
+
+    def __init__(
+        self,
+        latency: Latency,
+        number_of_documents: int = 5,
+        seed: Optional[int] = None,
+        slow_ratio: float = 0.0,
+        slow_latency: Optional[Latency] = None,
+        error_ratio: float = 0.0
+    ):
+        super().__init__(seed)
+        self.latency = latency
+        self.number_of_documents = number_of_documents
+        self.slow_ratio = slow_ratio
+        self.slow_latency = slow_latency or latency
+        self.error_ratio = error_ratio
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def retrieve(self, knowledgeBaseId: str, retrievalQuery: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        with self._rng_lock:
+            slow = self._rng.random() < self.slow_ratio
+            failed = self._rng.random() < self.error_ratio
+        self._wait(self.slow_latency if slow else self.latency)
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.errors += 1
+        if failed:
+            raise ConnectionError("Injected Knowledge Base failure")
+        query = retrievalQuery.get('text', '')
+        configured = kwargs.get('retrievalConfiguration', {}).get('vectorSearchConfiguration', {})
+        count = configured.get('numberOfResults', self.number_of_documents)
+        return {
+            'retrievalResults': [
+                {
+                    'content': {'text': f"[{query}] 관련 규정 {index + 1}: 취업규칙 제{10 + index}조에 따라 "
+                                        f"연차 15일, 통상임금 기준 수당을 지급한다. " * 3},
+                    'score': round(0.9 - index * 0.05, 2),
+                    'location': {'s3Location': {'uri': f"s3://hr-docs/policy-{index % 3}.pdf"}},
+                }
+                for index in range(count)
+            ]
+        }
+
+
+class FakeModel(Model):
+    """Strands 모델 대용. 실제 Agent 루프(도구 호출 포함)를 그대로 거치도록 응답을 스트리밍합니다.
+
+    - 첫 턴: search_hr_documents 도구 호출
+    - 질문에 calculations 항목이 있으면 다음 턴에서 calculator 도구 호출
+    - 마지막 턴: 답변 텍스트를 여러 조각으로 스트리밍
+
+    Args:
+        turn_latency: 턴당 첫 토큰까지의 지연 시간
+        token_latency: 답변 조각 사이 지연 시간
+        calculations: 질문 → 계산식 매핑
+    """
+
+    def __init__(
+        self,
+        turn_latency: Latency,
+        token_latency: Latency,
+        answer: str = "문의하신 내용은 취업규칙에 따라 연차 15일이 부여됩니다. 자세한 사항은 인사팀에 문의해 주세요.",
+        chunk_size: int = 8,
+        calculations: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None
+    ):
+        self.turn_latency = turn_latency
+        self.token_latency = token_latency
+        self.answer = answer
+        self.chunk_size = chunk_size
+        self.calculations = calculations or {}
+        self.config: Dict[str, Any] = {'model_id': 'fake-model'}
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        raise NotImplementedError("FakeModel does not support structured output")
+        yield  # pragma: no cover
+
+    async def _sleep(self, latency: Latency) -> None:
+        with self._rng_lock:
+            delay = latency.sample(self._rng)
+        if delay:
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _user_prompt(messages: List[Dict[str, Any]]) -> str:
+        for message in reversed(messages):
+            if message['role'] != 'user':
+                continue
+            texts = [block['text'] for block in message['content'] if 'text' in block]
+            if texts:
+                return texts[0]
+        return ''
+
+    @staticmethod
+    def _used_tools(messages: List[Dict[str, Any]]) -> List[str]:
+        # 마지막 사용자 질문 이후에 호출된 도구 목록
+        used: List[str] = []
+        for message in reversed(messages):
+            if message['role'] == 'user' and any('text' in block for block in message['content']):
+                break
+            for block in message['content']:
+                if 'toolUse' in block:
+                    used.append(block['toolUse']['name'])
+        return used
+
+    def _tool_call(self, name: str, tool_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {'contentBlockStart': {'start': {'toolUse': {'toolUseId': f"tool-{uuid.uuid4().hex[:12]}", 'name': name}}}},
+            {'contentBlockDelta': {'delta': {'toolUse': {'input': json.dumps(tool_input, ensure_ascii=False)}}}},
+            {'contentBlockStop': {}},
+            {'messageStop': {'stopReason': 'tool_use'}},
+        ]
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: Optional[List[Dict[str, Any]]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        await self._sleep(self.turn_latency)
+        prompt = self._user_prompt(messages)
+        used = self._used_tools(messages)
+        tool_names = {spec['name'] for spec in tool_specs or []}
+        input_tokens = sum(len(json.dumps(message['content'], ensure_ascii=False)) for message in messages) // 2
+        input_tokens += len(system_prompt or '') // 2
+
+        yield {'messageStart': {'role': 'assistant'}}
+        output_text = ''
+        if 'search_hr_documents' in tool_names and 'search_hr_documents' not in used:
+            for event in self._tool_call('search_hr_documents', {'query': prompt}):
+                yield event
+        elif prompt in self.calculations and 'calculator' in tool_names and 'calculator' not in used:
+            for event in self._tool_call('calculator', {'expression': self.calculations[prompt]}):
+                yield event
+        else:
+            yield {'contentBlockStart': {'start': {}}}
+            for start in range(0, len(self.answer), self.chunk_size):
+                await self._sleep(self.token_latency)
+                chunk = self.answer[start:start + self.chunk_size]
+                output_text += chunk
+                yield {'contentBlockDelta': {'delta': {'text': chunk}}}
+            yield {'contentBlockStop': {}}
+            yield {'messageStop': {'stopReason': 'end_turn'}}
+
+        output_tokens = max(1, len(output_text) // 2)
+        yield {
+            'metadata': {
+                'usage': {'inputTokens': input_tokens, 'outputTokens': output_tokens,
+                          'totalTokens': input_tokens + output_tokens},
+                'metrics': {'latencyMs': 0},
+            }
+        }
+
+
+class _SSEBody:
+    """AgentCore 스트리밍 응답 본문 대용. 엔트리포인트 제너레이터를 SSE 줄로 변환합니다."""
+
+    def __init__(self, events: Iterator[Dict[str, Any]]):
+        self._events = events
+
+    def iter_lines(self) -> Iterator[bytes]:
+        for event in self._events:
+            yield f"data: {json.dumps(event, ensure_ascii=False)}".encode('utf-8')
+            yield b''
+
+
+class FakeAgentCoreClient(_Jittered):
+    """bedrock-agentcore 클라이언트 대용. invoke_agent_runtime을 같은 프로세스의 엔트리포인트로 전달합니다.
+
+    Args:
+        entrypoint: AgentCore 엔트리포인트 함수 (agent.invoke)
+        latency: 런타임 호출 오버헤드 (네트워크, 세션 라우팅)
+    """
+
+    def __init__(self, entrypoint: Callable[..., Any], latency: Latency, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.entrypoint = entrypoint
+        self.latency = latency
+
+    def invoke_agent_runtime(self, agentRuntimeArn: str, runtimeSessionId: str, payload: bytes, **kwargs: Any) -> Dict[str, Any]:
+        self._wait(self.latency)
+        result = self.entrypoint(json.loads(payload), SimpleNamespace(session_id=runtimeSessionId))
+        if isinstance(result, dict):
+            return {
+                'contentType': 'application/json',
+                'response': io.BytesIO(json.dumps(result, ensure_ascii=False).encode('utf-8')),
+            }
+        return {'contentType': 'text/event-stream', 'response': _SSEBody(result)}
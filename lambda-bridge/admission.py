@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Admission Control - 사용자/채널별 요청 수 제한
+
+한 채널이나 한 사용자가 질문을 몰아서 보내면 Bridge 동시 실행 수와 AgentCore 용량을 독점하여
+다른 사용자의 지연 시간이 늘어납니다. 사용자별, 채널별 토큰 버킷으로 처리량을 제한하고,
+제한을 넘은 메시지는 Bridge가 지연 시간을 두고 SQS에 다시 넣어 나중에 처리합니다.
+
+Backends:
+    - memory: 프로세스 메모리 (Lambda 웜 인스턴스 단위)
+    - dynamodb: DynamoDB 조건부 쓰기 (인스턴스 간 공유, DynamoDB Local로 로컬 테스트 가능)
+    - none: 요청 수 제한 비활성화
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import logging
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionBackend:
+    """토큰 버킷 상태 저장소 인터페이스입니다."""
+
+    def take(self, key: str, rate: float, capacity: float) -> float:
+        """토큰 하나를 사용합니다. 사용했으면 0을, 토큰이 없으면 다음 토큰까지 남은 시간(초)을 반환합니다."""
+        raise NotImplementedError
+
+    def refund(self, key: str, capacity: float) -> None:
+        """사용한 토큰 하나를 되돌립니다 (다른 버킷에서 거절된 경우)."""
+        raise NotImplementedError
+
+
+def _refill(tokens: float, updated_at: float, now: float, rate: float, capacity: float) -> Tuple[float, float]:
+    """보충된 토큰 수와, 토큰이 부족할 때 다음 토큰까지 남은 시간(초)을 반환합니다."""
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+    return tokens, wait
+
+
+class InMemoryAdmissionBackend(AdmissionBackend):
+    """프로세스 메모리 기반 저장소입니다. 최대 항목 수를 넘으면 가득 찬(유휴) 버킷부터 정리합니다."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        # key -> (tokens, updated_at, rate, capacity): 정리할 때 버킷마다 자신의 보충 속도/용량을 사용
+        self._buckets: Dict[str, Tuple[float, float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, capacity: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now, rate, capacity))[:2]
+            tokens, wait = _refill(tokens, updated_at, now, rate, capacity)
+            if wait == 0.0:
+                tokens -= 1
+            if key not in self._buckets and len(self._buckets) >= self.max_entries:
+                self._purge(now)
+            self._buckets[key] = (tokens, now, rate, capacity)
+            return wait
+
+    def refund(self, key: str, capacity: float) -> None:
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated_at, rate, bucket_capacity = self._buckets[key]
+                self._buckets[key] = (min(capacity, tokens + 1), updated_at, rate, bucket_capacity)
+
+    def _purge(self, now: float) -> None:
+        """다시 가득 찬 버킷(새 버킷과 같은 상태)을 제거하고, 그래도 가득 차 있으면 오래된 것부터 제거합니다."""
+        for key in [k for k, (tokens, updated_at, rate, capacity) in self._buckets.items()
+                    if _refill(tokens, updated_at, now, rate, capacity)[0] >= capacity]:
+            del self._buckets[key]
+        overflow = len(self._buckets) - self.max_entries + 1
+        if overflow > 0:
+            for key in sorted(self._buckets, key=lambda k: self._buckets[k][1])[:overflow]:
+                del self._buckets[key]
+
+
+class DynamoDBAdmissionBackend(AdmissionBackend):
+    """DynamoDB 조건부 쓰기 기반 저장소입니다.
+
+    멱등성 테이블과 같은 스키마(문자열 파티션 키 `pk`, TTL 속성 `expires_at`)를 사용하므로
+    같은 테이블을 공유할 수 있습니다. 버킷 갱신은 `updated_at` 비교로 낙관적 동시성 제어를 합니다.
+    endpoint_url로 DynamoDB Local을 사용할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        client: Optional[Any] = None,
+        region_name: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        max_attempts: int = 3
+    ):
+        self.table_name = table_name
+        self.max_attempts = max_attempts
+        self._client = client
+        self._region_name = region_name
+        self._endpoint_url = endpoint_url
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('dynamodb', region_name=self._region_name, endpoint_url=self._endpoint_url)
+        return self._client
+
+    def take(self, key: str, rate: float, capacity: float) -> float:
+        for _ in range(self.max_attempts):
+            now = time.time()
+            item = self.client.get_item(
+                TableName=self.table_name, Key={'pk': {'S': key}}, ConsistentRead=True
+            ).get('Item')
+            if item:
+                tokens, wait = _refill(
+                    float(item['tokens']['N']), float(item['updated_at']['N']), now, rate, capacity
+                )
+            else:
+                tokens, wait = capacity, 0.0
+            if wait > 0:
+                return wait
+
+            request: Dict[str, Any] = {
+                'TableName': self.table_name,
+                'Item': {
+                    'pk': {'S': key},
+                    'tokens': {'N': f"{tokens - 1:.6f}"},
+                    'updated_at': {'N': f"{now:.6f}"},
+                    # 버킷이 다시 가득 찰 시간 이후에는 새 버킷과 같으므로 TTL로 삭제
+                    'expires_at': {'N': str(int(now + capacity / rate) + 60)},
+                },
+            }
+            if item:
+                request['ConditionExpression'] = 'updated_at = :previous'
+                request['ExpressionAttributeValues'] = {':previous': item['updated_at']}
+            else:
+                request['ConditionExpression'] = 'attribute_not_exists(pk)'
+            try:
+                self.client.put_item(**request)
+                return 0.0
+            except Exception as e:
+                if _error_code(e) != 'ConditionalCheckFailedException':
+                    raise
+        raise RuntimeError(f"Admission bucket contention on {key}")
+
+    def refund(self, key: str, capacity: float) -> None:
+        try:
+            self.client.update_item(
+                TableName=self.table_name,
+                Key={'pk': {'S': key}},
+                UpdateExpression='ADD tokens :one',
+                ConditionExpression='attribute_exists(pk) AND tokens <= :limit',
+                ExpressionAttributeValues={':one': {'N': '1'}, ':limit': {'N': str(capacity - 1)}}
+            )
+        except Exception as e:
+            if _error_code(e) != 'ConditionalCheckFailedException':
+                raise
+
+
+class NullAdmissionBackend(AdmissionBackend):
+    """요청 수를 제한하지 않는 저장소입니다."""
+
+    def take(self, key: str, rate: float, capacity: float) -> float:
+        return 0.0
+
+    def refund(self, key: str, capacity: float) -> None:
+        return None
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    """botocore ClientError(또는 호환 예외)의 오류 코드를 추출합니다."""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+@dataclass
+class AdmissionDecision:
+    """요청 수 제한 판정 결과입니다.
+
+    Attributes:
+        admitted: 지금 처리해도 되는지 여부
+        retry_after: 거절된 경우 다시 시도할 때까지 권장 대기 시간(초)
+        limited_by: 거절한 버킷 ('user' | 'channel')
+    """
+    admitted: bool
+    retry_after: float = 0.0
+    limited_by: Optional[str] = None
+
+
+class AdmissionController:
+    """사용자별, 채널별 토큰 버킷으로 메시지 처리 여부를 판정합니다.
+
+    백엔드 오류 시에는 메시지 처리를 허용합니다 (fail-open).
+
+    Args:
+        backend: 토큰 버킷 상태 저장소
+        user_rate, user_burst: 사용자별 분당 처리 수와 허용 버스트
+        channel_rate, channel_burst: 채널별 분당 처리 수와 허용 버스트
+        max_deferrals: 이 횟수만큼 미룬 메시지는 제한과 관계없이 처리 (무한 대기 방지)
+        max_delay: 재대기 최대 지연 시간(초) (SQS DelaySeconds 상한 900)
+    """
+
+    def __init__(
+        self,
+        backend: AdmissionBackend,
+        user_rate: float = 6.0,
+        user_burst: float = 3.0,
+        channel_rate: float = 30.0,
+        channel_burst: float = 10.0,
+        max_deferrals: int = 5,
+        max_delay: int = 900
+    ):
+        self.backend = backend
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.max_deferrals = max_deferrals
+        self.max_delay = max_delay
+
+    def admit(self, user: Optional[str], channel: Optional[str], deferrals: int = 0) -> AdmissionDecision:
+        """메시지를 지금 처리할지 판정합니다. 사용자 버킷을 먼저 확인하고, 채널 버킷에서 거절되면 사용자 토큰을 되돌립니다."""
+        if deferrals >= self.max_deferrals:
+            return AdmissionDecision(True)
+
+        buckets = [
+            (f"admission:user:{user}", 'user', self.user_rate, self.user_burst),
+            (f"admission:channel:{channel}", 'channel', self.channel_rate, self.channel_burst),
+        ]
+        taken = []
+        try:
+            for key, kind, per_minute, burst in buckets:
+                if per_minute <= 0 or (kind == 'user' and not user) or (kind == 'channel' and not channel):
+                    continue
+                wait = self.backend.take(key, per_minute / 60.0, max(1.0, burst))
+                if wait > 0:
+                    for taken_key, taken_burst in taken:
+                        self.backend.refund(taken_key, taken_burst)
+                    return AdmissionDecision(False, retry_after=wait, limited_by=kind)
+                taken.append((key, max(1.0, burst)))
+        except Exception as e:
+            logger.error("Admission check failed, processing anyway: %s", e)
+        return AdmissionDecision(True)
+
+    def backoff_delay(self, decision: AdmissionDecision, deferrals: int) -> int:
+        """재대기 지연 시간(초)입니다. 토큰 대기 시간에 미룬 횟수만큼 늘어나는 무작위 지연을 더합니다."""
+        jitter = random.uniform(0, 2 ** deferrals)
+        return int(min(self.max_delay, math.ceil(decision.retry_after + jitter)))
+
+
+def create_admission_from_env() -> AdmissionController:
+    """환경 변수로 요청 수 제한을 구성합니다.
+
+    Environment:
+        ADMISSION_BACKEND: memory (기본값) | dynamodb | none
+        IDEMPOTENCY_TABLE: DynamoDB 테이블 이름, 멱등성 키와 같은 테이블 공유 (기본값: slack-bot-idempotency)
+        ADMISSION_USER_RATE, ADMISSION_USER_BURST: 사용자별 분당 처리 수/버스트 (기본값: 6, 3)
+        ADMISSION_CHANNEL_RATE, ADMISSION_CHANNEL_BURST: 채널별 분당 처리 수/버스트 (기본값: 30, 10)
+        ADMISSION_MAX_DEFERRALS: 최대 재대기 횟수 (기본값: 5)
+        DYNAMODB_REGION: DynamoDB 리전 (기본값: AWS_REGION)
+        DYNAMODB_ENDPOINT_URL: DynamoDB Local 등 대체 엔드포인트 (선택)
+    """
+    backend_name = os.environ.get('ADMISSION_BACKEND', 'memory').lower()
+
+    if backend_name == 'dynamodb':
+        backend: AdmissionBackend = DynamoDBAdmissionBackend(
+            # Bridge IAM 정책은 멱등성 테이블에만 권한을 부여하므로 별도 테이블을 두지 않음 (키 접두사로 구분)
+            table_name=os.environ.get('IDEMPOTENCY_TABLE', 'slack-bot-idempotency'),
+            region_name=os.environ.get('DYNAMODB_REGION', os.environ.get('AWS_REGION')),
+            endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL') or None
+        )
+    elif backend_name == 'none':
+        backend = NullAdmissionBackend()
+    else:
+        backend = InMemoryAdmissionBackend()
+
+    controller = AdmissionController(
+        backend,
+        user_rate=float(os.environ.get('ADMISSION_USER_RATE', '6')),
+        user_burst=float(os.environ.get('ADMISSION_USER_BURST', '3')),
+        channel_rate=float(os.environ.get('ADMISSION_CHANNEL_RATE', '30')),
+        channel_burst=float(os.environ.get('ADMISSION_CHANNEL_BURST', '10')),
+        max_deferrals=int(os.environ.get('ADMISSION_MAX_DEFERRALS', '5'))
+    )
+    logger.info(
+        "Admission backend: %s (user %s/min burst %s, channel %s/min burst %s)",
+        backend_name, controller.user_rate, controller.user_burst, controller.channel_rate, controller.channel_burst
+    )
+    return controller
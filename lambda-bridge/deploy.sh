@@ -68,6 +68,11 @@ if [ -z "$FUNCTION_NAME" ]; then
     FUNCTION_NAME="slack-bot-bridge"
 fi
 
+# 배치 설정 (동시 처리 + 부분 배치 실패 보고)
+BATCH_SIZE=${BATCH_SIZE:-10}
+BATCHING_WINDOW=${BATCHING_WINDOW:-1}
+BATCH_CONCURRENCY=${BATCH_CONCURRENCY:-$BATCH_SIZE}
+
 echo ""
 echo "Verifying AWS credentials..."
 ACCOUNT_ID=$(aws sts get-caller-identity --profile "$AWS_PROFILE" --query Account --output text 2>/dev/null)
@@ -86,6 +91,7 @@ echo "  Account ID: $ACCOUNT_ID"
 echo "  AgentCore ARN: $AGENTCORE_RUNTIME_ARN"
 echo "  AgentCore Region: $AGENTCORE_REGION"
 echo "  SQS Queue ARN: $SQS_QUEUE_ARN"
+echo "  Batch Size: $BATCH_SIZE (window: ${BATCHING_WINDOW}s, concurrency: $BATCH_CONCURRENCY)"
 echo ""
 
 # IAM 역할 생성
@@ -122,11 +128,14 @@ aws iam attach-role-policy \
     --role-name $ROLE_NAME \
     --policy-arn arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole 2>/dev/null || true
 
+# 멱등성/요청 수 제한 저장소가 함께 쓰는 DynamoDB 테이블에 권한 부여
+sed "s|table/slack-bot-idempotency|table/${IDEMPOTENCY_TABLE:-slack-bot-idempotency}|" iam_policy.json > bridge-policy.json
+
 aws iam put-role-policy \
     --profile "$AWS_PROFILE" \
     --role-name $ROLE_NAME \
     --policy-name BridgePolicy \
-    --policy-document file://iam_policy.json
+    --policy-document file://bridge-policy.json
 
 ROLE_ARN="arn:aws:iam::$ACCOUNT_ID:role/$ROLE_NAME"
 echo "  Role ARN: $ROLE_ARN"
@@ -142,7 +151,8 @@ mkdir -p package
 echo "Python 의존성 설치 중..."
 pip3 install -r requirements.txt -t package/ --quiet
 
-cp lambda_bridge.py package/
+cp lambda_bridge.py admission.py package/
+cp ../shared/*.py package/
 cd package
 zip -r ../lambda_bridge.zip . -q
 cd ..
@@ -160,7 +170,7 @@ aws lambda create-function \
     --zip-file fileb://lambda_bridge.zip \
     --timeout 60 \
     --memory-size 256 \
-    --environment "Variables={SLACK_BOT_TOKEN=$SLACK_BOT_TOKEN,AGENTCORE_RUNTIME_ARN=$AGENTCORE_RUNTIME_ARN,AGENTCORE_REGION=$AGENTCORE_REGION}" \
+    --environment "Variables={SLACK_BOT_TOKEN=$SLACK_BOT_TOKEN,AGENTCORE_RUNTIME_ARN=$AGENTCORE_RUNTIME_ARN,AGENTCORE_REGION=$AGENTCORE_REGION,BATCH_CONCURRENCY=$BATCH_CONCURRENCY,IDEMPOTENCY_BACKEND=${IDEMPOTENCY_BACKEND:-memory},IDEMPOTENCY_TABLE=${IDEMPOTENCY_TABLE:-slack-bot-idempotency},ADMISSION_BACKEND=${ADMISSION_BACKEND:-memory}}" \
     --region $AWS_REGION
 
 echo "✅ Lambda 함수 생성 완료"
@@ -175,15 +185,16 @@ aws lambda create-event-source-mapping \
     --profile "$AWS_PROFILE" \
     --function-name $FUNCTION_NAME \
     --event-source-arn $SQS_QUEUE_ARN \
-    --batch-size 1 \
-    --maximum-batching-window-in-seconds 0 \
+    --batch-size $BATCH_SIZE \
+    --maximum-batching-window-in-seconds $BATCHING_WINDOW \
+    --function-response-types ReportBatchItemFailures \
     --enabled \
     --region $AWS_REGION
 
 echo "✅ SQS 트리거 연결 완료"
 
 # 정리
-rm -f trust-policy.json
+rm -f trust-policy.json bridge-policy.json
 echo ""
 echo "✅ Lambda Bridge 배포 완료!"
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
@@ -14,220 +14,614 @@ Created: 2025
 Version: 1.0
 """
 
+import hashlib
+import contextvars
 import json
 import logging
 import os
-import uuid
-from typing import Dict, List, Any, Optional
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Any, Optional
 
-import boto3
+# 공용 모듈 경로 (배포 패키지에는 함께 복사되며, 로컬 실행 시 ../shared 사용)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
 
-# Configure logging
+from admission import AdmissionDecision, create_admission_from_env  # noqa: E402
+from idempotency import create_store_from_env, message_event_key  # noqa: E402
+from slack_delivery import SlackDelivery, SlackDeliveryError, SlackHttpClient, extract_agent_text  # noqa: E402
+from structured_logging import (  # noqa: E402
+    configure_logging, emit_raw, log_context, log_payload, logged_handler, prompt_text
+)
+
+# Configure logging (JSON 한 줄 로그, 리스너 스레드에서 stdout 출력)
+configure_logging(service='lambda-bridge')
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
 # Environment configuration
 AGENTCORE_RUNTIME_ARN = os.environ.get('AGENTCORE_RUNTIME_ARN')
 SLACK_BOT_TOKEN = os.environ.get('SLACK_BOT_TOKEN')
 AGENTCORE_REGION = os.environ.get('AGENTCORE_REGION', 'us-east-1')
+# 배치 내 동시 처리 워커 수 (1이면 순차 처리)
+BATCH_CONCURRENCY = max(1, int(os.environ.get('BATCH_CONCURRENCY', '10')))
+# 부분 배치 실패 보고 (이벤트 소스 매핑에 ReportBatchItemFailures 설정 필요)
+REPORT_BATCH_ITEM_FAILURES = os.environ.get('REPORT_BATCH_ITEM_FAILURES', 'true').lower() == 'true'
+# AgentCore 스트리밍 응답 사용 여부 및 Slack 메시지 갱신 최소 간격(초)
+ENABLE_STREAMING = os.environ.get('ENABLE_STREAMING', 'true').lower() == 'true'
+STREAM_UPDATE_INTERVAL = float(os.environ.get('STREAM_UPDATE_INTERVAL', '1.0'))
+STREAMING_CURSOR = " ▌"
+THINKING_MESSAGE = "🤔 생각 중..."
+QUEUED_MESSAGE = "⏳ 요청이 많아 잠시 후 답변드릴게요. (약 {seconds}초 대기)"
+# 사용자 메시지의 스레드에 답변 (스레드 단위로 대화 세션 유지)
+REPLY_IN_THREAD = os.environ.get('REPLY_IN_THREAD', 'true').lower() == 'true'
+# CloudWatch Embedded Metric Format 메트릭 기록 여부 및 네임스페이스
+ENABLE_EMF_METRICS = os.environ.get('ENABLE_EMF_METRICS', 'true').lower() == 'true'
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'SlackHRAssistant')
+# Slack 전송 설정: API 주소(로컬 가짜 서버 테스트용), 채널별 초당 전송 수/버스트, 재시도 횟수
+SLACK_API_BASE_URL = os.environ.get('SLACK_API_BASE_URL', 'https://slack.com/api/')
+SLACK_CHANNEL_RATE = float(os.environ.get('SLACK_CHANNEL_RATE', '1.0'))
+SLACK_CHANNEL_BURST = float(os.environ.get('SLACK_CHANNEL_BURST', '5'))
+SLACK_MAX_RETRIES = int(os.environ.get('SLACK_MAX_RETRIES', '3'))
+# AgentCore 호출 마감: Lambda 남은 시간에서 답변 전송 시간을 뺀 시각을 payload로 전달, 응답 대기 제한(초)
+DEADLINE_SAFETY_SECONDS = float(os.environ.get('DEADLINE_SAFETY_SECONDS', '5'))
+AGENTCORE_CONNECT_TIMEOUT = float(os.environ.get('AGENTCORE_CONNECT_TIMEOUT', '5'))
+AGENTCORE_READ_TIMEOUT = float(os.environ.get('AGENTCORE_READ_TIMEOUT', '55'))
+# 비동기 전달: 채널/상태 메시지 ts를 넘기고 바로 반환, AgentCore가 Slack에 직접 답변 (AgentCore에 SLACK_BOT_TOKEN 필요)
+ASYNC_HANDOFF = os.environ.get('ASYNC_HANDOFF', 'false').lower() == 'true'
+
+# 처리 중 멱등성 키 유지 시간(초): Lambda 타임아웃보다 길고 SQS 가시성 타임아웃보다 짧게 (완료 후 IDEMPOTENCY_TTL로 연장)
+IDEMPOTENCY_IN_PROGRESS_TTL = float(os.environ.get('IDEMPOTENCY_IN_PROGRESS_TTL', '120'))
+
+# AWS clients (첫 메시지 처리 또는 warm-up 호출 시 생성, boto3 import도 함께 미룸)
+agentcore_client: Optional[Any] = None  # Lazy initialization
+sqs_client: Optional[Any] = None  # Lazy initialization (요청 수 제한으로 미룬 메시지 재대기 시 사용)
+
+# Slack 전송 계층 (웜 인스턴스 동안 keep-alive 연결과 채널별 속도 제한 상태 유지)
+slack_delivery = SlackDelivery(
+    SlackHttpClient(SLACK_BOT_TOKEN or '', base_url=SLACK_API_BASE_URL),
+    channel_rate=SLACK_CHANNEL_RATE,
+    channel_burst=SLACK_CHANNEL_BURST,
+    max_retries=SLACK_MAX_RETRIES,
+    background_workers=BATCH_CONCURRENCY
+)
+
+# 중복 메시지(Slack 재전송, SQS 재전달) 처리 방지
+idempotency_store = create_store_from_env(namespace='bridge', in_progress_ttl_seconds=IDEMPOTENCY_IN_PROGRESS_TTL)
+
+# 사용자/채널별 요청 수 제한
+admission = create_admission_from_env()
+
 
-# AWS clients initialization
-agentcore_client = boto3.client('bedrock-agentcore', region_name=AGENTCORE_REGION)
-slack_client: Optional[Any] = None  # Lazy initialization
+class AdmissionDeferred(Exception):
+    """요청 수 제한으로 메시지 처리를 미룬 경우 발생합니다 (지연 후 SQS에 다시 넣음).
 
+    Attributes:
+        delay: 재대기 지연 시간(초)
+        status_ts: 사용자에게 보낸 대기 안내 메시지 ts (처리 시 상태 메시지로 재사용)
+    """
 
-def lambda_handler(event: Dict[str, Any], context: Any) -> None:
-    """AWS Lambda 진입점 - SQS 메시지를 처리합니다."""
+    def __init__(self, delay: int, status_ts: Optional[str]):
+        super().__init__(f"Message deferred for {delay}s")
+        self.delay = delay
+        self.status_ts = status_ts
+
+
+@logged_handler
+def lambda_handler(event: Dict[str, Any], context: Any) -> Optional[Dict[str, Any]]:
+    """AWS Lambda 진입점 - SQS 메시지를 처리합니다.
+    
+    REPORT_BATCH_ITEM_FAILURES가 활성화되면 배치의 레코드를 워커 풀에서 동시에 처리하고,
+    실패한 메시지만 batchItemFailures로 반환하여 해당 메시지만 재시도되도록 합니다.
+    
+    Lambda 남은 실행 시간으로 AgentCore 응답 마감 시각을 계산하여 각 요청에 전달합니다.
+    """
+    if is_warmup_event(event):
+        return warm_up()
+    
     records = event.get('Records', [])
-    logger.info(f"Processing {len(records)} SQS messages")
+    logger.info("Processing %s SQS messages", len(records))
+    deadline = invocation_deadline(context)
+    
+    if not REPORT_BATCH_ITEM_FAILURES:
+        # 기존 동작: 순차 처리, 첫 실패 시 배치 전체 재시도
+        for record in records:
+            try:
+                process_record(record, deadline)
+            except Exception as e:
+                logger.error("Error processing SQS record: %s", e, exc_info=True)
+                raise
+        return None
     
+    failures = _process_batch(records, deadline)
+    if failures:
+        logger.warning("%s/%s SQS messages failed and will be retried", len(failures), len(records))
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failures]}
+
+
+def get_agentcore_client() -> Any:
+    """Lazy initialization of AgentCore client"""
+    global agentcore_client
+    if agentcore_client is None:
+        import boto3
+        from botocore.config import Config
+        
+        # 응답 대기 시간 초과 후 재시도하면 같은 질문으로 Agent가 다시 실행되므로 SDK 재시도는 사용하지 않음
+        agentcore_client = boto3.client(
+            'bedrock-agentcore',
+            region_name=AGENTCORE_REGION,
+            config=Config(
+                connect_timeout=AGENTCORE_CONNECT_TIMEOUT,
+                read_timeout=AGENTCORE_READ_TIMEOUT,
+                retries={'total_max_attempts': 1}
+            )
+        )
+    return agentcore_client
+
+
+def is_warmup_event(event: Dict[str, Any]) -> bool:
+    """SQS 레코드가 없는 EventBridge 예약 이벤트 또는 {"warmup": true} 호출인지 확인합니다."""
+    if event.get('Records'):
+        return False
+    return bool(event.get('warmup')) or event.get('source') == 'aws.events'
+
+
+def warm_up() -> Dict[str, Any]:
+    """AgentCore 클라이언트를 미리 생성하여 첫 메시지 처리 지연을 줄입니다."""
+    start = time.perf_counter()
+    get_agentcore_client()
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+    logger.info("Warm-up completed in %sms", elapsed_ms)
+    return {'warmed': ['bedrock-agentcore'], 'elapsed_ms': elapsed_ms}
+
+
+def invocation_deadline(context: Any) -> Optional[float]:
+    """Lambda 남은 실행 시간에서 답변 전송 시간을 뺀 AgentCore 응답 마감 시각(epoch 초)을 반환합니다."""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return None
+    return time.time() + context.get_remaining_time_in_millis() / 1000 - DEADLINE_SAFETY_SECONDS
+
+
+def process_record(record: Dict[str, Any], deadline: Optional[float] = None) -> None:
+    """단일 SQS 레코드를 처리합니다. 요청 수 제한으로 미룬 메시지는 지연 시간을 두고 다시 넣습니다."""
+    body = json.loads(record['body'])
+    
+    if 'event' in body and body['event'].get('type') == 'message':
+        with log_context(message_id=record.get('messageId')):
+            try:
+                handle_message(body['event'], body.get('admission'), deadline=deadline)
+            except AdmissionDeferred as deferred:
+                _requeue(record, body, deferred)
+    else:
+        logger.debug("Skipping non-message event: %s", body.get('type'))
+
+
+def _requeue(record: Dict[str, Any], body: Dict[str, Any], deferred: AdmissionDeferred) -> None:
+    """미룬 메시지를 DelaySeconds와 함께 원래 큐에 다시 넣습니다.
+    
+    실패하면 예외를 그대로 전달하여 SQS 가시성 타임아웃 후 재시도되도록 합니다.
+    """
+    global sqs_client
+    
+    # arn:aws:sqs:<region>:<account>:<queue>
+    arn_parts = record.get('eventSourceARN', '').split(':')
+    if len(arn_parts) != 6:
+        raise RuntimeError(f"Cannot requeue deferred message without eventSourceARN: {record.get('messageId')}")
+    region, account, queue_name = arn_parts[3], arn_parts[4], arn_parts[5]
+    
+    if sqs_client is None:
+        import boto3
+        sqs_client = boto3.client('sqs', region_name=region)
+    
+    state = body.get('admission') or {}
+    requeued = dict(body, admission={
+        'deferrals': int(state.get('deferrals', 0)) + 1,
+        'status_ts': deferred.status_ts,
+    })
+    sqs_client.send_message(
+        QueueUrl=f"https://sqs.{region}.amazonaws.com/{account}/{queue_name}",
+        MessageBody=json.dumps(requeued, ensure_ascii=False),
+        DelaySeconds=deferred.delay
+    )
+    logger.info("Requeued deferred message %s with %ss delay", record.get('messageId'), deferred.delay)
+
+
+def _fair_order(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """사용자별로 번갈아 처리되도록 배치 순서를 바꿉니다 (한 사용자의 연속 질문이 워커를 독점하지 않도록)."""
+    queues: Dict[Any, List[Dict[str, Any]]] = {}
     for record in records:
         try:
-            body = json.loads(record['body'])
-            
-            if 'event' in body and body['event'].get('type') == 'message':
-                handle_message(body['event'])
-            else:
-                logger.debug(f"Skipping non-message event: {body.get('type')}")
-                    
+            user = json.loads(record['body']).get('event', {}).get('user')
+        except (KeyError, TypeError, ValueError):
+            user = None
+        queues.setdefault(user, []).append(record)
+    
+    ordered: List[Dict[str, Any]] = []
+    pending = list(queues.values())
+    while pending:
+        ordered.extend(queue.pop(0) for queue in pending)
+        pending = [queue for queue in pending if queue]
+    return ordered
+
+
+def _process_batch(records: List[Dict[str, Any]], deadline: Optional[float] = None) -> List[str]:
+    """레코드를 제한된 워커 풀에서 동시에 처리하고 실패한 messageId 목록을 반환합니다."""
+    if not records:
+        return []
+    records = _fair_order(records)
+    
+    def _run(record: Dict[str, Any]) -> Optional[str]:
+        try:
+            process_record(record, deadline)
+            return None
         except Exception as e:
-            logger.error(f"Error processing SQS record: {str(e)}", exc_info=True)
-            raise
+            logger.error("Error processing SQS record %s: %s", record.get('messageId'), e, exc_info=True)
+            return record.get('messageId')
+    
+    workers = min(BATCH_CONCURRENCY, len(records))
+    if workers == 1:
+        outcomes = [_run(record) for record in records]
+    else:
+        # 워커 스레드에서도 요청 ID 등 로그 컨텍스트 유지
+        contexts = [contextvars.copy_context() for _ in records]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(lambda ctx, record: ctx.run(_run, record), contexts, records))
+    
+    return [message_id for message_id in outcomes if message_id]
 
 
-def handle_message(event_data: Dict[str, Any]) -> None:
-    """Slack 메시지를 처리하고 AgentCore Runtime으로 전달합니다."""
+def handle_message(
+    event_data: Dict[str, Any],
+    admission_state: Optional[Dict[str, Any]] = None,
+    deadline: Optional[float] = None
+) -> None:
+    """Slack 메시지를 처리하고 AgentCore Runtime으로 전달합니다.
+    
+    Args:
+        event_data: Slack 메시지 이벤트
+        admission_state: 이전에 미룬 메시지의 상태 ({'deferrals', 'status_ts'})
+        deadline: AgentCore 응답 마감 시각 (epoch 초, None이면 제한 없음)
+    
+    Raises:
+        AdmissionDeferred: 사용자/채널별 요청 수 제한을 넘어 처리를 미룬 경우
+    """
     # 봇 메시지, 빈 메시지, 메시지 편집/삭제 이벤트 무시
     if event_data.get('bot_id') or not event_data.get('text', '').strip():
         logger.debug("Skipping bot message or empty message")
         return
     
     if event_data.get('subtype') in ['message_changed', 'message_deleted']:
-        logger.debug(f"Skipping message subtype: {event_data.get('subtype')}")
+        logger.debug("Skipping message subtype: %s", event_data.get('subtype'))
+        return
+    
+    # 이미 처리 중이거나 처리한 메시지는 모델 호출 전에 건너뜀
+    event_key = message_event_key(event_data)
+    if not idempotency_store.claim(event_key):
+        logger.info("Skipping duplicate message %s", event_key)
         return
     
+    admission_state = admission_state or {}
+    deferrals = int(admission_state.get('deferrals', 0))
+    decision = admission.admit(event_data.get('user'), event_data.get('channel'), deferrals)
+    if not decision.admitted:
+        idempotency_store.release(event_key)
+        raise _defer(event_data, decision, deferrals, admission_state.get('status_ts'))
+    
+    try:
+        _handle_message(event_data, status_ts=admission_state.get('status_ts'), deadline=deadline)
+    except Exception:
+        # 처리 실패로 SQS 재시도되는 경우 다시 처리할 수 있도록 키 해제
+        idempotency_store.release(event_key)
+        raise
+    # 답변(또는 오류 안내)을 전달했으므로 중복 제거 기간을 IDEMPOTENCY_TTL로 연장
+    # (타임아웃/OOM으로 여기까지 오지 못하면 키는 IDEMPOTENCY_IN_PROGRESS_TTL 후 만료되어 재전달 시 다시 처리)
+    idempotency_store.complete(event_key)
+
+
+def _defer(
+    event_data: Dict[str, Any],
+    decision: AdmissionDecision,
+    deferrals: int,
+    status_ts: Optional[str]
+) -> AdmissionDeferred:
+    """처리를 미루고, 처음 미루는 메시지에는 대기 안내 메시지를 보냅니다."""
+    delay = admission.backoff_delay(decision, deferrals)
+    logger.warning(
+        "Deferring message from user %s in channel %s (%s limit, deferrals=%s, delay=%ss)",
+        event_data.get('user'), event_data.get('channel'), decision.limited_by, deferrals, delay
+    )
+    if status_ts is None:
+        thread_ts = event_data.get('thread_ts') or event_data.get('ts')
+        reply_thread_ts = thread_ts if REPLY_IN_THREAD or event_data.get('thread_ts') else None
+        notice = send_slack_message(
+            event_data.get('channel'), QUEUED_MESSAGE.format(seconds=delay), thread_ts=reply_thread_ts
+        )
+        status_ts = notice.get('ts') if notice else None
+    return AdmissionDeferred(delay, status_ts)
+
+
+def _handle_message(
+    event_data: Dict[str, Any],
+    status_ts: Optional[str] = None,
+    deadline: Optional[float] = None
+) -> None:
+    """중복 검사를 통과한 Slack 메시지를 AgentCore Runtime으로 전달하고 답변을 전송합니다.
+    
+    status_ts가 있으면 (대기 안내 메시지) 새 상태 메시지 대신 해당 메시지를 갱신합니다.
+    deadline이 있으면 payload에 epoch ms로 전달하여 AgentCore가 마감 전에 (부분) 답변을 반환하도록 합니다.
+    ASYNC_HANDOFF이면 채널과 상태 메시지 ts(reply_to)를 전달하고, AgentCore가 수락하면 답변을 기다리지 않고 반환합니다.
+    """
     user = event_data.get('user')
     text = event_data.get('text')
     channel = event_data.get('channel')
     
-    logger.info(f"Processing message from user {user} in channel {channel}: {text[:100]}...")
+    # 스레드 루트: 스레드 내 메시지는 thread_ts, 새 메시지는 자신의 ts
+    thread_ts = event_data.get('thread_ts') or event_data.get('ts')
+    reply_thread_ts = thread_ts if REPLY_IN_THREAD or event_data.get('thread_ts') else None
+    
+    logger.info("Processing message from user %s in channel %s: %s", user, channel, prompt_text(text))
     
-    # 초기 상태 메시지 전송
-    status_msg = send_slack_message(channel, "🤔 생각 중...")
-    status_ts = status_msg.get('ts') if status_msg else None
+    # 단계별 소요 시간(ms): slack_post, agentcore_invoke, agentcore_read
+    timings: Dict[str, float] = {}
+    started_at = time.perf_counter()
+    
+    # 초기 상태 메시지 전송 (대기 안내 메시지가 있으면 갱신)
+    with _timed(timings, 'slack_post'):
+        if not (status_ts and update_slack_message(channel, status_ts, THINKING_MESSAGE)):
+            status_msg = send_slack_message(channel, THINKING_MESSAGE, thread_ts=reply_thread_ts)
+            status_ts = status_msg.get('ts') if status_msg else None
     
     try:
-        payload = json.dumps({"prompt": text, "verbose": True}, ensure_ascii=False).encode('utf-8')
-        session_id = f"slack-{channel}-{user}-{uuid.uuid4().hex}"
+        # 상태 메시지가 있어야 부분 응답으로 갱신할 수 있음
+        handoff = ASYNC_HANDOFF and bool(status_ts)
+        stream = ENABLE_STREAMING and bool(status_ts) and not handoff
+        session_id = build_session_id(channel, thread_ts)
+        request = {"prompt": text, "verbose": True, "stream": stream, "session_id": session_id}
+        if handoff:
+            # AgentCore가 상태 메시지를 직접 갱신하므로 Lambda 마감 시각은 전달하지 않음
+            request["reply_to"] = {"channel": channel, "status_ts": status_ts, "thread_ts": reply_thread_ts}
+        elif deadline is not None:
+            request["deadline"] = int(deadline * 1000)
+        payload = json.dumps(request, ensure_ascii=False).encode('utf-8')
         
-        logger.info(f"Invoking AgentCore with session ID: {session_id}")
+        logger.info("Invoking AgentCore with session ID: %s", session_id)
         
         # AgentCore Runtime 호출
-        logger.info(f"Calling AgentCore Runtime ARN: {AGENTCORE_RUNTIME_ARN}")
-        
-        response = agentcore_client.invoke_agent_runtime(
-            agentRuntimeArn=AGENTCORE_RUNTIME_ARN,
-            runtimeSessionId=session_id,
-            payload=payload
-        )
+        logger.info("Calling AgentCore Runtime ARN: %s", AGENTCORE_RUNTIME_ARN)
         
-        # 응답 읽기
-        response_body = response.get('response')
-        if hasattr(response_body, 'read'):
-            response_body = response_body.read()
+        with _timed(timings, 'agentcore_invoke'):
+            response = get_agentcore_client().invoke_agent_runtime(
+                agentRuntimeArn=AGENTCORE_RUNTIME_ARN,
+                runtimeSessionId=session_id,
+                payload=payload
+            )
         
-        if isinstance(response_body, bytes):
-            response_body = response_body.decode('utf-8')
+        # 응답 읽기 (스트리밍 중 Slack 갱신 시간은 slack_post에 별도 집계)
+        with _timed(timings, 'agentcore_read'):
+            if 'text/event-stream' in response.get('contentType', ''):
+                response_data = _consume_stream(response['response'], channel, status_ts, timings)
+            else:
+                response_body = response.get('response')
+                if hasattr(response_body, 'read'):
+                    response_body = response_body.read()
+                
+                if isinstance(response_body, bytes):
+                    response_body = response_body.decode('utf-8')
+                
+                response_data = json.loads(response_body)
+        log_payload(logger, logging.INFO, "AgentCore response", payload=response_data)
         
-        response_data = json.loads(response_body)
-        logger.info(f"AgentCore response: {json.dumps(response_data)[:200]}...")
+        # 비동기 전달 수락: 답변은 AgentCore가 전송 (전달 설정이 없는 AgentCore는 평소처럼 답변을 반환)
+        if handoff and response_data.get('accepted'):
+            logger.info("AgentCore accepted reply delivery for status message %s", status_ts)
+            timings['total'] = (time.perf_counter() - started_at) * 1000
+            _log_metrics(response_data, timings)
+            return
         
         # 최종 응답 추출
-        answer = _extract_agent_response(response_data)
+        answer = extract_agent_text(response_data)
         final_message = answer
         
-        if status_ts:
-            update_slack_message(channel, status_ts, final_message)
-        else:
-            send_slack_message(channel, final_message)
+        with _timed(timings, 'slack_post'):
+            _deliver_reply(channel, status_ts, reply_thread_ts, final_message)
         
-        _log_metrics(response_data)
+        timings['total'] = (time.perf_counter() - started_at) * 1000
+        _log_metrics(response_data, timings)
         
+    except SlackDeliveryError:
+        # 답변을 전달하지 못한 메시지는 SQS 재시도로 다시 처리
+        raise
     except Exception as e:
-        logger.error(f"Error processing message: {str(e)}", exc_info=True)
+        logger.error("Error processing message: %s", e, exc_info=True)
         error_msg = f"❌ 오류가 발생했습니다: {str(e)}"
-        if status_ts:
-            update_slack_message(channel, status_ts, error_msg)
-        else:
-            send_slack_message(channel, error_msg)
+        try:
+            _deliver_reply(channel, status_ts, reply_thread_ts, error_msg)
+        except SlackDeliveryError as delivery_error:
+            logger.error("%s", delivery_error)
 
 
-def send_slack_message(channel: str, text: str) -> Optional[Dict[str, Any]]:
-    """Slack 채널에 메시지를 전송합니다."""
-    global slack_client
+def _deliver_reply(channel: str, status_ts: Optional[str], reply_thread_ts: Optional[str], text: str) -> None:
+    """상태 메시지를 최종 텍스트로 갱신하고, 갱신에 실패하면 새 메시지로 전송합니다.
     
-    if slack_client is None:
-        if not SLACK_BOT_TOKEN:
-            logger.error("SLACK_BOT_TOKEN environment variable not configured")
-            return None
+    Raises:
+        SlackDeliveryError: 갱신과 전송이 모두 실패한 경우
+    """
+    if status_ts and update_slack_message(channel, status_ts, text):
+        return
+    if status_ts:
+        logger.warning("Failed to update status message %s, posting a new message instead", status_ts)
+    if send_slack_message(channel, text, thread_ts=reply_thread_ts) is None:
+        raise SlackDeliveryError(f"Failed to deliver reply to channel {channel}")
+
+
+def build_session_id(channel: str, thread_ts: Optional[str]) -> str:
+    """채널과 스레드 루트 ts로 결정적인 AgentCore 세션 ID를 생성합니다.
+    
+    같은 스레드의 메시지는 같은 세션(같은 런타임 인스턴스와 대화 히스토리)을 사용합니다.
+    AgentCore 세션 ID는 최소 33자여야 하므로 해시를 사용합니다.
+    """
+    digest = hashlib.sha256(f"{channel}:{thread_ts}".encode('utf-8')).hexdigest()
+    return f"slack-thread-{digest[:40]}"
+
+
+def _consume_stream(
+    stream_body: Any,
+    channel: str,
+    status_ts: Optional[str],
+    timings: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """AgentCore SSE 응답을 순차적으로 읽으며 Slack 상태 메시지를 갱신합니다.
+    
+    텍스트 델타는 누적되고, STREAM_UPDATE_INTERVAL 간격으로 묶어서
+    update_slack_message를 호출하여 Slack API 호출 횟수를 제한합니다.
+    
+    Returns:
+        마지막 이벤트(최종 응답)의 데이터. 최종 이벤트가 없으면 누적 텍스트를 result로 반환
+    """
+    partial_text = ''
+    last_update = 0.0
+    updated_text = ''
+    final_data: Optional[Dict[str, Any]] = None
+    
+    for line in stream_body.iter_lines():
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.startswith('data:'):
+            continue
         
-        try:
-            from slack_sdk import WebClient
-            slack_client = WebClient(token=SLACK_BOT_TOKEN)
-            logger.info("Slack client initialized successfully")
-        except ImportError:
-            logger.error("slack_sdk package not available")
-            return None
+        event = json.loads(line[len('data:'):].strip())
+        if not isinstance(event, dict):
+            continue
+        
+        if 'error' in event:
+            raise RuntimeError(event['error'])
+        
+        if 'delta' in event:
+            partial_text += event['delta']
+            now = time.monotonic()
+            if status_ts and partial_text != updated_text and now - last_update >= STREAM_UPDATE_INTERVAL:
+                with _timed(timings, 'slack_post'):
+                    update_slack_message(channel, status_ts, partial_text + STREAMING_CURSOR, wait=False)
+                updated_text = partial_text
+                last_update = now
+        elif event.get('done') or 'result' in event:
+            final_data = event
     
-    try:
-        response = slack_client.chat_postMessage(
-            channel=channel, 
-            text=text,
-            unfurl_links=False,
-            unfurl_media=False
-        )
-        logger.info(f"Message sent to channel {channel}: timestamp {response['ts']}")
-        return response
-    except Exception as e:
-        logger.error(f"Failed to send Slack message: {str(e)}", exc_info=True)
+    if final_data is None:
+        logger.warning("Stream ended without a final event; using accumulated text")
+        final_data = {'result': partial_text}
+    
+    return final_data
+
+
+def send_slack_message(channel: str, text: str, thread_ts: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Slack 채널에 메시지를 전송합니다. thread_ts가 있으면 해당 스레드에 답글로 전송합니다.
+    
+    채널별 속도 제한과 429 재시도가 적용되며, 최종적으로 실패하면 None을 반환합니다.
+    """
+    if not SLACK_BOT_TOKEN:
+        logger.error("SLACK_BOT_TOKEN environment variable not configured")
         return None
+    
+    response = slack_delivery.post_message(channel, text, thread_ts=thread_ts)
+    if response:
+        logger.info("Message sent to channel %s: timestamp %s", channel, response['ts'])
+    return response
 
 
-def update_slack_message(channel: str, ts: str, text: str) -> None:
-    """Slack 메시지를 업데이트합니다."""
-    global slack_client
+def update_slack_message(channel: str, ts: str, text: str, wait: bool = True) -> bool:
+    """Slack 메시지를 업데이트합니다.
     
-    if slack_client is None:
-        logger.error("Slack client not initialized")
-        return
+    같은 메시지에 대한 갱신이 전송 중이면 마지막 텍스트로 병합됩니다.
+    wait=False이면 백그라운드로 전송하고 바로 반환합니다 (스트리밍 부분 응답용).
     
+    Returns:
+        갱신 성공 여부 (wait=False이면 항상 True)
+    """
+    updated = slack_delivery.update_message(channel, ts, text, wait=wait)
+    if updated and wait:
+        logger.info("Message updated in channel %s: timestamp %s", channel, ts)
+    return updated
+
+
+@contextmanager
+def _timed(timings: Optional[Dict[str, float]], stage: str) -> Iterator[None]:
+    """블록 실행 시간(ms)을 timings[stage]에 누적합니다."""
+    start = time.perf_counter()
     try:
-        slack_client.chat_update(
-            channel=channel,
-            ts=ts,
-            text=text,
-            unfurl_links=False,
-            unfurl_media=False
-        )
-        logger.info(f"Message updated in channel {channel}: timestamp {ts}")
-    except Exception as e:
-        logger.error(f"Failed to update Slack message: {str(e)}", exc_info=True)
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
 
 
-def _extract_agent_response(response_data: Dict[str, Any]) -> str:
-    """AgentCore 응답에서 메시지를 추출합니다."""
-    # 다양한 응답 형식 처리
-    if 'result' in response_data:
-        result = response_data['result']
-        
-        # result가 dict인 경우
-        if isinstance(result, dict):
-            # OpenAI 형식: {"role": "assistant", "content": [...]}
-            if 'content' in result and isinstance(result['content'], list):
-                # content 리스트에서 text만 추출
-                text_parts = []
-                for block in result['content']:
-                    if isinstance(block, dict):
-                        # reasoningContent는 건너뛰고 text만 추출
-                        if 'text' in block:
-                            text_parts.append(block['text'])
-                        # reasoningContent 건너뛰기
-                        elif 'reasoningContent' in block:
-                            continue
-                
-                if text_parts:
-                    return ''.join(text_parts)
-                
-                # text가 없으면 첫 번째 블록 사용
-                return result['content'][0].get('text', str(result))
-            
-            # Strands Agent 형식
-            elif 'message' in result:
-                return result['message']
-            else:
-                return str(result)
-        
-        # result가 문자열인 경우
-        else:
-            return str(result)
+def _metric_name(stage: str, suffix: str) -> str:
+    """snake_case 단계 이름을 CloudWatch 메트릭 이름으로 변환합니다 (model_turn → ModelTurnMs)."""
+    return ''.join(part.capitalize() for part in stage.split('_')) + suffix
+
+
+def build_emf_record(agent_metrics: Dict[str, Any], timings: Dict[str, float]) -> Dict[str, Any]:
+    """Bridge 단계별 소요 시간과 AgentCore 응답 메트릭으로 EMF 레코드를 생성합니다."""
+    values: Dict[str, float] = {}
+    units: Dict[str, str] = {}
     
-    elif 'output' in response_data:
-        output = response_data['output']
-        if isinstance(output, dict):
-            return output.get('message', str(output))
-        else:
-            return str(output)
+    def add(name: str, value: Any, unit: str) -> None:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = round(float(value), 2)
+            units[name] = unit
     
-    elif 'message' in response_data:
-        return response_data['message']
+    for stage, elapsed_ms in timings.items():
+        add(_metric_name(f"bridge_{stage}", 'Ms'), elapsed_ms, 'Milliseconds')
     
-    else:
-        logger.warning(f"Unknown response format: {response_data}")
-        return str(response_data)
+    add('AgentTotalMs', agent_metrics.get('total_ms'), 'Milliseconds')
+    for stage, stats in (agent_metrics.get('stages') or {}).items():
+        add(_metric_name(stage, 'Ms'), stats.get('total_ms'), 'Milliseconds')
+        add(_metric_name(stage, 'Count'), stats.get('count'), 'Count')
+    for kind, count in (agent_metrics.get('tokens') or {}).items():
+        add(_metric_name(kind, 'Tokens'), count, 'Count')
+    for name, count in (agent_metrics.get('counters') or {}).items():
+        add(_metric_name(name, 'Count'), count, 'Count')
+    add('Cycles', agent_metrics.get('cycles'), 'Count')
+    add('ToolCalls', agent_metrics.get('tool_calls'), 'Count')
+    if 'cached' in agent_metrics:
+        add('AnswerCacheHit', int(bool(agent_metrics['cached'])), 'Count')
+    if 'coalesced' in agent_metrics:
+        add('CoalescedRequest', int(bool(agent_metrics['coalesced'])), 'Count')
+    if agent_metrics.get('prefetch'):
+        add('PrefetchHit', int(agent_metrics['prefetch'] == 'hit'), 'Count')
+    if 'stopped_by' in agent_metrics:
+        add('DeadlineStop', int(agent_metrics['stopped_by'] == 'deadline'), 'Count')
+        add('IterationLimitStop', int(agent_metrics['stopped_by'] == 'iterations'), 'Count')
+    route = agent_metrics.get('route')
+    if isinstance(route, dict):
+        add('FastPath', int(route.get('tier') == 'fast'), 'Count')
+        add('Escalated', int(bool(route.get('escalated'))), 'Count')
+    
+    return {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['Service']],
+                'Metrics': [{'Name': name, 'Unit': units[name]} for name in values]
+            }]
+        },
+        'Service': 'lambda-bridge',
+        **values
+    }
 
 
-def _log_metrics(response_data: Dict[str, Any]) -> None:
-    """AgentCore 응답에서 메트릭을 추출하여 로깅합니다."""
-    if 'metrics' in response_data:
-        metrics = response_data['metrics']
-        logger.info(f"AgentCore performance metrics: {json.dumps(metrics, indent=2)}")
+def _log_metrics(response_data: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> None:
+    """AgentCore 응답 메트릭과 Bridge 단계별 소요 시간을 로깅합니다.
+    
+    ENABLE_EMF_METRICS가 활성화되면 CloudWatch Embedded Metric Format 한 줄을 stdout에 기록하여
+    로그에서 바로 단계별 메트릭(p50/p99)이 생성되도록 합니다.
+    """
+    metrics = response_data.get('metrics') or {}
+    if metrics:
+        # EMF 레코드가 같은 값을 남기므로 EMF 사용 시에는 샘플링
+        log_payload(logger, logging.INFO, "AgentCore performance metrics", payload=metrics, sample=ENABLE_EMF_METRICS)
+    
+    if ENABLE_EMF_METRICS and (metrics or timings):
+        # CloudWatch가 메트릭으로 변환하도록 가공하지 않은 JSON 한 줄로 출력 (직렬화는 리스너 스레드에서 수행)
+        emit_raw(build_emf_record(metrics, timings or {}))
@@ -95,11 +95,14 @@ aws iam attach-role-policy \
     --role-name $ROLE_NAME \
     --policy-arn arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole 2>/dev/null || true
 
+# 멱등성 저장소가 쓰는 DynamoDB 테이블(IDEMPOTENCY_TABLE)에 권한 부여
+sed "s|table/slack-bot-idempotency|table/${IDEMPOTENCY_TABLE:-slack-bot-idempotency}|" iam_policy.json > receiver-policy.json
+
 aws iam put-role-policy \
     --profile "$AWS_PROFILE" \
     --role-name $ROLE_NAME \
     --policy-name SQSSendMessagePolicy \
-    --policy-document file://iam_policy.json
+    --policy-document file://receiver-policy.json
 
 ROLE_ARN="arn:aws:iam::$ACCOUNT_ID:role/$ROLE_NAME"
 echo "  Role ARN: $ROLE_ARN"
@@ -112,6 +115,7 @@ echo "📦 2단계: Lambda 함수 패키징"
 rm -rf package lambda_receiver.zip
 mkdir -p package
 cp lambda_receiver.py package/
+cp ../shared/*.py package/
 cd package
 zip -r ../lambda_receiver.zip . -q
 cd ..
@@ -129,7 +133,7 @@ aws lambda create-function \
     --zip-file fileb://lambda_receiver.zip \
     --timeout 30 \
     --memory-size 256 \
-    --environment Variables={SQS_QUEUE_URL=$SQS_QUEUE_URL,SQS_REGION=$AWS_REGION} \
+    --environment "Variables={SQS_QUEUE_URL=$SQS_QUEUE_URL,SQS_REGION=$AWS_REGION,IDEMPOTENCY_BACKEND=${IDEMPOTENCY_BACKEND:-memory},IDEMPOTENCY_TABLE=${IDEMPOTENCY_TABLE:-slack-bot-idempotency}}" \
     --region $AWS_REGION
 
 echo "✅ Lambda 함수 생성 완료"
@@ -169,7 +173,7 @@ aws lambda add-permission \
 echo "✅ Lambda 호출 권한 추가 완료"
 
 # 정리
-rm -f trust-policy.json
+rm -f trust-policy.json receiver-policy.json
 echo ""
 echo "✅ Lambda Receiver 배포 완료!"
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
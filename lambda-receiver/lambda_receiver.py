@@ -18,19 +18,30 @@ Version: 1.0
 import json
 import logging
 import os
-from typing import Dict, Any
+import sys
+import time
+from typing import Dict, Any, Optional
 
-import boto3
+# 공용 모듈 경로 (배포 패키지에는 함께 복사되며, 로컬 실행 시 ../shared 사용)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
 
-# Configure logging
+from idempotency import create_store_from_env, envelope_event_key  # noqa: E402
+from structured_logging import configure_logging, log_payload, logged_handler  # noqa: E402
+
+# Configure logging (JSON 한 줄 로그)
+# 호출마다 반환 전에 로그를 비워야 하므로 리스너 스레드 없이 바로 출력 (LOG_ASYNC=true로 변경 가능)
+configure_logging(service='lambda-receiver', async_output=False)
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-sqs_client = boto3.client('sqs', region_name=os.environ.get('SQS_REGION', 'ap-northeast-2'))
+# AWS clients (첫 메시지 전송 또는 warm-up 호출 시 생성, boto3 import도 함께 미룸)
+sqs_client: Optional[Any] = None
 SQS_QUEUE_URL = os.environ.get('SQS_QUEUE_URL')
 
+# Slack 재전송 이벤트 중복 제거
+idempotency_store = create_store_from_env(namespace='receiver')
+
 
+@logged_handler
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """AWS Lambda 진입점 - Slack 이벤트를 처리합니다.
     
@@ -52,7 +63,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         Exception: SQS 전송 실패 시 500 에러 반환
     """
     try:
-        logger.info(f"Received event: {json.dumps(event)}")
+        # 예약 warm-up 호출 (EventBridge 일정 또는 {"warmup": true})
+        if is_warmup_event(event):
+            return _create_response(200, warm_up())
+        
+        # 전체 이벤트 덤프는 샘플링 (LOG_PAYLOAD_SAMPLE), 직렬화와 본문 마스킹은 리스너 스레드에서 수행
+        log_payload(logger, logging.INFO, "Received event", payload=event)
         
         # API Gateway 이벤트 검증
         if 'body' not in event:
@@ -77,7 +93,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             
             # 메시지 편집/삭제 이벤트 무시
             if event_data.get('subtype') in ['message_changed', 'message_deleted']:
-                logger.info(f"Ignoring message subtype: {event_data.get('subtype')}")
+                logger.info("Ignoring message subtype: %s", event_data.get('subtype'))
                 return _create_response(200, {'ok': True})
             
             # 스레드 응답 무시 (선택사항 - 스레드에도 응답하려면 이 부분 제거)
@@ -85,9 +101,21 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             #     logger.info("Ignoring thread message")
             #     return _create_response(200, {'ok': True})
             
+            # Slack 재전송(X-Slack-Retry-Num) 등 이미 받은 이벤트는 SQS로 보내지 않음
+            event_key = envelope_event_key(body)
+            retry_num = _get_header(event, 'x-slack-retry-num')
+            if not idempotency_store.claim(event_key):
+                logger.info("Ignoring duplicate event %s (retry: %s)", event_key, retry_num)
+                return _create_response(200, {'ok': True})
+            
             # SQS로 메시지 전송 (비동기 처리)
             if SQS_QUEUE_URL:
-                send_to_sqs(body)
+                try:
+                    send_to_sqs(body)
+                except Exception:
+                    # 전송 실패 시 Slack 재시도가 다시 처리할 수 있도록 키 해제
+                    idempotency_store.release(event_key)
+                    raise
                 logger.info("Message forwarded to SQS for processing")
             else:
                 logger.error("SQS_QUEUE_URL environment variable not configured")
@@ -99,10 +127,33 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         return _create_response(200, {'message': 'OK'})
         
     except Exception as e:
-        logger.error(f"Error processing Slack event: {str(e)}", exc_info=True)
+        logger.error("Error processing Slack event: %s", e, exc_info=True)
         return _create_response(500, {'error': str(e)})
 
 
+def get_sqs_client() -> Any:
+    """Lazy initialization of SQS client"""
+    global sqs_client
+    if sqs_client is None:
+        import boto3
+        sqs_client = boto3.client('sqs', region_name=os.environ.get('SQS_REGION', 'ap-northeast-2'))
+    return sqs_client
+
+
+def is_warmup_event(event: Dict[str, Any]) -> bool:
+    """EventBridge 예약 이벤트 또는 {"warmup": true} 호출인지 확인합니다."""
+    return bool(event.get('warmup')) or event.get('source') == 'aws.events'
+
+
+def warm_up() -> Dict[str, Any]:
+    """SQS 클라이언트를 미리 생성하여 첫 Slack 이벤트의 응답 지연을 줄입니다."""
+    start = time.perf_counter()
+    get_sqs_client()
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+    logger.info("Warm-up completed in %sms", elapsed_ms)
+    return {'warmed': ['sqs'], 'elapsed_ms': elapsed_ms}
+
+
 def send_to_sqs(message_body: Dict[str, Any]) -> None:
     """SQS 대기열로 메시지를 전송합니다.
     
@@ -116,16 +167,24 @@ def send_to_sqs(message_body: Dict[str, Any]) -> None:
         Exception: SQS 전송 실패 시 예외 발생
     """
     try:
-        response = sqs_client.send_message(
+        response = get_sqs_client().send_message(
             QueueUrl=SQS_QUEUE_URL,
             MessageBody=json.dumps(message_body, ensure_ascii=False)
         )
-        logger.info(f"Message successfully sent to SQS: {response['MessageId']}")
+        logger.info("Message successfully sent to SQS: %s", response['MessageId'])
     except Exception as e:
-        logger.error(f"Failed to send message to SQS: {str(e)}", exc_info=True)
+        logger.error("Failed to send message to SQS: %s", e, exc_info=True)
         raise
 
 
+def _get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    """API Gateway 이벤트에서 헤더 값을 대소문자 구분 없이 조회합니다."""
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
 def _create_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
     """HTTP 응답 객체를 생성합니다.
     
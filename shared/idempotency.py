@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Idempotency Store - Slack 이벤트 중복 처리 방지
+
+Slack은 응답이 늦으면 X-Slack-Retry-Num 헤더와 함께 같은 이벤트를 재전송합니다.
+Lambda Receiver와 Lambda Bridge에서 event_id / client_msg_id 기준으로
+이미 처리한 이벤트를 걸러내어 중복 LLM 호출과 중복 Slack 답변을 방지합니다.
+
+Backends:
+    - memory: 프로세스 메모리 (Lambda 웜 인스턴스 단위)
+    - dynamodb: DynamoDB 조건부 쓰기 (인스턴스 간 공유, DynamoDB Local로 로컬 테스트 가능)
+    - none: 중복 제거 비활성화
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyBackend:
+    """멱등성 키 저장소 인터페이스입니다."""
+
+    def put_if_absent(self, key: str, ttl_seconds: float) -> bool:
+        """키가 없거나 만료된 경우 저장하고 True를, 이미 있으면 False를 반환합니다."""
+        raise NotImplementedError
+
+    def put(self, key: str, ttl_seconds: float) -> None:
+        """키를 조건 없이 저장합니다 (처리 완료 후 만료 시각을 늘리기 위해 사용)."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """키를 제거합니다 (처리 실패 시 재시도를 허용하기 위해 사용)."""
+        raise NotImplementedError
+
+
+class InMemoryIdempotencyBackend(IdempotencyBackend):
+    """프로세스 메모리 기반 저장소입니다. 최대 항목 수를 넘으면 만료 항목부터 정리합니다."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def put_if_absent(self, key: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            expires_at = self._expiry.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+
+            if len(self._expiry) >= self.max_entries:
+                self._purge(now)
+            self._expiry[key] = now + ttl_seconds
+            return True
+
+    def put(self, key: str, ttl_seconds: float) -> None:
+        with self._lock:
+            self._expiry[key] = time.time() + ttl_seconds
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._expiry.pop(key, None)
+
+    def _purge(self, now: float) -> None:
+        """만료 항목을 제거하고, 그래도 가득 차 있으면 가장 먼저 만료될 항목부터 제거합니다."""
+        for key in [k for k, expires_at in self._expiry.items() if expires_at <= now]:
+            del self._expiry[key]
+        overflow = len(self._expiry) - self.max_entries + 1
+        if overflow > 0:
+            for key in sorted(self._expiry, key=self._expiry.get)[:overflow]:
+                del self._expiry[key]
+
+
+class DynamoDBIdempotencyBackend(IdempotencyBackend):
+    """DynamoDB 조건부 쓰기 기반 저장소입니다.
+
+    테이블은 문자열 파티션 키 `pk`를 사용하며, `expires_at`(epoch 초)을 DynamoDB TTL 속성으로
+    지정하면 만료 항목이 자동 삭제됩니다. endpoint_url로 DynamoDB Local을 사용할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        client: Optional[Any] = None,
+        region_name: Optional[str] = None,
+        endpoint_url: Optional[str] = None
+    ):
+        self.table_name = table_name
+        self._client = client
+        self._region_name = region_name
+        self._endpoint_url = endpoint_url
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('dynamodb', region_name=self._region_name, endpoint_url=self._endpoint_url)
+        return self._client
+
+    def put_if_absent(self, key: str, ttl_seconds: float) -> bool:
+        now = int(time.time())
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    'pk': {'S': key},
+                    'expires_at': {'N': str(now + int(ttl_seconds))}
+                },
+                ConditionExpression='attribute_not_exists(pk) OR expires_at < :now',
+                ExpressionAttributeValues={':now': {'N': str(now)}}
+            )
+            return True
+        except Exception as e:
+            if _error_code(e) == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def put(self, key: str, ttl_seconds: float) -> None:
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'pk': {'S': key},
+                'expires_at': {'N': str(int(time.time()) + int(ttl_seconds))}
+            }
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete_item(TableName=self.table_name, Key={'pk': {'S': key}})
+
+
+class NullIdempotencyBackend(IdempotencyBackend):
+    """중복 제거를 하지 않는 저장소입니다."""
+
+    def put_if_absent(self, key: str, ttl_seconds: float) -> bool:
+        return True
+
+    def put(self, key: str, ttl_seconds: float) -> None:
+        return None
+
+    def delete(self, key: str) -> None:
+        return None
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    """botocore ClientError(또는 호환 예외)의 오류 코드를 추출합니다."""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+class IdempotencyStore:
+    """네임스페이스와 TTL을 적용한 멱등성 검사기입니다.
+
+    백엔드 오류 시에는 메시지 유실을 막기 위해 처리를 허용합니다 (fail-open).
+
+    in_progress_ttl_seconds를 지정하면 claim은 이 짧은 시간 동안만 키를 잡고, complete 호출 시
+    ttl_seconds로 늘립니다. Lambda 타임아웃/OOM으로 release가 호출되지 않아도 키가 곧 만료되어
+    SQS 재전달 메시지를 다시 처리할 수 있습니다.
+
+    Args:
+        backend: 키 저장소
+        namespace: 키 접두사 (Receiver/Bridge 구분)
+        ttl_seconds: 키 유지 시간(초)
+        in_progress_ttl_seconds: 처리 중 키 유지 시간(초), Lambda 타임아웃보다 길고
+            SQS 가시성 타임아웃보다 짧게 설정 (None이면 claim부터 ttl_seconds 적용)
+    """
+
+    def __init__(
+        self,
+        backend: IdempotencyBackend,
+        namespace: str,
+        ttl_seconds: float = 3600.0,
+        in_progress_ttl_seconds: Optional[float] = None
+    ):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.in_progress_ttl_seconds = in_progress_ttl_seconds
+
+    def _key(self, event_key: str) -> str:
+        return f"{self.namespace}:{event_key}"
+
+    def claim(self, event_key: Optional[str]) -> bool:
+        """처음 보는 이벤트면 True, 중복이면 False를 반환합니다."""
+        if not event_key:
+            return True
+        try:
+            return self.backend.put_if_absent(self._key(event_key), self.in_progress_ttl_seconds or self.ttl_seconds)
+        except Exception as e:
+            logger.error("Idempotency check failed, processing anyway: %s", e)
+            return True
+
+    def complete(self, event_key: Optional[str]) -> None:
+        """처리를 마친 이벤트의 키를 ttl_seconds 동안 유지합니다 (in_progress_ttl_seconds 사용 시)."""
+        if not event_key or not self.in_progress_ttl_seconds:
+            return
+        try:
+            self.backend.put(self._key(event_key), self.ttl_seconds)
+        except Exception as e:
+            logger.error("Failed to extend idempotency key: %s", e)
+
+    def release(self, event_key: Optional[str]) -> None:
+        """처리에 실패한 이벤트의 키를 제거하여 재시도 시 다시 처리되도록 합니다."""
+        if not event_key:
+            return
+        try:
+            self.backend.delete(self._key(event_key))
+        except Exception as e:
+            logger.error("Failed to release idempotency key: %s", e)
+
+
+def envelope_event_key(body: Dict[str, Any]) -> Optional[str]:
+    """Slack event_callback 페이로드의 멱등성 키 (event_id 우선)를 반환합니다."""
+    if body.get('event_id'):
+        return body['event_id']
+    return message_event_key(body.get('event', {}))
+
+
+def message_event_key(event_data: Dict[str, Any]) -> Optional[str]:
+    """Slack 메시지 이벤트의 멱등성 키 (client_msg_id 우선, 없으면 channel:ts)를 반환합니다."""
+    if event_data.get('client_msg_id'):
+        return event_data['client_msg_id']
+    if event_data.get('channel') and event_data.get('ts'):
+        return f"{event_data['channel']}:{event_data['ts']}"
+    return None
+
+
+def create_store_from_env(namespace: str, in_progress_ttl_seconds: Optional[float] = None) -> IdempotencyStore:
+    """환경 변수로 멱등성 저장소를 구성합니다.
+
+    Args:
+        namespace: 키 접두사 (Receiver/Bridge 구분)
+        in_progress_ttl_seconds: 처리 중 키 유지 시간(초) (IdempotencyStore 참고)
+
+    Environment:
+        IDEMPOTENCY_BACKEND: memory (기본값) | dynamodb | none
+        IDEMPOTENCY_TABLE: DynamoDB 테이블 이름 (기본값: slack-bot-idempotency)
+        IDEMPOTENCY_TTL: 키 유지 시간(초) (기본값: 3600)
+        DYNAMODB_REGION: DynamoDB 리전 (기본값: AWS_REGION)
+        DYNAMODB_ENDPOINT_URL: DynamoDB Local 등 대체 엔드포인트 (선택)
+    """
+    backend_name = os.environ.get('IDEMPOTENCY_BACKEND', 'memory').lower()
+    ttl_seconds = float(os.environ.get('IDEMPOTENCY_TTL', '3600'))
+
+    if backend_name == 'dynamodb':
+        backend: IdempotencyBackend = DynamoDBIdempotencyBackend(
+            table_name=os.environ.get('IDEMPOTENCY_TABLE', 'slack-bot-idempotency'),
+            region_name=os.environ.get('DYNAMODB_REGION', os.environ.get('AWS_REGION')),
+            endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL') or None
+        )
+    elif backend_name == 'none':
+        backend = NullIdempotencyBackend()
+    else:
+        backend = InMemoryIdempotencyBackend()
+
+    logger.info("Idempotency backend: %s (namespace=%s, ttl=%ss)", backend_name, namespace, ttl_seconds)
+    return IdempotencyStore(
+        backend, namespace=namespace, ttl_seconds=ttl_seconds, in_progress_ttl_seconds=in_progress_ttl_seconds
+    )
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Slack Delivery - 속도 제한을 고려한 Slack 메시지 전송 계층
+
+Lambda Bridge와 AgentCore(비동기 전달 모드)의 Slack 메시지 전송/갱신을 담당합니다.
+
+- 연결 재사용: slack.com HTTPS keep-alive 연결 풀을 웜 인스턴스 동안 유지
+- 속도 제한: 채널별 토큰 버킷, 429 응답 시 Retry-After만큼 해당 채널 전송 지연 후 재시도
+- 재시도: 5xx/네트워크 오류는 지수 백오프로 재시도, 그 외 Slack API 오류는 즉시 실패
+- 갱신 병합: 같은 메시지(ts)에 대한 chat.update가 몰리면 전송 중인 요청이 끝난 뒤 마지막 텍스트만 전송
+- 답변 전달: AgentCore 응답 정규화, 상태 메시지 갱신(실패 시 새 메시지), 스트리밍 부분 응답 갱신
+
+slack-sdk WebClient 대신 표준 라이브러리 http.client를 사용합니다. Bridge는 스레드 풀로 동작하여 AsyncWebClient(aiohttp,
+이벤트 루프)가 맞지 않고, WebClient(urllib)는 호출마다 새 연결을 열기 때문입니다.
+재시도 동작은 WebClient에 SDK 재시도 핸들러를 붙인 것과 같습니다 (benchmarks/check_slack_retry.py).
+
+SLACK_API_BASE_URL로 로컬 가짜 Slack API 서버를 지정하거나,
+SLACK_DELIVERY_SINK=memory로 메시지를 메모리에 기록하는 가짜 클라이언트를 사용하여 테스트할 수 있습니다.
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import http.client
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from structured_logging import prompt_text
+
+logger = logging.getLogger(__name__)
+
+# 연결이 끊긴 keep-alive 연결 재사용 시 발생하는 오류 (새 연결로 즉시 재시도)
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class SlackApiError(Exception):
+    """Slack API 호출 실패입니다.
+
+    Attributes:
+        error: Slack 오류 코드 (예: channel_not_found, ratelimited)
+        status: HTTP 상태 코드
+        retry_after: 429 응답의 Retry-After(초)
+    """
+
+    def __init__(self, error: str, status: int = 200, retry_after: Optional[float] = None):
+        super().__init__(f"Slack API error: {error} (status={status})")
+        self.error = error
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status == 429 or self.status >= 500
+
+
+class SlackDeliveryError(RuntimeError):
+    """최종 답변을 Slack에 전달하지 못한 경우 발생합니다 (SQS 재시도 대상)."""
+
+
+class SlackHttpClient:
+    """Slack Web API용 최소 HTTP 클라이언트입니다. 스레드 간 keep-alive 연결 풀을 공유합니다.
+
+    Args:
+        token: Slack Bot Token
+        base_url: Slack API 기본 URL (로컬 테스트 시 http://127.0.0.1:port/api/)
+        timeout: 요청 타임아웃(초)
+        max_idle_connections: 풀에 보관할 최대 유휴 연결 수
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str = 'https://slack.com/api/',
+        timeout: float = 10.0,
+        max_idle_connections: int = 10
+    ):
+        parsed = urlparse(base_url)
+        self.token = token
+        self.timeout = timeout
+        self._scheme = parsed.scheme
+        self._host = parsed.hostname or 'slack.com'
+        self._port = parsed.port
+        self._path = parsed.path.rstrip('/') + '/'
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=max_idle_connections)
+        self.connections_created = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        self.connections_created += 1
+        if self._scheme == 'http':
+            return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+        return http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout)
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """유휴 연결을 꺼내거나 새로 만듭니다. (연결, 재사용 여부)를 반환합니다."""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._connect(), False
+
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def api_call(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Slack Web API 메서드를 호출하고 응답 JSON을 반환합니다.
+
+        Raises:
+            SlackApiError: HTTP 오류, 429, 또는 ok=false 응답
+        """
+        body = json.dumps(params, ensure_ascii=False).encode('utf-8')
+        headers = {
+            'Authorization': f"Bearer {self.token}",
+            'Content-Type': 'application/json; charset=utf-8',
+        }
+
+        connection, reused = self._acquire()
+        try:
+            try:
+                connection.request('POST', self._path + method, body=body, headers=headers)
+                response = connection.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # 서버가 닫은 유휴 연결: 새 연결로 한 번 더 시도
+                connection.close()
+                connection = self._connect()
+                connection.request('POST', self._path + method, body=body, headers=headers)
+                response = connection.getresponse()
+            payload = response.read()
+        except Exception:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+
+        if response.status == 429:
+            retry_after = float(response.getheader('Retry-After') or 1)
+            raise SlackApiError('ratelimited', status=429, retry_after=retry_after)
+        if response.status >= 400:
+            raise SlackApiError(f"http_{response.status}", status=response.status)
+
+        data = json.loads(payload.decode('utf-8'))
+        if not data.get('ok'):
+            raise SlackApiError(data.get('error', 'unknown_error'), status=response.status)
+        return data
+
+
+class MemorySlackClient:
+    """Slack API 대신 메시지를 메모리에 기록하는 가짜 클라이언트입니다 (로컬 실행/테스트용).
+
+    chat.postMessage는 새 ts를 발급하고, chat.update는 기록된 메시지의 텍스트를 바꿉니다.
+    """
+
+    def __init__(self) -> None:
+        self.messages: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self._ts = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def api_call(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        channel = params.get('channel', '')
+        with self._lock:
+            self.calls.append((method, dict(params)))
+            if method == 'chat.postMessage':
+                ts = f"{time.time():.0f}.{next(self._ts):06d}"
+                self.messages[(channel, ts)] = {'text': params.get('text', ''), 'thread_ts': params.get('thread_ts')}
+            elif method == 'chat.update':
+                ts = params.get('ts', '')
+                if (channel, ts) not in self.messages:
+                    raise SlackApiError('message_not_found')
+                self.messages[(channel, ts)]['text'] = params.get('text', '')
+            else:
+                raise SlackApiError('unknown_method')
+        logger.info("[MemorySlack] %s %s %s: %s", method, channel, ts, prompt_text(str(params.get('text', ''))))
+        return {'ok': True, 'channel': channel, 'ts': ts}
+
+    def text(self, channel: str, ts: str) -> Optional[str]:
+        """기록된 메시지의 현재 텍스트를 반환합니다."""
+        with self._lock:
+            message = self.messages.get((channel, ts))
+            return message['text'] if message else None
+
+
+class TokenBucket:
+    """채널별 전송 속도 제한용 토큰 버킷입니다.
+
+    Args:
+        rate: 초당 토큰 보충 수
+        capacity: 최대 토큰 수 (허용 버스트)
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰 하나를 사용합니다. 토큰이 없으면 보충될 때까지 대기하며, 대기한 시간(초)을 반환합니다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = max(self._blocked_until - now, (1 - self._tokens) / self.rate if self.rate > 0 else 1.0)
+            time.sleep(delay)
+            waited += delay
+
+    def block(self, seconds: float) -> None:
+        """Retry-After 동안 전송을 막고 버킷을 비웁니다."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class _UpdateSlot:
+    """같은 메시지(ts)에 대한 chat.update 병합 상태입니다."""
+
+    def __init__(self) -> None:
+        self.pending: Optional[str] = None
+        self.version = 0
+        self.sent_version = 0
+        self.busy = False
+        self.last_ok = True
+
+
+class SlackDelivery:
+    """Slack 메시지 전송/갱신을 담당하는 스레드 안전 전송 계층입니다.
+
+    Args:
+        client: api_call(method, params)을 제공하는 Slack 클라이언트 (SlackHttpClient 등)
+        channel_rate: 채널별 초당 전송 수
+        channel_burst: 채널별 허용 버스트
+        max_retries: 429/5xx/네트워크 오류 재시도 횟수
+        background_workers: 대기하지 않는 chat.update를 전송할 백그라운드 워커 수
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        channel_rate: float = 1.0,
+        channel_burst: float = 5.0,
+        max_retries: int = 3,
+        background_workers: int = 4
+    ):
+        self.client = client
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.max_retries = max_retries
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        self._slots: Dict[Tuple[str, str], _UpdateSlot] = {}
+        self._slots_condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=background_workers, thread_name_prefix="slack-update")
+        self.stats = {'calls': 0, 'retries': 0, 'rate_limited': 0, 'coalesced': 0, 'failures': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _bucket(self, channel: str) -> TokenBucket:
+        with self._buckets_lock:
+            bucket = self._buckets.get(channel)
+            if bucket is None:
+                bucket = self._buckets[channel] = TokenBucket(self.channel_rate, self.channel_burst)
+            return bucket
+
+    def call(self, method: str, channel: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """채널 속도 제한과 재시도를 적용하여 Slack API를 호출합니다.
+
+        Raises:
+            SlackApiError: 재시도할 수 없는 오류이거나 재시도 횟수를 모두 사용한 경우
+        """
+        bucket = self._bucket(channel)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            self._count('calls')
+            try:
+                return self.client.api_call(method, dict(params, channel=channel))
+            except SlackApiError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                if e.status == 429:
+                    self._count('rate_limited')
+                    delay = e.retry_after or 1.0
+                    bucket.block(delay)
+                    logger.warning("Slack rate limited on %s (%s), retrying after %ss", method, channel, delay)
+                else:
+                    time.sleep(self._backoff(attempt))
+            except (OSError, http.client.HTTPException) as e:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning("Slack %s network error, retrying: %s", method, e)
+                time.sleep(self._backoff(attempt))
+            attempt += 1
+            self._count('retries')
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return min(8.0, 0.5 * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+    def post_message(self, channel: str, text: str, thread_ts: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """메시지를 전송합니다. 실패하면 None을 반환합니다."""
+        params: Dict[str, Any] = {'text': text, 'unfurl_links': False, 'unfurl_media': False}
+        if thread_ts:
+            params['thread_ts'] = thread_ts
+        try:
+            return self.call('chat.postMessage', channel, params)
+        except Exception as e:
+            self._count('failures')
+            logger.error("Failed to send Slack message: %s", e)
+            return None
+
+    def update_message(self, channel: str, ts: str, text: str, wait: bool = True) -> bool:
+        """메시지를 갱신합니다. 같은 ts에 대한 갱신이 전송 중이면 마지막 텍스트만 이어서 전송합니다.
+
+        Args:
+            wait: True면 이 텍스트(또는 이후 텍스트)가 반영될 때까지 대기하고 성공 여부를 반환합니다.
+                  False면 백그라운드에서 전송하고 즉시 True를 반환합니다 (스트리밍 부분 응답용).
+        """
+        key = (channel, ts)
+        with self._slots_condition:
+            slot = self._slots.setdefault(key, _UpdateSlot())
+            if slot.pending is not None:
+                self._count('coalesced')
+            slot.pending = text
+            slot.version += 1
+            version = slot.version
+            start_sender = not slot.busy
+            slot.busy = True
+
+        if start_sender:
+            if wait:
+                self._drain(key, slot)
+            else:
+                self._executor.submit(self._drain, key, slot)
+        if not wait:
+            return True
+
+        with self._slots_condition:
+            self._slots_condition.wait_for(lambda: slot.sent_version >= version)
+            return slot.last_ok
+
+    def deliver_reply(self, channel: str, status_ts: Optional[str], thread_ts: Optional[str], text: str) -> None:
+        """상태 메시지를 최종 텍스트로 갱신하고, 갱신에 실패하면 새 메시지로 전송합니다.
+
+        Raises:
+            SlackDeliveryError: 갱신과 전송이 모두 실패한 경우
+        """
+        if status_ts and self.update_message(channel, status_ts, text):
+            return
+        if status_ts:
+            logger.warning("Failed to update status message %s, posting a new message instead", status_ts)
+        if self.post_message(channel, text, thread_ts=thread_ts) is None:
+            raise SlackDeliveryError(f"Failed to deliver reply to channel {channel}")
+
+    def _drain(self, key: Tuple[str, str], slot: _UpdateSlot) -> None:
+        """대기 중인 최신 텍스트가 없어질 때까지 chat.update를 전송합니다."""
+        channel, ts = key
+        while True:
+            with self._slots_condition:
+                text, version = slot.pending, slot.version
+                slot.pending = None
+                if text is None:
+                    slot.busy = False
+                    if self._slots.get(key) is slot:
+                        del self._slots[key]
+                    self._slots_condition.notify_all()
+                    return
+
+            try:
+                self.call('chat.update', channel, {'ts': ts, 'text': text, 'unfurl_links': False, 'unfurl_media': False})
+                ok = True
+            except Exception as e:
+                self._count('failures')
+                logger.error("Failed to update Slack message: %s", e)
+                ok = False
+
+            with self._slots_condition:
+                slot.sent_version = version
+                slot.last_ok = ok
+                self._slots_condition.notify_all()
+
+
+class StreamingReply:
+    """스트리밍 텍스트 델타를 상태 메시지에 일정 간격으로 반영하고, 최종 답변으로 마무리합니다.
+
+    Args:
+        delivery: Slack 전송 계층
+        channel: 채널 ID
+        status_ts: 갱신할 상태 메시지 ts (없으면 최종 답변만 새 메시지로 전송)
+        thread_ts: 새 메시지를 보낼 스레드 ts
+        update_interval: 부분 응답 갱신 최소 간격(초)
+        cursor: 부분 응답 끝에 붙일 커서
+    """
+
+    def __init__(
+        self,
+        delivery: SlackDelivery,
+        channel: str,
+        status_ts: Optional[str],
+        thread_ts: Optional[str] = None,
+        update_interval: float = 1.0,
+        cursor: str = " ▌"
+    ):
+        self.delivery = delivery
+        self.channel = channel
+        self.status_ts = status_ts
+        self.thread_ts = thread_ts
+        self.update_interval = update_interval
+        self.cursor = cursor
+        self.text = ''
+        self._updated_text = ''
+        self._last_update = 0.0
+
+    def append(self, delta: str) -> None:
+        """델타를 누적하고, 마지막 갱신 후 update_interval이 지났으면 백그라운드로 갱신합니다."""
+        self.text += delta
+        now = time.monotonic()
+        if self.status_ts and self.text != self._updated_text and now - self._last_update >= self.update_interval:
+            self.delivery.update_message(self.channel, self.status_ts, self.text + self.cursor, wait=False)
+            self._updated_text = self.text
+            self._last_update = now
+
+    def finish(self, text: str) -> None:
+        """최종 답변을 전달합니다.
+
+        Raises:
+            SlackDeliveryError: 갱신과 전송이 모두 실패한 경우
+        """
+        self.delivery.deliver_reply(self.channel, self.status_ts, self.thread_ts, text)
+
+
+def extract_agent_text(response_data: Dict[str, Any]) -> str:
+    """AgentCore 응답에서 메시지를 추출합니다."""
+    # 다양한 응답 형식 처리
+    if 'result' in response_data:
+        result = response_data['result']
+
+        # result가 dict인 경우
+        if isinstance(result, dict):
+            # OpenAI 형식: {"role": "assistant", "content": [...]}
+            if 'content' in result and isinstance(result['content'], list):
+                # content 리스트에서 text만 추출
+                text_parts = []
+                for block in result['content']:
+                    if isinstance(block, dict):
+                        # reasoningContent는 건너뛰고 text만 추출
+                        if 'text' in block:
+                            text_parts.append(block['text'])
+                        # reasoningContent 건너뛰기
+                        elif 'reasoningContent' in block:
+                            continue
+
+                if text_parts:
+                    return ''.join(text_parts)
+
+                # text가 없으면 첫 번째 블록 사용
+                return result['content'][0].get('text', str(result))
+
+            # Strands Agent 형식
+            elif 'message' in result:
+                return result['message']
+            else:
+                return str(result)
+
+        # result가 문자열인 경우
+        else:
+            return str(result)
+
+    elif 'output' in response_data:
+        output = response_data['output']
+        if isinstance(output, dict):
+            return output.get('message', str(output))
+        else:
+            return str(output)
+
+    elif 'message' in response_data:
+        return response_data['message']
+
+    else:
+        # 응답에 답변 텍스트가 들어 있을 수 있으므로 키만 기록
+        logger.warning("Unknown response format (keys: %s)", sorted(response_data))
+        return str(response_data)
+
+
+def create_delivery_from_env(background_workers: int = 4) -> Optional[SlackDelivery]:
+    """환경 변수로 Slack 전송 계층을 구성합니다. slack 전송에 토큰이 없으면 None을 반환합니다.
+
+    Environment:
+        SLACK_DELIVERY_SINK: slack (기본값) | memory
+        SLACK_BOT_TOKEN: Slack Bot 토큰 (slack 전송 시 필수)
+        SLACK_API_BASE_URL: Slack API 주소 (기본값: https://slack.com/api/)
+        SLACK_CHANNEL_RATE: 채널별 초당 전송 수 (기본값: 1.0)
+        SLACK_CHANNEL_BURST: 채널별 허용 버스트 (기본값: 5)
+        SLACK_MAX_RETRIES: 429/5xx/네트워크 오류 재시도 횟수 (기본값: 3)
+    """
+    sink = os.environ.get('SLACK_DELIVERY_SINK', 'slack').lower()
+    if sink == 'memory':
+        client: Any = MemorySlackClient()
+    else:
+        token = os.environ.get('SLACK_BOT_TOKEN')
+        if not token:
+            logger.info("Slack delivery disabled (SLACK_BOT_TOKEN not configured)")
+            return None
+        client = SlackHttpClient(token, base_url=os.environ.get('SLACK_API_BASE_URL', 'https://slack.com/api/'))
+
+    logger.info("Slack delivery sink: %s", sink)
+    return SlackDelivery(
+        client,
+        channel_rate=float(os.environ.get('SLACK_CHANNEL_RATE', '1.0')),
+        channel_burst=float(os.environ.get('SLACK_CHANNEL_BURST', '5')),
+        max_retries=int(os.environ.get('SLACK_MAX_RETRIES', '3')),
+        background_workers=background_workers
+    )
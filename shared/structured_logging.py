@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Structured Logging - JSON 로그, 지연 포맷팅, 페이로드 샘플링, 비차단 출력
+
+Lambda Receiver, Lambda Bridge, AgentCore가 공통으로 사용하는 로깅 계층입니다.
+요청 처리 스레드는 LogRecord를 큐에 넣기만 하고, 메시지 포맷팅과 JSON 직렬화, stdout 쓰기는
+리스너 스레드에서 수행합니다.
+
+- JSON 한 줄 로그 (ts, level, logger, service, msg, 바인딩한 요청 컨텍스트, payload, exc)
+- %-스타일 인자와 payload는 출력할 때만 포맷팅 (비활성화된 레벨이나 샘플링에서 제외되면 비용 없음)
+- 레벨별 페이로드 덤프 샘플링 (LOG_PAYLOAD_SAMPLE)
+- 질문/답변 텍스트 마스킹 (LOG_REDACT_PROMPTS)
+- 큐 핸들러/QueueListener 기반 비차단 출력 (큐가 가득 차면 버리고 개수만 기록)
+- CloudWatch EMF 레코드 등 가공하지 않은 JSON 한 줄 출력 (emit_raw)
+
+동기 출력(Lambda Receiver)에서는 logging.handlers를 import하지 않아 콜드 스타트 import 시간이 늘지 않습니다.
+
+Author: Jeonghun Sim
+Created: 2025
+Version: 1.0
+"""
+
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# 페이로드 덤프에서 값을 마스킹할 키 (Slack 메시지 본문, 질문, 답변)
+REDACT_KEYS = frozenset({'text', 'prompt', 'result', 'body', 'blocks'})
+
+# 레벨별 기본 페이로드 덤프 샘플링 비율
+DEFAULT_PAYLOAD_SAMPLE = 'DEBUG=1,INFO=0.01,WARNING=1,ERROR=1'
+
+# 로그 레코드에 함께 기록할 요청 컨텍스트 (request_id 등)
+_context: ContextVar[Dict[str, Any]] = ContextVar('log_context', default={})
+
+
+def parse_sample_rates(spec: str) -> Dict[int, float]:
+    """"INFO=0.01,ERROR=1" 형식을 {레벨 번호: 비율}로 변환합니다.
+
+    Raises:
+        ValueError: 알 수 없는 레벨이거나 비율이 0 ~ 1 범위를 벗어난 경우
+    """
+    rates: Dict[int, float] = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        name, _, value = item.partition('=')
+        level = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level in LOG_PAYLOAD_SAMPLE: {name}")
+        rate = float(value)
+        if not 0 <= rate <= 1:
+            raise ValueError(f"Sample rate for {name} must be between 0 and 1: {value}")
+        rates[level] = rate
+    return rates
+
+
+class LogSettings:
+    """페이로드 샘플링/마스킹 설정입니다.
+
+    Args:
+        sample_rates: 레벨별 페이로드 덤프 샘플링 비율 (없는 레벨은 1.0)
+        redact_prompts: 질문/답변 텍스트 마스킹 여부
+        prompt_chars: 마스킹하지 않을 때 남길 질문 텍스트 최대 길이
+    """
+
+    def __init__(self, sample_rates: Dict[int, float], redact_prompts: bool = True, prompt_chars: int = 100):
+        self.sample_rates = sample_rates
+        self.redact_prompts = redact_prompts
+        self.prompt_chars = prompt_chars
+        self._credit: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'LogSettings':
+        return cls(
+            sample_rates=parse_sample_rates(os.environ.get('LOG_PAYLOAD_SAMPLE', DEFAULT_PAYLOAD_SAMPLE)),
+            redact_prompts=os.environ.get('LOG_REDACT_PROMPTS', 'true').lower() == 'true',
+            prompt_chars=int(os.environ.get('LOG_PROMPT_CHARS', '100'))
+        )
+
+    def sampled(self, level: int) -> bool:
+        """레벨별 비율만큼 True를 반환합니다 (비율 0.01이면 100번에 한 번, 난수 대신 누적 방식).
+
+        Bridge 배치 워커와 일괄 평가 스레드가 함께 호출하므로 누적값은 잠금 안에서 갱신합니다.
+        """
+        rate = self.sample_rates.get(level, 1.0)
+        if rate >= 1.0:
+            return True
+        with self._lock:
+            credit = self._credit.get(level, 1.0) + rate
+            if credit >= 1.0:
+                self._credit[level] = credit - 1.0
+                return True
+            self._credit[level] = credit
+            return False
+
+
+settings = LogSettings.from_env()
+
+
+def redact(value: Any) -> Any:
+    """REDACT_KEYS에 해당하는 값을 길이만 남기고 마스킹한 사본을 반환합니다."""
+    if isinstance(value, dict):
+        return {
+            key: _redacted(item) if key in REDACT_KEYS and item is not None else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+def _redacted(value: Any) -> str:
+    if isinstance(value, str):
+        return f"<redacted {len(value)} chars>"
+    return "<redacted>"
+
+
+class PromptText:
+    """질문 텍스트를 로그에 남길 때의 지연 변환 래퍼입니다 (출력할 때만 마스킹/자르기 수행)."""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text: Optional[str]):
+        self.text = text or ''
+
+    def __str__(self) -> str:
+        if settings.redact_prompts:
+            return _redacted(self.text)
+        if len(self.text) > settings.prompt_chars:
+            return self.text[:settings.prompt_chars] + '...'
+        return self.text
+
+
+def prompt_text(text: Optional[str]) -> PromptText:
+    """로그 인자로 사용할 질문 텍스트 (LOG_REDACT_PROMPTS=true이면 길이만 기록)."""
+    return PromptText(text)
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """블록 안에서 기록되는 로그에 fields(request_id 등)를 함께 남깁니다."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """로그를 남긴 스레드의 요청 컨텍스트를 레코드에 복사합니다 (리스너 스레드에서는 조회할 수 없음)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _context.get()
+        if context:
+            record.context = context
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """LogRecord를 JSON 한 줄로 변환합니다.
+
+    Args:
+        service: 모든 레코드에 기록할 서비스 이름
+    """
+
+    def __init__(self, service: str):
+        super().__init__()
+        self.service = service
+
+    def format(self, record: logging.LogRecord) -> str:
+        raw = getattr(record, 'raw', None)
+        if raw is not None:
+            return json.dumps(raw, ensure_ascii=False, default=str)
+
+        entry: Dict[str, Any] = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'service': self.service,
+            'msg': record.getMessage(),
+        }
+        entry.update(getattr(record, 'context', None) or {})
+        if hasattr(record, 'payload'):
+            entry['payload'] = redact(record.payload) if settings.redact_prompts else record.payload
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """기존 텍스트 형식 (LOG_FORMAT=text), payload는 메시지 뒤에 JSON으로 덧붙입니다."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(levelname)s - %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        raw = getattr(record, 'raw', None)
+        if raw is not None:
+            return json.dumps(raw, ensure_ascii=False, default=str)
+        text = super().format(record)
+        if hasattr(record, 'payload'):
+            payload = redact(record.payload) if settings.redact_prompts else record.payload
+            text = f"{text}: {json.dumps(payload, ensure_ascii=False, default=str)}"
+        return text
+
+
+class NonBlockingQueueHandler(logging.Handler):
+    """포맷팅하지 않은 레코드를 큐에 넣기만 하는 핸들러입니다 (큐가 가득 차면 버림).
+
+    logging.handlers.QueueHandler는 호출 스레드에서 메시지를 포맷팅(prepare)하므로 사용하지 않고,
+    %-스타일 인자와 payload는 리스너 스레드에서 포맷팅합니다.
+    """
+
+    def __init__(self, log_queue: 'queue.Queue[logging.LogRecord]'):
+        super().__init__()
+        self.queue = log_queue
+        self.dropped = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class FlushMarkerHandler(logging.Handler):
+    """리스너가 flush 표식 레코드에 도달하면(앞선 레코드를 모두 출력하면) 대기 중인 호출자를 깨웁니다."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        event = getattr(record, 'flush_event', None)
+        if event is not None:
+            event.set()
+
+
+def _is_log_record(record: logging.LogRecord) -> bool:
+    return not hasattr(record, 'flush_event')
+
+
+class StructuredLogging:
+    """루트 로거에 설치된 로깅 구성입니다.
+
+    Args:
+        handler: 루트 로거에 연결한 핸들러 (비동기이면 NonBlockingQueueHandler)
+        listener: 큐를 비우는 리스너 (동기 출력이면 None)
+    """
+
+    def __init__(self, handler: logging.Handler, listener: Optional[Any] = None):
+        self.handler = handler
+        self.listener = listener
+        self._running = listener is not None
+
+    def flush(self, timeout: float = 0.5) -> bool:
+        """큐에 쌓인 로그가 출력될 때까지 최대 timeout초 기다립니다 (모두 출력되면 True)."""
+        if self.listener is None:
+            self.handler.flush()
+            return True
+        log_queue = self.listener.queue
+        if not log_queue.unfinished_tasks:
+            return True
+        marker = logging.LogRecord('flush', logging.NOTSET, '', 0, '', None, None)
+        marker.flush_event = threading.Event()
+        try:
+            log_queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.flush_event.wait(timeout)
+
+    def stop(self) -> None:
+        """남은 로그를 출력하고 리스너를 중지합니다."""
+        if self._running:
+            self._running = False
+            self.listener.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'async': self.listener is not None,
+            'queued': self.listener.queue.qsize() if self.listener is not None else 0,
+            'dropped': getattr(self.handler, 'dropped', 0),
+        }
+
+
+_active: Optional[StructuredLogging] = None
+
+
+def configure_logging(service: str, stream: Any = None, async_output: bool = True) -> StructuredLogging:
+    """환경 변수로 루트 로거를 구성합니다 (기존 핸들러는 제거).
+
+    Args:
+        service: 모든 레코드에 기록할 서비스 이름
+        stream: 출력 스트림 (기본값: stdout)
+        async_output: LOG_ASYNC가 없을 때의 리스너 스레드 출력 여부
+            (호출마다 반환 전에 로그를 비워야 하는 단일 스레드 핸들러는 False가 더 빠름)
+
+    Environment:
+        LOG_LEVEL: 루트 로그 레벨 (기본값: INFO)
+        LOG_FORMAT: json (기본값) | text
+        LOG_ASYNC: 리스너 스레드에서 출력 (기본값: async_output)
+        LOG_QUEUE_SIZE: 비동기 출력 큐 크기, 초과분은 버림 (기본값: 10000)
+        LOG_PAYLOAD_SAMPLE: 레벨별 페이로드 덤프 샘플링 비율 (기본값: DEBUG=1,INFO=0.01,WARNING=1,ERROR=1)
+        LOG_REDACT_PROMPTS: 질문/답변 텍스트 마스킹 (기본값: true)
+        LOG_PROMPT_CHARS: 마스킹하지 않을 때 남길 질문 텍스트 최대 길이 (기본값: 100)
+    """
+    global _active, settings
+    settings = LogSettings.from_env()
+    if _active is not None:
+        _active.stop()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if os.environ.get('LOG_FORMAT', 'json').lower() == 'text':
+        output.setFormatter(TextFormatter())
+    else:
+        output.setFormatter(JsonFormatter(service))
+
+    listener = None
+    handler: logging.Handler = output
+    if os.environ.get('LOG_ASYNC', str(async_output)).lower() == 'true':
+        queue_size = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+        log_queue: 'queue.Queue[logging.LogRecord]' = queue.Queue(maxsize=queue_size)
+        from logging.handlers import QueueListener
+
+        handler = NonBlockingQueueHandler(log_queue)
+        output.addFilter(_is_log_record)
+        listener = QueueListener(log_queue, output, FlushMarkerHandler(), respect_handler_level=False)
+        listener.start()
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    # EMF 레코드는 LOG_LEVEL과 관계없이 출력
+    logging.getLogger('emf').setLevel(logging.INFO)
+
+    _active = StructuredLogging(handler, listener)
+    atexit.register(_active.stop)
+    return _active
+
+
+def log_payload(
+    target: logging.Logger, level: int, message: str, *args: Any, payload: Any, sample: bool = True
+) -> None:
+    """payload 덤프를 레벨별 샘플링 비율에 따라 기록합니다 (직렬화/마스킹은 출력할 때 수행).
+
+    Args:
+        target: 로거
+        level: 로그 레벨
+        message: %-스타일 메시지 (args로 포맷팅)
+        payload: 레코드의 payload 필드로 남길 값
+        sample: False이면 샘플링하지 않고 항상 기록
+    """
+    if target.isEnabledFor(level) and (not sample or settings.sampled(level)):
+        target.log(level, message, *args, extra={'payload': payload})
+
+
+def emit_raw(record: Dict[str, Any]) -> None:
+    """record를 가공하지 않은 JSON 한 줄로 stdout에 출력합니다 (CloudWatch EMF 등)."""
+    logging.getLogger('emf').info('', extra={'raw': record})
+
+
+def flush_logs(timeout: float = 0.5) -> None:
+    """비동기 출력 큐를 비웁니다 (Lambda는 핸들러 반환 후 실행 환경이 멈출 수 있음)."""
+    if _active is not None and not _active.flush(timeout):
+        logger.warning("Log queue not drained within %ss", timeout)
+
+
+def logged_handler(handler: Callable[..., Any]) -> Callable[..., Any]:
+    """Lambda 핸들러 데코레이터 - 요청 ID를 로그 컨텍스트에 바인딩하고 반환 전에 로그 큐를 비웁니다."""
+
+    @functools.wraps(handler)
+    def wrapper(event: Any, context: Any) -> Any:
+        request_id = getattr(context, 'aws_request_id', None)
+        with log_context(**({'request_id': request_id} if request_id else {})):
+            try:
+                return handler(event, context)
+            finally:
+                flush_logs()
+
+    return wrapper